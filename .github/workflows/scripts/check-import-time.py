@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+check-import-time.py (workflow-local)
+Guard the cold-start cost of the Specify CLI.
+
+Fails when importing specify_cli loads any of the modules that are supposed to
+be deferred to the code paths that need them (network stack, TLS, interactive
+input, thread pools, live renderers), or when the cumulative import time
+reported by `python -X importtime` exceeds the budget.
+
+Usage: .github/workflows/scripts/check-import-time.py [budget-ms]
+  The budget defaults to $IMPORT_BUDGET_MS or 200. The best of several runs
+  is compared against it to smooth out noisy CI runners.
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+RUNS = 5
+DEFERRED_MODULES = [
+    "httpx",
+    "httpcore",
+    "truststore",
+    "ssl",
+    "readchar",
+    "concurrent.futures",
+    "platformdirs",
+    "rich.live",
+    "rich.progress",
+    "rich.table",
+    "rich.tree",
+]
+
+PROBE = """
+import sys
+before = set(sys.modules)
+import specify_cli
+print("\\n".join(sorted(set(sys.modules) - before)))
+"""
+
+
+def loaded_modules() -> set[str]:
+    result = subprocess.run([sys.executable, "-c", PROBE], check=True, capture_output=True, text=True)
+    return set(result.stdout.split())
+
+
+def import_time_us() -> int:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import specify_cli"],
+        check=True, capture_output=True, text=True,
+    )
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s+specify_cli$", line)
+        if match:
+            return int(match.group(1))
+    raise RuntimeError("specify_cli not found in -X importtime output")
+
+
+def main() -> int:
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else float(os.getenv("IMPORT_BUDGET_MS", "200"))
+
+    loaded = loaded_modules()
+    eager = [m for m in DEFERRED_MODULES if m in loaded]
+    if eager:
+        print(f"Error: importing specify_cli eagerly loads: {', '.join(eager)}", file=sys.stderr)
+        print("Import these inside the functions that use them.", file=sys.stderr)
+        return 1
+
+    best_ms = min(import_time_us() for _ in range(RUNS)) / 1000
+    print(f"specify_cli import time: {best_ms:.1f} ms (budget {budget_ms:.0f} ms, best of {RUNS})")
+    if best_ms > budget_ms:
+        print(f"Error: import time budget exceeded by {best_ms - budget_ms:.1f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+init_bench.py
+End-to-end benchmark of `specify init` against a local GitHub stand-in.
+
+A local HTTP server imitates `api.github.com/repos/github/spec-kit/releases/latest`
+and serves a synthetic template archive of configurable size and file count.
+Each scenario runs the same code path as `specify init`:
+download_and_extract_template and init_git_repo,
+into a fresh directory per iteration. Phase timings are reported as percentiles
+in JSON so runs can be compared across commits.
+
+Scenarios:
+  new         new project directory, --no-git
+  new-git     new project directory, with git
+  here        --here into a directory with existing files, --no-git
+  here-git    --here into a directory with existing files, with git
+
+Usage:
+  python benchmarks/init_bench.py [--iterations N] [--files N] [--size BYTES]
+                                  [--scenario NAME ...] [--cache] [--output FILE]
+                                  [--baseline FILE]
+"""
+
+import argparse
+import hashlib
+import http.server
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+import httpx  # noqa: E402
+
+import specify_cli  # noqa: E402
+from specify_cli import (  # noqa: E402
+    StepTracker,
+    download_and_extract_template,
+    init_git_repo,
+)
+from specify_cli.cache import TemplateCache  # noqa: E402
+from specify_cli.manifest import manifest_files  # noqa: E402
+
+SCENARIOS = {
+    "new": {"here": False, "git": False},
+    "new-git": {"here": False, "git": True},
+    "here": {"here": True, "git": False},
+    "here-git": {"here": True, "git": True},
+}
+PERCENTILES = (50, 90, 95, 99)
+AI = "claude"
+SCRIPT = "sh"
+TAG = "v0.0.0-bench"
+
+
+def build_template(files: int, size: int, seed: int = 0) -> bytes:
+    """Build a template zip with roughly `size` bytes of payload spread over `files` entries."""
+    rng = random.Random(seed)
+    words = [f"word{i}".encode() for i in range(512)]
+    per_file = max(1, size // max(1, files))
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(".vscode/settings.json", json.dumps({"chat.promptFilesRecommendations": {"speckit.plan": True}}))
+        for i in range(files):
+            # Markdown-like text compresses the way real templates do
+            body = b" ".join(rng.choice(words) for _ in range(per_file // 6 + 1))[:per_file]
+            if i % 10 == 0:
+                name = f".specify/scripts/bash/script-{i:04d}.sh"
+                body = b"#!/usr/bin/env bash\n" + body
+            elif i % 10 == 1:
+                name = f".specify/templates/template-{i:04d}.md"
+            else:
+                name = f".claude/commands/command-{i:04d}.md"
+            zf.writestr(name, body)
+    return buf.getvalue()
+
+
+class GitHubStandIn:
+    """Threaded local server for the release API and the template asset."""
+
+    def __init__(self, archive: bytes):
+        self.archive = archive
+        self.asset_name = f"spec-kit-template-{AI}-{SCRIPT}-{TAG}.zip"
+        self.etag = '"' + hashlib.sha256(archive).hexdigest()[:16] + '"'
+        stand_in = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.endswith("/releases/latest"):
+                    if self.headers.get("If-None-Match") == stand_in.etag:
+                        self.send_response(304)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    body = json.dumps(stand_in.release()).encode()
+                    content_type = "application/json"
+                elif self.path == f"/download/{stand_in.asset_name}":
+                    body = stand_in.archive
+                    content_type = "application/zip"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", stand_in.etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def release(self) -> dict:
+        return {
+            "tag_name": TAG,
+            "assets": [{
+                "name": self.asset_name,
+                "size": len(self.archive),
+                "browser_download_url": f"{self.base_url}/download/{self.asset_name}",
+                "digest": "sha256:" + hashlib.sha256(self.archive).hexdigest(),
+            }],
+        }
+
+    def client(self) -> httpx.Client:
+        """An httpx client that sends api.github.com requests to this server."""
+        base = httpx.URL(self.base_url)
+
+        class Redirect(httpx.HTTPTransport):
+            def handle_request(self, request):
+                request.url = request.url.copy_with(scheme=base.scheme, host=base.host, port=base.port)
+                return super().handle_request(request)
+
+        return httpx.Client(transport=Redirect())
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Linear-interpolated percentile of samples."""
+    ordered = sorted(samples)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples: list[float]) -> dict:
+    stats = {"min": min(samples), "mean": sum(samples) / len(samples), "max": max(samples)}
+    for pct in PERCENTILES:
+        stats[f"p{pct}"] = percentile(samples, pct)
+    return {k: round(v * 1000, 3) for k, v in stats.items()}
+
+
+def seed_existing_project(path: Path) -> None:
+    """Give a --here target some pre-existing content to merge into."""
+    (path / ".vscode").mkdir(parents=True)
+    (path / ".vscode" / "settings.json").write_text(json.dumps({"editor.tabSize": 2}))
+    (path / "README.md").write_text("# Existing project\n")
+    (path / "src").mkdir()
+    for i in range(20):
+        (path / "src" / f"module_{i}.py").write_text(f"VALUE = {i}\n")
+
+
+def run_once(stand_in: GitHubStandIn, workdir: Path, scenario: dict, cache: TemplateCache | None) -> dict:
+    project = workdir / "project"
+    if scenario["here"]:
+        project.mkdir()
+        seed_existing_project(project)
+
+    tracker = StepTracker("Benchmark")
+    client = stand_in.client()
+    timings = {}
+    start = time.perf_counter()
+    download_and_extract_template(
+        project, AI, SCRIPT, is_current_dir=scenario["here"],
+        verbose=False, tracker=tracker, client=client, cache=cache,
+    )
+    timings["template"] = time.perf_counter() - start
+    # Finer breakdown from the per-step timings StepTracker records
+    for step in ("fetch", "download", "extract"):
+        seconds = tracker.duration(step)
+        if seconds is not None:
+            timings[step] = seconds
+
+    if scenario["git"]:
+        mark = time.perf_counter()
+        ok, error = init_git_repo(project, quiet=True, files=manifest_files(project))
+        if not ok:
+            raise RuntimeError(f"git init failed: {error}")
+        timings["git"] = time.perf_counter() - mark
+
+    timings["total"] = time.perf_counter() - start
+    client.close()
+    return timings
+
+
+def compare(baseline: dict, results: dict) -> None:
+    """Print p50 changes per scenario and phase relative to a baseline run."""
+    print(f"\nCompared with {(baseline.get('meta') or {}).get('commit') or 'baseline'} (p50, ms):", file=sys.stderr)
+    for name, phases in results["scenarios"].items():
+        for phase, stats in phases.items():
+            before = baseline.get("scenarios", {}).get(name, {}).get(phase)
+            if not before:
+                continue
+            delta = stats["p50"] - before["p50"]
+            pct = (delta / before["p50"] * 100) if before["p50"] else 0.0
+            print(f"  {name:10s} {phase:10s} {before['p50']:9.1f} -> {stats['p50']:9.1f}  ({pct:+.1f}%)", file=sys.stderr)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", "-n", type=int, default=10, help="measured runs per scenario (default 10)")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured runs per scenario (default 1)")
+    parser.add_argument("--files", type=int, default=60, help="files in the synthetic template (default 60)")
+    parser.add_argument("--size", type=int, default=512 * 1024, help="uncompressed template payload in bytes (default 512 KiB)")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="scenario to run (repeatable; default all)")
+    parser.add_argument("--cache", action="store_true", help="use a warm template cache instead of downloading every run")
+    parser.add_argument("--output", "-o", type=Path, help="write JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", type=Path, help="earlier JSON results to compare p50 timings against")
+    args = parser.parse_args()
+
+    scenarios = args.scenario or list(SCENARIOS)
+    if any(SCENARIOS[name]["git"] for name in scenarios) and not shutil.which("git"):
+        print("git not found; run only the --no-git scenarios (--scenario new --scenario here)", file=sys.stderr)
+        return 1
+
+    archive = build_template(args.files, args.size)
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "specify_cli": str(Path(specify_cli.__file__).parent),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "files": args.files,
+            "payload_bytes": args.size,
+            "archive_bytes": len(archive),
+            "cache": args.cache,
+            "unit": "ms",
+        },
+        "scenarios": {},
+    }
+
+    env = {
+        # Keep git independent of the developer's global config
+        "GIT_AUTHOR_NAME": "bench", "GIT_AUTHOR_EMAIL": "bench@example.com",
+        "GIT_COMMITTER_NAME": "bench", "GIT_COMMITTER_EMAIL": "bench@example.com",
+        "GIT_CONFIG_NOSYSTEM": "1",
+    }
+    os.environ.update(env)
+
+    with GitHubStandIn(archive) as stand_in, tempfile.TemporaryDirectory(prefix="specify-bench-") as root:
+        root = Path(root)
+        cache = TemplateCache(root / "cache") if args.cache else None
+        original_cwd = Path.cwd()
+        # download_and_extract_template stages archives in the working directory
+        os.chdir(root)
+        try:
+            for name in scenarios:
+                samples: dict[str, list[float]] = {}
+                for i in range(args.warmup + args.iterations):
+                    workdir = Path(tempfile.mkdtemp(prefix=f"{name}-", dir=root))
+                    timings = run_once(stand_in, workdir, SCENARIOS[name], cache)
+                    shutil.rmtree(workdir, ignore_errors=True)
+                    if i < args.warmup:
+                        continue
+                    for phase, seconds in timings.items():
+                        samples.setdefault(phase, []).append(seconds)
+                results["scenarios"][name] = {phase: summarize(values) for phase, values in samples.items()}
+                print(f"{name:10s} total p50 {results['scenarios'][name]['total']['p50']:8.1f} ms", file=sys.stderr)
+        finally:
+            os.chdir(original_cwd)
+
+    if args.baseline:
+        compare(json.loads(args.baseline.read_text()), results)
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(payload + "\n")
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
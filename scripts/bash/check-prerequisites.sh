@@ -74,6 +74,16 @@ EOF
     esac
 done
 
+# JSON output comes straight from the CLI when it is installed: same keys (plus
+# the other feature paths), validation and exit status, in a single process
+if $JSON_MODE && command -v specify >/dev/null 2>&1; then
+    cli_args=(paths --json)
+    $REQUIRE_TASKS && cli_args+=(--require-tasks)
+    $INCLUDE_TASKS && cli_args+=(--include-tasks)
+    $PATHS_ONLY && cli_args+=(--paths-only)
+    exec specify "${cli_args[@]}"
+fi
+
 # Source common functions
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 source "$SCRIPT_DIR/common.sh"
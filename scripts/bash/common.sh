@@ -12,6 +12,14 @@ get_repo_root() {
     fi
 }
 
+# Query the cached feature index (`specify features ...`) when the CLI is installed.
+# Fails without output when it is not, or when the query has no answer, so callers
+# can fall back to scanning specs/ themselves.
+query_feature_index() {
+    command -v specify >/dev/null 2>&1 || return 1
+    specify features "$@" 2>/dev/null
+}
+
 # Get current branch, with fallback for non-git repositories
 get_current_branch() {
     # First check if SPECIFY_FEATURE environment variable is set
@@ -30,6 +38,12 @@ get_current_branch() {
     local repo_root=$(get_repo_root)
     local specs_dir="$repo_root/specs"
 
+    local indexed
+    if indexed=$(query_feature_index latest --root "$repo_root") && [[ "$indexed" =~ ^[0-9]{3}- ]]; then
+        echo "$indexed"
+        return
+    fi
+
     if [[ -d "$specs_dir" ]]; then
         local latest_feature=""
         local highest=0
@@ -99,6 +113,12 @@ find_feature_dir_by_prefix() {
 
     local prefix="${BASH_REMATCH[1]}"
 
+    local indexed
+    if indexed=$(query_feature_index find "$branch_name" --root "$repo_root"); then
+        echo "$indexed"
+        return
+    fi
+
     # Search for directories in specs/ that start with this prefix
     local matches=()
     if [[ -d "$specs_dir" ]]; then
@@ -125,6 +145,11 @@ find_feature_dir_by_prefix() {
 }
 
 get_feature_paths() {
+    # One `specify paths` process replaces the git calls and specs/ scans below
+    if command -v specify >/dev/null 2>&1 && specify paths --shell 2>/dev/null; then
+        return
+    fi
+
     local repo_root=$(get_repo_root)
     local current_branch=$(get_current_branch)
     local has_git_repo="false"
@@ -84,6 +84,14 @@ find_repo_root() {
 check_existing_branches() {
     local short_name="$1"
     
+    # Prefer the CLI: it reads refs directly and only re-lists remote branches
+    # when its cached snapshot is stale, instead of fetching every time
+    local next
+    if command -v specify >/dev/null 2>&1 && next=$(specify features next --short-name "$short_name" --root "$REPO_ROOT" 2>/dev/null); then
+        echo $((10#$next))
+        return
+    fi
+    
     # Fetch all remotes to get latest branch info (suppress errors if no remotes)
     git fetch --all --prune 2>/dev/null || true
     
@@ -195,9 +203,11 @@ if [ -z "$BRANCH_NUMBER" ]; then
         # Check existing branches on remotes
         BRANCH_NUMBER=$(check_existing_branches "$BRANCH_SUFFIX")
     else
-        # Fall back to local directory check
+        # Fall back to local directory check, through the cached feature index when available
         HIGHEST=0
-        if [ -d "$SPECS_DIR" ]; then
+        if command -v specify >/dev/null 2>&1 && NEXT=$(specify features next --root "$REPO_ROOT" 2>/dev/null); then
+            HIGHEST=$((10#$NEXT - 1))
+        elif [ -d "$SPECS_DIR" ]; then
             for dir in "$SPECS_DIR"/*; do
                 [ -d "$dir" ] || continue
                 dirname=$(basename "$dir")
@@ -725,6 +725,13 @@ print_summary() {
 #==============================================================================
 
 main() {
+    # Prefer the CLI: it parses plan.md once and patches every agent file in memory
+    if command -v specify >/dev/null 2>&1; then
+        local cli_args=(agent-context update --root "$REPO_ROOT")
+        [[ -n "$AGENT_TYPE" ]] && cli_args+=(--agent "$AGENT_TYPE")
+        specify "${cli_args[@]}" && exit 0
+    fi
+
     # Validate environment before proceeding
     validate_environment
     
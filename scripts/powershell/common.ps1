@@ -15,6 +15,20 @@ function Get-RepoRoot {
     return (Resolve-Path (Join-Path $PSScriptRoot "../../..")).Path
 }
 
+# Query the cached feature index (`specify features ...`) when the CLI is installed.
+# Returns $null when it is not, or when the query has no answer, so callers can
+# fall back to scanning specs/ themselves.
+function Invoke-FeatureIndex {
+    if (-not (Get-Command specify -ErrorAction SilentlyContinue)) { return $null }
+    try {
+        $result = specify features @args 2>$null
+        if ($LASTEXITCODE -eq 0 -and $result) { return ($result | Select-Object -Last 1) }
+    } catch {
+        # Fall back to scanning
+    }
+    return $null
+}
+
 function Get-CurrentBranch {
     # First check if SPECIFY_FEATURE environment variable is set
     if ($env:SPECIFY_FEATURE) {
@@ -34,6 +48,11 @@ function Get-CurrentBranch {
     # For non-git repos, try to find the latest feature directory
     $repoRoot = Get-RepoRoot
     $specsDir = Join-Path $repoRoot "specs"
+
+    $indexed = Invoke-FeatureIndex latest --root $repoRoot
+    if ($indexed -match '^\d{3}-') {
+        return $indexed
+    }
     
     if (Test-Path $specsDir) {
         $latestFeature = ""
@@ -93,6 +112,28 @@ function Get-FeatureDir {
 }
 
 function Get-FeaturePathsEnv {
+    # One `specify paths` process replaces the git calls and specs/ scans below
+    if (Get-Command specify -ErrorAction SilentlyContinue) {
+        $json = $null
+        try { $json = specify paths --json --paths-only 2>$null } catch { $json = $null }
+        if ($LASTEXITCODE -eq 0 -and $json) {
+            $p = $json | ConvertFrom-Json
+            return [PSCustomObject]@{
+                REPO_ROOT     = $p.REPO_ROOT
+                CURRENT_BRANCH = $p.BRANCH
+                HAS_GIT       = $p.HAS_GIT
+                FEATURE_DIR   = $p.FEATURE_DIR
+                FEATURE_SPEC  = $p.FEATURE_SPEC
+                IMPL_PLAN     = $p.IMPL_PLAN
+                TASKS         = $p.TASKS
+                RESEARCH      = $p.RESEARCH
+                DATA_MODEL    = $p.DATA_MODEL
+                QUICKSTART    = $p.QUICKSTART
+                CONTRACTS_DIR = $p.CONTRACTS_DIR
+            }
+        }
+    }
+
     $repoRoot = Get-RepoRoot
     $currentBranch = Get-CurrentBranch
     $hasGit = Test-HasGit
@@ -65,6 +65,16 @@ function Get-NextBranchNumber {
         [string]$SpecsDir
     )
     
+    # Prefer the CLI: it reads refs directly and only re-lists remote branches
+    # when its cached snapshot is stale, instead of fetching every time
+    if (Get-Command specify -ErrorAction SilentlyContinue) {
+        $next = $null
+        try { $next = specify features next --short-name $ShortName --root $repoRoot 2>$null } catch { $next = $null }
+        if ($LASTEXITCODE -eq 0 -and $next -match '^\d+$') {
+            return [int]$next
+        }
+    }
+    
     # Fetch all remotes to get latest branch info (suppress errors if no remotes)
     try {
         git fetch --all --prune 2>$null | Out-Null
@@ -210,9 +220,15 @@ if ($Number -eq 0) {
         # Check existing branches on remotes
         $Number = Get-NextBranchNumber -ShortName $branchSuffix -SpecsDir $specsDir
     } else {
-        # Fall back to local directory check
+        # Fall back to local directory check, through the cached feature index when available
         $highest = 0
-        if (Test-Path $specsDir) {
+        $next = $null
+        if (Get-Command specify -ErrorAction SilentlyContinue) {
+            try { $next = specify features next --root $repoRoot 2>$null } catch { $next = $null }
+        }
+        if ($LASTEXITCODE -eq 0 -and $next -match '^\d+$') {
+            $highest = [int]$next - 1
+        } elseif (Test-Path $specsDir) {
             Get-ChildItem -Path $specsDir -Directory | ForEach-Object {
                 if ($_.Name -match '^(\d{3})') {
                     $num = [int]$matches[1]
@@ -419,6 +419,13 @@ function Print-Summary {
 }
 
 function Main {
+    # Prefer the CLI: it parses plan.md once and patches every agent file in memory
+    if (Get-Command specify -ErrorAction SilentlyContinue) {
+        $cliArgs = @('agent-context', 'update', '--root', $REPO_ROOT)
+        if ($AgentType) { $cliArgs += @('--agent', $AgentType) }
+        & specify @cliArgs
+        if ($LASTEXITCODE -eq 0) { exit 0 }
+    }
     Validate-Environment
     Write-Info "=== Updating agent context files for feature $CURRENT_BRANCH ==="
     if (-not (Parse-PlanData -PlanFile $NEW_PLAN)) { Write-Err 'Failed to parse plan data'; exit 1 }
@@ -27,33 +27,56 @@ Or install globally:
 import os
 import subprocess
 import sys
-import zipfile
-import tempfile
 import shutil
 import shlex
 import json
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Optional, Tuple
 
 import typer
-import httpx
 from rich.console import Console
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.text import Text
-from rich.live import Live
 from rich.align import Align
-from rich.table import Table
-from rich.tree import Tree
 from typer.core import TyperGroup
 
-# For cross-platform keyboard input
-import readchar
-import ssl
-import truststore
-
-ssl_context = truststore.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-client = httpx.Client(verify=ssl_context)
+from .cache import TemplateCache, asset_sha256, default_release_ttl, file_sha256
+from .tools import ToolProber
+
+# Heavy modules (httpx, truststore, readchar, concurrent.futures and the rich
+# Live/Progress/Table/Tree renderers) are imported inside the functions that use
+# them so that `specify --help` and `specify check` start without loading the
+# network stack. The CI import-time check enforces this. zipfile is imported
+# locally too but is loaded at startup anyway, through importlib.metadata.
+if TYPE_CHECKING:
+    import zipfile
+    import httpx
+    from .mirror import TemplateSource
+
+@lru_cache(maxsize=None)
+def _ssl_context():
+    """Return the shared truststore SSL context, created on first network use."""
+    import ssl
+    import truststore
+    return truststore.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+
+def _http_client(verify: bool = True) -> "httpx.Client":
+    """Create an HTTP client using the system trust store (or no verification)."""
+    import httpx
+    return httpx.Client(verify=_ssl_context() if verify else False)
+
+def __getattr__(name: str):
+    # Backwards-compatible lazy access to the former module-level network globals
+    if name == "ssl_context":
+        return _ssl_context()
+    if name == "client":
+        client = _http_client()
+        globals()["client"] = client
+        return client
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def _github_token(cli_token: str | None = None) -> str | None:
     """Return sanitized GitHub token (cli arg takes precedence) or None."""
@@ -64,6 +87,11 @@ def _github_auth_headers(cli_token: str | None = None) -> dict:
     token = _github_token(cli_token)
     return {"Authorization": f"Bearer {token}"} if token else {}
 
+def _is_github_url(url: str) -> bool:
+    from urllib.parse import urlparse
+    host = (urlparse(url).hostname or "").lower()
+    return host == "github.com" or host.endswith((".github.com", ".githubusercontent.com"))
+
 # Agent configuration with name, folder, install URL, and CLI tool requirement
 AGENT_CONFIG = {
     "copilot": {
@@ -168,27 +196,70 @@ BANNER = """
 TAGLINE = "GitHub Spec Kit - Spec-Driven Development Toolkit"
 class StepTracker:
     """Track and render hierarchical steps without emojis, similar to Claude Code tree output.
-    Supports live auto-refresh via an attached refresh callback.
+
+    Steps are indexed by key, so updates are O(1) and cheap enough to report per
+    file. Updates only mark the tracker dirty; a `rich.live.Live` built with
+    ``get_renderable=tracker.renderable`` redraws at its own refresh rate and the
+    tree is rebuilt at most once per redraw. An attached refresh callback is
+    still called synchronously on every change.
+
+    Each step also records when it started and ended (perf_counter, which is
+    monotonic) and optional byte/file counts, for the --profile report.
     """
     def __init__(self, title: str):
         self.title = title
-        self.steps = []  # list of dicts: {key, label, status, detail}
+        self.steps = []  # list of dicts: {key, label, status, detail, started, ended, bytes, files}
+        self._by_key: dict[str, dict] = {}
         self.status_order = {"pending": 0, "running": 1, "done": 2, "error": 3, "skipped": 4}
         self._refresh_cb = None  # callable to trigger UI refresh
+        self._lock = threading.RLock()
+        self._dirty = True
+        self._rendered = None
+        self.created = time.perf_counter()
+        self.created_at = time.time()
 
     def attach_refresh(self, cb):
         self._refresh_cb = cb
 
+    def __getstate__(self):
+        # Trackers are returned from process-pool workers; locks and callbacks don't pickle
+        state = self.__dict__.copy()
+        for name in ("_lock", "_refresh_cb", "_rendered"):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+        self._refresh_cb = None
+        self._rendered = None
+        self._dirty = True
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    @staticmethod
+    def _new_step(key: str, label: str, status: str = "pending", detail: str = "") -> dict:
+        return {"key": key, "label": label, "status": status, "detail": detail, "started": None, "ended": None, "bytes": None, "files": None}
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._by_key.get(key)
+
     def add(self, key: str, label: str):
-        if key not in [s["key"] for s in self.steps]:
-            self.steps.append({"key": key, "label": label, "status": "pending", "detail": ""})
-            self._maybe_refresh()
+        with self._lock:
+            if key in self._by_key:
+                return
+            step = self._new_step(key, label)
+            self.steps.append(step)
+            self._by_key[key] = step
+        self._maybe_refresh()
 
     def start(self, key: str, detail: str = ""):
         self._update(key, status="running", detail=detail)
 
-    def complete(self, key: str, detail: str = ""):
-        self._update(key, status="done", detail=detail)
+    def complete(self, key: str, detail: str = "", *, bytes: int | None = None, files: int | None = None):
+        self._update(key, status="done", detail=detail, bytes=bytes, files=files)
 
     def error(self, key: str, detail: str = ""):
         self._update(key, status="error", detail=detail)
@@ -196,28 +267,83 @@ class StepTracker:
     def skip(self, key: str, detail: str = ""):
         self._update(key, status="skipped", detail=detail)
 
-    def _update(self, key: str, status: str, detail: str):
-        for s in self.steps:
-            if s["key"] == key:
-                s["status"] = status
-                if detail:
-                    s["detail"] = detail
-                self._maybe_refresh()
-                return
-
-        self.steps.append({"key": key, "label": key, "status": status, "detail": detail})
+    def _update(self, key: str, status: str, detail: str, bytes: int | None = None, files: int | None = None):
+        with self._lock:
+            step = self._by_key.get(key)
+            if step is None:
+                step = self._new_step(key, key, status, detail)
+                self.steps.append(step)
+                self._by_key[key] = step
+
+            now = time.perf_counter()
+            if status == "running":
+                if step["started"] is None:
+                    step["started"] = now
+            elif status in ("done", "error"):
+                # Steps completed without an explicit start are instantaneous
+                if step["started"] is None:
+                    step["started"] = now
+                step["ended"] = now
+            step["status"] = status
+            if detail:
+                step["detail"] = detail
+            if bytes is not None:
+                step["bytes"] = bytes
+            if files is not None:
+                step["files"] = files
         self._maybe_refresh()
 
+    def duration(self, key: str) -> Optional[float]:
+        """Seconds a step took (so far, if still running), or None if it never started."""
+        step = self._by_key.get(key)
+        if step is None or step["started"] is None:
+            return None
+        end = step["ended"] if step["ended"] is not None else time.perf_counter()
+        return end - step["started"]
+
+    def profile(self) -> dict:
+        """Return step timings and counts as a JSON-serializable dict (seconds)."""
+        steps = []
+        for step in self.steps:
+            steps.append({
+                "key": step["key"],
+                "label": step["label"],
+                "status": step["status"],
+                "detail": step["detail"],
+                "offset": None if step["started"] is None else round(step["started"] - self.created, 6),
+                "duration": None if step["started"] is None else round(self.duration(step["key"]), 6),
+                "bytes": step["bytes"],
+                "files": step["files"],
+            })
+        return {
+            "title": self.title,
+            "started_at": self.created_at,
+            "total": round(time.perf_counter() - self.created, 6),
+            "steps": steps,
+        }
+
     def _maybe_refresh(self):
+        self._dirty = True
         if self._refresh_cb:
             try:
                 self._refresh_cb()
             except Exception:
                 pass
 
+    def renderable(self):
+        """Return the rendered tree, rebuilding it only if a step changed since the last call."""
+        with self._lock:
+            if self._dirty or self._rendered is None:
+                self._rendered = self.render()
+                self._dirty = False
+            return self._rendered
+
     def render(self):
+        from rich.tree import Tree
         tree = Tree(f"[cyan]{self.title}[/cyan]", guide_style="grey50")
-        for step in self.steps:
+        with self._lock:
+            steps = [dict(step) for step in self.steps]
+        for step in steps:
             label = step["label"]
             detail_text = step["detail"].strip() if step["detail"] else ""
 
@@ -253,6 +379,7 @@ class StepTracker:
 
 def get_key():
     """Get a single keypress in a cross-platform way using readchar."""
+    import readchar
     key = readchar.readkey()
 
     if key == readchar.key.UP or key == readchar.key.CTRL_P:
@@ -283,6 +410,9 @@ def select_with_arrows(options: dict, prompt_text: str = "Select an option", def
     Returns:
         Selected option key
     """
+    from rich.live import Live
+    from rich.table import Table
+
     option_keys = list(options.keys())
     if default_key and default_key in option_keys:
         selected_index = option_keys.index(default_key)
@@ -405,32 +535,43 @@ def run_command(cmd: list[str], check_return: bool = True, capture: bool = False
             raise
         return None
 
-def check_tool(tool: str, tracker: StepTracker = None) -> bool:
+_tool_prober: ToolProber | None = None
+
+def get_tool_prober(refresh: bool = False) -> ToolProber:
+    """Return the per-invocation tool prober (PATH is indexed at most once per run).
+
+    Args:
+        refresh: Ignore persisted probe results, rescan PATH and overwrite them on save
+    """
+    global _tool_prober
+    if _tool_prober is None or refresh:
+        # Special handling for Claude CLI after `claude migrate-installer`
+        # See: https://github.com/github/spec-kit/issues/123
+        # The migrate-installer command REMOVES the original executable from PATH
+        # and creates an alias at ~/.claude/local/claude instead
+        # This path should be prioritized over other claude executables in PATH
+        _tool_prober = ToolProber(special={"claude": CLAUDE_LOCAL_PATH}, refresh=refresh)
+    return _tool_prober
+
+def check_tool(tool: str, tracker: StepTracker = None, versions: bool = False) -> bool:
     """Check if a tool is installed. Optionally update tracker.
     
     Args:
         tool: Name of the tool to check
         tracker: Optional StepTracker to update with results
+        versions: Show the tool's --version output in the tracker instead of "available"
         
     Returns:
         True if tool is found, False otherwise
     """
-    # Special handling for Claude CLI after `claude migrate-installer`
-    # See: https://github.com/github/spec-kit/issues/123
-    # The migrate-installer command REMOVES the original executable from PATH
-    # and creates an alias at ~/.claude/local/claude instead
-    # This path should be prioritized over other claude executables in PATH
-    if tool == "claude":
-        if CLAUDE_LOCAL_PATH.exists() and CLAUDE_LOCAL_PATH.is_file():
-            if tracker:
-                tracker.complete(tool, "available")
-            return True
-    
-    found = shutil.which(tool) is not None
+    prober = get_tool_prober()
+    info = prober.probe([tool], versions=versions)[tool]
+    prober.save()
+    found = info["path"] is not None
     
     if tracker:
         if found:
-            tracker.complete(tool, "available")
+            tracker.complete(tool, info["version"] or "available")
         else:
             tracker.error(tool, "not found")
     
@@ -456,24 +597,37 @@ def is_git_repo(path: Path = None) -> bool:
     except (subprocess.CalledProcessError, FileNotFoundError):
         return False
 
-def init_git_repo(project_path: Path, quiet: bool = False) -> Tuple[bool, Optional[str]]:
+def init_git_repo(project_path: Path, quiet: bool = False, *, files: Optional[list[str]] = None, tracker: StepTracker | None = None) -> Tuple[bool, Optional[str]]:
     """Initialize a git repository in the specified path.
     
     Args:
         project_path: Path to initialize git repository in
         quiet: if True suppress console output (tracker handles status)
+        files: paths (relative to project_path) to put in the initial commit, e.g. the
+            files extracted from the template. Only these are hashed; the rest of the
+            directory is never scanned. Defaults to everything (`git add .`).
+        tracker: if given, the "git" step is completed with object and byte counts
     
     Returns:
         Tuple of (success: bool, error_message: Optional[str])
     """
+    def git(*args: str, input: str | None = None, check: bool = True) -> subprocess.CompletedProcess:
+        # Run with cwd= rather than os.chdir so concurrent batch workers don't interfere
+        return subprocess.run(["git", *args], check=check, capture_output=True, text=True, cwd=project_path, input=input)
+
     try:
-        original_cwd = Path.cwd()
-        os.chdir(project_path)
         if not quiet:
             console.print("[cyan]Initializing git repository...[/cyan]")
-        subprocess.run(["git", "init"], check=True, capture_output=True, text=True)
-        subprocess.run(["git", "add", "."], check=True, capture_output=True, text=True)
-        subprocess.run(["git", "commit", "-m", "Initial commit from Specify template"], check=True, capture_output=True, text=True)
+        git("init")
+        if files is None:
+            git("add", ".")
+            git("commit", "-m", "Initial commit from Specify template")
+            detail, stats = "initialized", {}
+        else:
+            stats = _commit_file_list(project_path, files, git)
+            detail = f"initialized ({stats['objects']} objects, {_format_bytes(stats['bytes'])})"
+        if tracker:
+            tracker.complete("git", detail, bytes=stats.get("bytes"), files=stats.get("files"))
         if not quiet:
             console.print("[green]✓[/green] Git repository initialized")
         return True, None
@@ -488,18 +642,65 @@ def init_git_repo(project_path: Path, quiet: bool = False) -> Tuple[bool, Option
         if not quiet:
             console.print(f"[red]Error initializing git repository:[/red] {e}")
         return False, error_msg
-    finally:
-        os.chdir(original_cwd)
+
+def _commit_file_list(project_path: Path, files: list[str], git) -> dict:
+    """Build the first commit from an explicit file list with git plumbing.
+
+    One batched `update-index` hashes just the listed files, then `write-tree`,
+    `commit-tree` and `update-ref` create the commit on the initial branch, so
+    the cost does not depend on how much else lives in the directory. Files
+    excluded by .gitignore or the global excludes are left out, as `git add`
+    would do.
+
+    Returns {"objects", "files", "bytes"} for what was written.
+    """
+    paths = sorted({Path(f).as_posix() for f in files if (project_path / f).is_file()})
+    if paths:
+        ignored = git("check-ignore", "-z", "--stdin", input="\0".join(paths) + "\0", check=False)
+        if ignored.returncode not in (0, 1):
+            raise subprocess.CalledProcessError(ignored.returncode, ignored.args, ignored.stdout, ignored.stderr)
+        skip = set(filter(None, ignored.stdout.split("\0")))
+        paths = [p for p in paths if p not in skip]
+
+    git("update-index", "--add", "-z", "--stdin", input="".join(f"{p}\0" for p in paths))
+    tree = git("write-tree").stdout.strip()
+    commit = git("commit-tree", tree, "-m", "Initial commit from Specify template").stdout.strip()
+    git("update-ref", "HEAD", commit)
+
+    # A fresh repository holds only loose objects, all of them written just now
+    objects = 0
+    for line in git("count-objects", "-v").stdout.splitlines():
+        key, _, value = line.partition(":")
+        if key == "count":
+            objects = int(value)
+    return {
+        "objects": objects,
+        "files": len(paths),
+        "bytes": sum((project_path / p).stat().st_size for p in paths),
+    }
 
 def handle_vscode_settings(sub_item, dest_file, rel_path, verbose=False, tracker=None) -> None:
-    """Handle merging or copying of .vscode/settings.json files."""
+    """Handle merging or copying of .vscode/settings.json files.
+
+    sub_item is either the path of the template settings file or its raw bytes
+    (when streamed straight out of the template archive).
+    """
     def log(message, color="green"):
         if verbose and not tracker:
             console.print(f"[{color}]{message}[/] {rel_path}")
 
+    def copy_new():
+        if isinstance(sub_item, bytes):
+            dest_file.write_bytes(sub_item)
+        else:
+            shutil.copy2(sub_item, dest_file)
+
     try:
-        with open(sub_item, 'r', encoding='utf-8') as f:
-            new_settings = json.load(f)
+        if isinstance(sub_item, bytes):
+            new_settings = json.loads(sub_item.decode('utf-8'))
+        else:
+            with open(sub_item, 'r', encoding='utf-8') as f:
+                new_settings = json.load(f)
 
         if dest_file.exists():
             merged = merge_json_files(dest_file, new_settings, verbose=verbose and not tracker)
@@ -508,12 +709,12 @@ def handle_vscode_settings(sub_item, dest_file, rel_path, verbose=False, tracker
                 f.write('\n')
             log("Merged:", "green")
         else:
-            shutil.copy2(sub_item, dest_file)
+            copy_new()
             log("Copied (no existing settings.json):", "blue")
 
     except Exception as e:
         log(f"Warning: Could not merge, copying instead: {e}", "yellow")
-        shutil.copy2(sub_item, dest_file)
+        copy_new()
 
 def merge_json_files(existing_path: Path, new_content: dict, verbose: bool = False) -> dict:
     """Merge new JSON content into existing JSON file.
@@ -558,38 +759,315 @@ def merge_json_files(existing_path: Path, new_content: dict, verbose: bool = Fal
 
     return merged
 
-def download_template_from_github(ai_assistant: str, download_dir: Path, *, script_type: str = "sh", verbose: bool = True, show_progress: bool = True, client: httpx.Client = None, debug: bool = False, github_token: str = None) -> Tuple[Path, dict]:
+def _archive_prefix(infos: list["zipfile.ZipInfo"]) -> str:
+    """Return the single top-level directory shared by every archive entry, or ''."""
+    tops = set()
+    for info in infos:
+        head, sep, _ = info.filename.partition("/")
+        if not sep:
+            return ""  # a file at the archive root: nothing to flatten
+        tops.add(head)
+        if len(tops) > 1:
+            return ""
+    return f"{tops.pop()}/" if tops else ""
+
+def _safe_relpath(name: str) -> Optional[Path]:
+    """Turn an archive member name into a relative path, or None if it would escape."""
+    parts = [p for p in name.replace("\\", "/").split("/") if p not in ("", ".")]
+    if not parts or ".." in parts or ":" in parts[0]:
+        return None
+    return Path(*parts)
+
+def _wants_executable(info: "zipfile.ZipInfo", head: bytes) -> bool:
+    """An entry is executable if its recorded Unix mode says so, or it is a .sh script with a shebang."""
+    return bool((info.external_attr >> 16) & 0o111) or (info.filename.endswith(".sh") and head.startswith(b"#!"))
+
+def _executable_mode(mode: int) -> int:
+    """Add an execute bit wherever a read bit is set, and always for the owner."""
+    return mode | ((mode & 0o444) >> 2) | 0o100
+
+def write_archive_entry(zip_ref: "zipfile.ZipFile", info: "zipfile.ZipInfo", dest: Path) -> Tuple[str, bool]:
+    """Stream one archive entry to dest, setting execute bits as it is written.
+
+    Returns (sha256 of the content, whether the file was made executable).
+    """
+    import hashlib
+
+    digest = hashlib.sha256()
+    head = b""
+    with zip_ref.open(info) as src, open(dest, "wb") as dst:
+        for chunk in iter(lambda: src.read(1024 * 1024), b""):
+            if not head:
+                head = chunk[:2]
+            digest.update(chunk)
+            dst.write(chunk)
+        executable = os.name != "nt" and _wants_executable(info, head)
+        if executable:
+            # An overwritten file keeps its mode, which may already be executable
+            mode = os.fstat(dst.fileno()).st_mode
+            executable = _executable_mode(mode) != mode
+            if executable:
+                os.fchmod(dst.fileno(), _executable_mode(mode))
+    return digest.hexdigest(), executable
+
+def _mark_executable(info: "zipfile.ZipInfo", path: Path) -> bool:
+    """Give a file left in place (identical to its entry) the execute bits its entry calls for."""
+    if os.name == "nt" or not (info.filename.endswith(".sh") or (info.external_attr >> 16) & 0o111):
+        return False
+    mode = path.stat().st_mode
+    if mode & 0o100:
+        return False
+    with open(path, "rb") as f:
+        head = f.read(2)
+    if not _wants_executable(info, head):
+        return False
+    os.chmod(path, _executable_mode(mode))
+    return True
+
+def extract_template_archive(zip_ref: "zipfile.ZipFile", dest_dir: Path, *, merge: bool = False, verbose: bool = True, tracker: StepTracker | None = None) -> dict:
+    """Stream every archive entry straight to its final path in a single pass.
+
+    A single top-level directory wrapping the whole archive is flattened on the fly.
+    With merge=True (init --here) each entry is first compared with the existing
+    file (see specify_cli.merge): identical files are left untouched, others are
+    overwritten in place, and any .vscode/settings.json is merged through
+    handle_vscode_settings. Scripts get their execute bits as they are written,
+    from the entry's recorded Unix mode or a shebang in a .sh file.
+
+    Returns a summary dict: files, bytes (written), identical (files left as they
+    were), executables (files made executable), top_level ({name: is_dir}),
+    flattened, and hashes ({relative posix path: sha256 of the template
+    content}) for the project manifest.
+    """
+    import hashlib
+
+    from .merge import IDENTICAL, MERGE, classify_entry
+
+    infos = zip_ref.infolist()
+    prefix = _archive_prefix(infos)
+    made_dirs: set[Path] = set()
+    top_level: dict[str, bool] = {}
+    hashes: dict[str, str] = {}
+    files = 0
+    identical = 0
+    executables = 0
+    total_bytes = 0
+    total_files = sum(1 for info in infos if not info.is_dir())
+
+    def ensure_dir(path: Path):
+        if path not in made_dirs:
+            path.mkdir(parents=True, exist_ok=True)
+            made_dirs.add(path)
+
+    for info in infos:
+        rel = _safe_relpath(info.filename[len(prefix):])
+        if rel is None:
+            continue
+        dest = dest_dir / rel
+
+        top = rel.parts[0]
+        if top not in top_level:
+            top_level[top] = info.is_dir() or len(rel.parts) > 1
+            if merge and verbose and not tracker and (dest_dir / top).exists():
+                if top_level[top]:
+                    console.print(f"[yellow]Merging directory:[/yellow] {top}")
+                else:
+                    console.print(f"[yellow]Overwriting file:[/yellow] {top}")
+
+        if info.is_dir():
+            ensure_dir(dest)
+            continue
+
+        ensure_dir(dest.parent)
+        status, local_sha256 = classify_entry(info, dest, rel) if merge else (None, None)
+        if status == IDENTICAL:
+            hashes[rel.as_posix()] = local_sha256
+            identical += 1
+            executables += _mark_executable(info, dest)
+        elif status == MERGE:
+            content = zip_ref.read(info)
+            hashes[rel.as_posix()] = hashlib.sha256(content).hexdigest()
+            handle_vscode_settings(content, dest, rel, verbose, tracker)
+            total_bytes += info.file_size
+        else:
+            hashes[rel.as_posix()], executable = write_archive_entry(zip_ref, info, dest)
+            executables += executable
+            total_bytes += info.file_size
+        files += 1
+        if tracker:
+            tracker.start("extract", f"{files}/{total_files} files")
+
+    return {"files": files, "bytes": total_bytes, "identical": identical, "executables": executables, "top_level": top_level, "flattened": bool(prefix), "hashes": hashes}
+
+def _rate_limit_state(headers) -> Tuple[Optional[int], Optional[float]]:
+    """Return (remaining, reset epoch) from GitHub X-RateLimit-* headers, if present."""
+    try:
+        remaining = int(headers.get("x-ratelimit-remaining"))
+    except (TypeError, ValueError):
+        return None, None
+    try:
+        reset = float(headers.get("x-ratelimit-reset"))
+    except (TypeError, ValueError):
+        reset = None
+    return remaining, reset
+
+def _describe_reset(reset: Optional[float]) -> str:
+    if not reset:
+        return "later"
+    minutes = max(0, int((reset - time.time() + 59) // 60))
+    return f"at {time.strftime('%H:%M', time.localtime(reset))} (in {minutes} min)"
+
+def fetch_release(client: "httpx.Client", *, tag: str | None = None, verbose: bool = True, debug: bool = False, github_token: str = None, cache: TemplateCache | None = None, source: "TemplateSource | None" = None) -> dict:
+    """Fetch spec-kit release metadata from the GitHub API (latest, or a pinned tag).
+
+    With a cache, a pinned tag is served from the cache without any request once
+    seen, and the latest release is reused without a request for
+    SPECIFY_RELEASE_TTL seconds, then revalidated with If-None-Match (304s do not
+    count against the rate limit). When the anonymous rate limit is exhausted the
+    cached release is used with a warning instead of failing.
+
+    With a template source (see specify_cli.mirror) the release is resolved from
+    the mirror's index instead of the GitHub API.
+    """
+    if source is not None:
+        from .mirror import MirrorError
+        if verbose:
+            console.print(f"[cyan]Resolving release from template source[/cyan] {source.location}")
+        try:
+            return source.release(tag, client)
+        except MirrorError as e:
+            console.print(f"[red]Error fetching release information[/red]")
+            console.print(Panel(str(e), title="Template Source Error", border_style="red"))
+            raise typer.Exit(1)
+
     repo_owner = "github"
     repo_name = "spec-kit"
-    if client is None:
-        client = httpx.Client(verify=ssl_context)
+
+    latest_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/releases/latest"
+    api_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/releases/tags/{tag}" if tag else latest_url
+    cached_release = cache.get_release(api_url) if cache else None
+    if tag and cache and not cached_release:
+        # A pinned tag that is also the cached latest release needs no request
+        latest = cache.get_release(latest_url)
+        if latest and latest["data"].get("tag_name") == tag:
+            cached_release = latest
+    authenticated = bool(_github_token(github_token))
+
+    if cached_release:
+        age = time.time() - cached_release.get("fetched_at", 0)
+        if tag or age < default_release_ttl():
+            if verbose:
+                console.print(f"[cyan]Using cached release information[/cyan] ({cached_release['data']['tag_name']})")
+            return cached_release["data"]
+
+        limit = cache.get_rate_limit()
+        if not authenticated and limit.get("remaining") == 0 and (limit.get("reset") or 0) > time.time():
+            console.print(
+                f"[yellow]Warning:[/yellow] GitHub API rate limit exhausted; resets {_describe_reset(limit.get('reset'))}. "
+                f"Using cached release {cached_release['data']['tag_name']} from {int(age // 60)} min ago."
+            )
+            return cached_release["data"]
 
     if verbose:
-        console.print("[cyan]Fetching latest release information...[/cyan]")
-    api_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/releases/latest"
+        console.print("[cyan]Fetching latest release information...[/cyan]" if not tag else f"[cyan]Fetching release {tag}...[/cyan]")
 
     try:
+        headers = _github_auth_headers(github_token)
+        if cached_release and cached_release.get("etag"):
+            headers["If-None-Match"] = cached_release["etag"]
+
         response = client.get(
             api_url,
             timeout=30,
             follow_redirects=True,
-            headers=_github_auth_headers(github_token),
+            headers=headers,
         )
         status = response.status_code
-        if status != 200:
+        remaining, reset = _rate_limit_state(response.headers)
+        if cache and remaining is not None and not authenticated:
+            try:
+                cache.set_rate_limit(remaining, reset)
+            except OSError:
+                pass
+
+        if status == 304 and cached_release:
+            release_data = cached_release["data"]
+            if cache:
+                try:
+                    cache.touch_release(api_url)
+                except OSError:
+                    pass
+            if verbose:
+                console.print("[cyan]Release information unchanged (cached)[/cyan]")
+        elif status in (403, 429) and remaining == 0:
+            if cached_release:
+                console.print(
+                    f"[yellow]Warning:[/yellow] GitHub API rate limit exhausted; resets {_describe_reset(reset)}. "
+                    f"Using cached release {cached_release['data']['tag_name']}."
+                )
+                return cached_release["data"]
+            raise RuntimeError(
+                f"GitHub API rate limit exhausted for {api_url}; it resets {_describe_reset(reset)}.\n"
+                "Pass --github-token (or set GH_TOKEN/GITHUB_TOKEN) to use an authenticated limit."
+            )
+        elif status == 404 and tag:
+            raise RuntimeError(f"Release {tag} not found ({api_url})")
+        elif status != 200:
             msg = f"GitHub API returned {status} for {api_url}"
             if debug:
                 msg += f"\nResponse headers: {response.headers}\nBody (truncated 500): {response.text[:500]}"
             raise RuntimeError(msg)
-        try:
-            release_data = response.json()
-        except ValueError as je:
-            raise RuntimeError(f"Failed to parse release JSON: {je}\nRaw (truncated 400): {response.text[:400]}")
+        else:
+            try:
+                release_data = response.json()
+            except ValueError as je:
+                raise RuntimeError(f"Failed to parse release JSON: {je}\nRaw (truncated 400): {response.text[:400]}")
+            if cache:
+                try:
+                    cache.put_release(api_url, release_data, response.headers.get("etag"))
+                except OSError:
+                    pass
     except Exception as e:
         console.print(f"[red]Error fetching release information[/red]")
         console.print(Panel(str(e), title="Fetch Error", border_style="red"))
         raise typer.Exit(1)
 
+    return release_data
+
+class TemplateError(RuntimeError):
+    """A release template could not be resolved, read or downloaded.
+
+    Raised by download_template_from_github when it runs non-verbosely, so
+    callers showing their own progress (trackers, batch pools) can report the
+    reason instead of a bare exit code.
+    """
+
+    def __init__(self, message: str, title: str = "Template Error"):
+        super().__init__(message)
+        self.title = title
+
+
+def download_template_from_github(ai_assistant: str, download_dir: Path, *, script_type: str = "sh", verbose: bool = True, show_progress: bool = True, client: "httpx.Client" = None, debug: bool = False, github_token: str = None, cache: TemplateCache | None = None, release_data: dict | None = None, release_tag: str | None = None, source: "TemplateSource | None" = None) -> Tuple[Path, dict]:
+    """Resolve the latest release template for the agent/script pair and download it.
+
+    When a cache is supplied, the release lookup is revalidated with If-None-Match and a
+    previously downloaded archive for the same tag, asset name and checksum is reused
+    without transferring it again. The returned metadata's ``cached`` flag is True when
+    the archive lives in the cache and must not be deleted by the caller.
+
+    Pass release_data (from fetch_release) to skip the release lookup, or
+    release_tag to use a pinned release instead of the latest one. Archives in a
+    local template source (file:// URLs) are verified and used in place.
+
+    Failures print an error panel and exit when verbose; otherwise they raise
+    TemplateError and print nothing.
+    """
+    if client is None:
+        client = _http_client()
+
+    if release_data is None:
+        release_data = fetch_release(client, tag=release_tag, verbose=verbose, debug=debug, github_token=github_token, cache=cache, source=source)
+
     assets = release_data.get("assets", [])
     pattern = f"spec-kit-template-{ai_assistant}-{script_type}"
     matching_assets = [
@@ -600,6 +1078,8 @@ def download_template_from_github(ai_assistant: str, download_dir: Path, *, scri
     asset = matching_assets[0] if matching_assets else None
 
     if asset is None:
+        if not verbose:
+            raise TemplateError(f"No matching release asset for {ai_assistant} (expected pattern: {pattern}) in {release_data['tag_name']}", "Template Not Found")
         console.print(f"[red]No matching release asset found[/red] for [bold]{ai_assistant}[/bold] (expected pattern: [bold]{pattern}[/bold])")
         asset_names = [a.get('name', '?') for a in assets]
         console.print(Panel("\n".join(asset_names) or "(no assets)", title="Available Assets", border_style="yellow"))
@@ -608,74 +1088,135 @@ def download_template_from_github(ai_assistant: str, download_dir: Path, *, scri
     download_url = asset["browser_download_url"]
     filename = asset["name"]
     file_size = asset["size"]
+    expected_sha256 = asset_sha256(asset)
 
     if verbose:
         console.print(f"[cyan]Found template:[/cyan] {filename}")
         console.print(f"[cyan]Size:[/cyan] {file_size:,} bytes")
         console.print(f"[cyan]Release:[/cyan] {release_data['tag_name']}")
 
-    zip_path = download_dir / filename
+    metadata = {
+        "filename": filename,
+        "size": file_size,
+        "release": release_data["tag_name"],
+        "asset_url": download_url,
+        "cached": False,
+        "cache_hit": False,
+        "downloaded_bytes": 0,
+        "mirror": not _is_github_url(download_url),
+    }
+
+    if download_url.startswith("file://"):
+        from .mirror import file_uri_to_path
+        local_zip = file_uri_to_path(download_url)
+        try:
+            sha256 = file_sha256(local_zip)
+        except OSError as e:
+            error = TemplateError(f"Could not read {local_zip}: {e}", "Template Source Error")
+        else:
+            error = None
+            if expected_sha256 and sha256 != expected_sha256:
+                error = TemplateError(f"Checksum mismatch for {local_zip}: expected sha256 {expected_sha256}, got {sha256}", "Template Source Error")
+        if error:
+            if not verbose:
+                raise error
+            console.print(Panel(str(error), title=error.title, border_style="red"))
+            raise typer.Exit(1)
+        if verbose:
+            console.print(f"[cyan]Using mirrored template:[/cyan] {local_zip}")
+        # Used in place; the caller must not delete it
+        metadata["cached"] = True
+        return local_zip, metadata
+
+    if cache:
+        cached_zip = cache.lookup(release_data["tag_name"], filename, expected_sha256, file_size)
+        if cached_zip:
+            if verbose:
+                console.print(f"[cyan]Using cached template:[/cyan] {cached_zip}")
+            metadata.update(cached=True, cache_hit=True)
+            return cached_zip, metadata
+
+    from .download import DownloadError, discard_partial, download_file
+
+    # Partial downloads are staged in the cache so an interrupted init can resume
+    staged_in_cache = cache is not None
+    zip_path = cache.partial_path(release_data["tag_name"], filename) if cache else download_dir / filename
     if verbose:
         console.print(f"[cyan]Downloading template...[/cyan]")
 
     try:
-        with client.stream(
-            "GET",
-            download_url,
-            timeout=60,
-            follow_redirects=True,
-            headers=_github_auth_headers(github_token),
-        ) as response:
-            if response.status_code != 200:
-                body_sample = response.text[:400]
-                raise RuntimeError(f"Download failed with {response.status_code}\nHeaders: {response.headers}\nBody (truncated): {body_sample}")
-            total_size = int(response.headers.get('content-length', 0))
-            with open(zip_path, 'wb') as f:
-                if total_size == 0:
-                    for chunk in response.iter_bytes(chunk_size=8192):
-                        f.write(chunk)
-                else:
-                    if show_progress:
-                        with Progress(
-                            SpinnerColumn(),
-                            TextColumn("[progress.description]{task.description}"),
-                            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-                            console=console,
-                        ) as progress:
-                            task = progress.add_task("Downloading...", total=total_size)
-                            downloaded = 0
-                            for chunk in response.iter_bytes(chunk_size=8192):
-                                f.write(chunk)
-                                downloaded += len(chunk)
-                                progress.update(task, completed=downloaded)
-                    else:
-                        for chunk in response.iter_bytes(chunk_size=8192):
-                            f.write(chunk)
-    except Exception as e:
+        # Never send a GitHub token to a mirror
+        headers = _github_auth_headers(github_token) if not metadata["mirror"] else {}
+        if show_progress and file_size:
+            from rich.progress import Progress, SpinnerColumn, TextColumn
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+                console=console,
+            ) as progress:
+                task = progress.add_task("Downloading...", total=file_size)
+                result = download_file(
+                    client,
+                    download_url,
+                    zip_path,
+                    size=file_size,
+                    headers=headers,
+                    progress=lambda done, total: progress.update(task, completed=done),
+                )
+        else:
+            result = download_file(client, download_url, zip_path, size=file_size, headers=headers)
+        download_etag = result["etag"]
+        metadata["resumed_bytes"] = result["resumed"]
+        metadata["downloaded_bytes"] = result["bytes"]
+        if verbose and result["resumed"]:
+            console.print(f"[cyan]Resumed partial download at[/cyan] {result['resumed']:,} bytes")
+        sha256 = file_sha256(zip_path)
+        if expected_sha256 and sha256 != expected_sha256:
+            zip_path.unlink(missing_ok=True)
+            raise RuntimeError(f"Checksum mismatch for {filename}: expected sha256 {expected_sha256}, got {sha256}")
+    except (DownloadError, RuntimeError, OSError) as e:
+        detail = str(e) or e.__class__.__name__
+        if not staged_in_cache:
+            discard_partial(zip_path)
+        elif isinstance(e, DownloadError):
+            detail += "\n\nThe partial download was kept; run the command again to resume it."
+        if not verbose:
+            raise TemplateError(detail, "Download Error") from e
         console.print(f"[red]Error downloading template[/red]")
-        detail = str(e)
-        if zip_path.exists():
-            zip_path.unlink()
         console.print(Panel(detail, title="Download Error", border_style="red"))
         raise typer.Exit(1)
     if verbose:
         console.print(f"Downloaded: {filename}")
-    metadata = {
-        "filename": filename,
-        "size": file_size,
-        "release": release_data["tag_name"],
-        "asset_url": download_url
-    }
+    if cache:
+        try:
+            zip_path = cache.store(release_data["tag_name"], filename, zip_path, sha256=sha256, etag=download_etag)
+            metadata["cached"] = True
+        except OSError as e:
+            if verbose:
+                console.print(f"[yellow]Warning:[/yellow] could not cache template: {e}")
     return zip_path, metadata
 
-def download_and_extract_template(project_path: Path, ai_assistant: str, script_type: str, is_current_dir: bool = False, *, verbose: bool = True, tracker: StepTracker | None = None, client: httpx.Client = None, debug: bool = False, github_token: str = None) -> Path:
-    """Download the latest release and extract it to create a new project.
+def download_and_extract_template(project_path: Path, ai_assistant: str, script_type: str, is_current_dir: bool = False, *, verbose: bool = True, tracker: StepTracker | None = None, client: "httpx.Client" = None, debug: bool = False, github_token: str = None, cache: TemplateCache | None = None, release_tag: str | None = None, source: "TemplateSource | None" = None) -> Path:
+    """Download the latest (or release_tag) release and extract it to create a new project.
     Returns project_path. Uses tracker if provided (with keys: fetch, download, extract, cleanup)
     """
     current_dir = Path.cwd()
+    if client is None:
+        client = _http_client()
 
     if tracker:
         tracker.start("fetch", "contacting GitHub API")
+        try:
+            release_data = fetch_release(client, tag=release_tag, verbose=False, debug=debug, github_token=github_token, cache=cache, source=source)
+        except typer.Exit:
+            tracker.error("fetch", "could not fetch release information")
+            raise
+        tracker.complete("fetch", f"release {release_data['tag_name']}")
+        tracker.add("download", "Download template")
+        tracker.start("download")
+    else:
+        release_data = None
     try:
         zip_path, meta = download_template_from_github(
             ai_assistant,
@@ -685,15 +1226,22 @@ def download_and_extract_template(project_path: Path, ai_assistant: str, script_
             show_progress=(tracker is None),
             client=client,
             debug=debug,
-            github_token=github_token
+            github_token=github_token,
+            cache=cache,
+            release_data=release_data,
+            release_tag=release_tag,
+            source=source,
         )
         if tracker:
-            tracker.complete("fetch", f"release {meta['release']} ({meta['size']:,} bytes)")
-            tracker.add("download", "Download template")
-            tracker.complete("download", meta['filename'])
+            detail = f"{meta['filename']} ({meta['size']:,} bytes)"
+            if meta["cache_hit"]:
+                detail += " (cached)"
+            elif meta["mirror"]:
+                detail += " (mirror)"
+            tracker.complete("download", detail, bytes=meta["downloaded_bytes"], files=1)
     except Exception as e:
         if tracker:
-            tracker.error("fetch", str(e))
+            tracker.error("download", str(e))
         else:
             if verbose:
                 console.print(f"[red]Error downloading template:[/red] {e}")
@@ -706,6 +1254,8 @@ def download_and_extract_template(project_path: Path, ai_assistant: str, script_
         console.print("Extracting template...")
 
     try:
+        import zipfile
+
         if not is_current_dir:
             project_path.mkdir(parents=True)
 
@@ -717,78 +1267,33 @@ def download_and_extract_template(project_path: Path, ai_assistant: str, script_
             elif verbose:
                 console.print(f"[cyan]ZIP contains {len(zip_contents)} items[/cyan]")
 
-            if is_current_dir:
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    temp_path = Path(temp_dir)
-                    zip_ref.extractall(temp_path)
-
-                    extracted_items = list(temp_path.iterdir())
-                    if tracker:
-                        tracker.start("extracted-summary")
-                        tracker.complete("extracted-summary", f"temp {len(extracted_items)} items")
-                    elif verbose:
-                        console.print(f"[cyan]Extracted {len(extracted_items)} items to temp location[/cyan]")
-
-                    source_dir = temp_path
-                    if len(extracted_items) == 1 and extracted_items[0].is_dir():
-                        source_dir = extracted_items[0]
-                        if tracker:
-                            tracker.add("flatten", "Flatten nested directory")
-                            tracker.complete("flatten")
-                        elif verbose:
-                            console.print(f"[cyan]Found nested directory structure[/cyan]")
-
-                    for item in source_dir.iterdir():
-                        dest_path = project_path / item.name
-                        if item.is_dir():
-                            if dest_path.exists():
-                                if verbose and not tracker:
-                                    console.print(f"[yellow]Merging directory:[/yellow] {item.name}")
-                                for sub_item in item.rglob('*'):
-                                    if sub_item.is_file():
-                                        rel_path = sub_item.relative_to(item)
-                                        dest_file = dest_path / rel_path
-                                        dest_file.parent.mkdir(parents=True, exist_ok=True)
-                                        # Special handling for .vscode/settings.json - merge instead of overwrite
-                                        if dest_file.name == "settings.json" and dest_file.parent.name == ".vscode":
-                                            handle_vscode_settings(sub_item, dest_file, rel_path, verbose, tracker)
-                                        else:
-                                            shutil.copy2(sub_item, dest_file)
-                            else:
-                                shutil.copytree(item, dest_path)
-                        else:
-                            if dest_path.exists() and verbose and not tracker:
-                                console.print(f"[yellow]Overwriting file:[/yellow] {item.name}")
-                            shutil.copy2(item, dest_path)
-                    if verbose and not tracker:
-                        console.print(f"[cyan]Template files merged into current directory[/cyan]")
-            else:
-                zip_ref.extractall(project_path)
-
-                extracted_items = list(project_path.iterdir())
+            summary = extract_template_archive(zip_ref, project_path, merge=is_current_dir, verbose=verbose, tracker=tracker)
+            top_level = summary["top_level"]
+            if tracker:
+                tracker.start("extracted-summary")
+                tracker.complete("extracted-summary", f"{summary['files']} files, {len(top_level)} top-level items")
+            elif verbose:
+                console.print(f"[cyan]Extracted {summary['files']} files to {project_path}:[/cyan]")
+                if summary["identical"]:
+                    console.print(f"[cyan]{summary['identical']} identical files left untouched[/cyan]")
+                if summary["executables"]:
+                    console.print(f"[cyan]Set execute permissions on {summary['executables']} script(s)[/cyan]")
+                for name, is_dir in top_level.items():
+                    console.print(f"  - {name} ({'dir' if is_dir else 'file'})")
+
+            if summary["flattened"]:
                 if tracker:
-                    tracker.start("extracted-summary")
-                    tracker.complete("extracted-summary", f"{len(extracted_items)} top-level items")
+                    tracker.add("flatten", "Flatten nested directory")
+                    tracker.complete("flatten")
                 elif verbose:
-                    console.print(f"[cyan]Extracted {len(extracted_items)} items to {project_path}:[/cyan]")
-                    for item in extracted_items:
-                        console.print(f"  - {item.name} ({'dir' if item.is_dir() else 'file'})")
-
-                if len(extracted_items) == 1 and extracted_items[0].is_dir():
-                    nested_dir = extracted_items[0]
-                    temp_move_dir = project_path.parent / f"{project_path.name}_temp"
+                    console.print(f"[cyan]Flattened nested directory structure[/cyan]")
 
-                    shutil.move(str(nested_dir), str(temp_move_dir))
-
-                    project_path.rmdir()
-
-                    shutil.move(str(temp_move_dir), str(project_path))
-                    if tracker:
-                        tracker.add("flatten", "Flatten nested directory")
-                        tracker.complete("flatten")
-                    elif verbose:
-                        console.print(f"[cyan]Flattened nested directory structure[/cyan]")
+            if is_current_dir and verbose and not tracker:
+                console.print(f"[cyan]Template files merged into current directory[/cyan]")
 
+        # Record what the template shipped so `specify upgrade` can spot local edits later
+        from .manifest import write_manifest
+        write_manifest(project_path, release=meta["release"], ai=ai_assistant, script=script_type, files=summary["hashes"])
     except Exception as e:
         if tracker:
             tracker.error("extract", str(e))
@@ -803,12 +1308,20 @@ def download_and_extract_template(project_path: Path, ai_assistant: str, script_
         raise typer.Exit(1)
     else:
         if tracker:
-            tracker.complete("extract")
+            notes = []
+            if summary["identical"]:
+                notes.append(f"{summary['identical']} identical files left untouched")
+            if summary["executables"]:
+                notes.append(f"{summary['executables']} script(s) made executable")
+            tracker.complete("extract", ", ".join(notes), bytes=summary["bytes"], files=summary["files"])
     finally:
         if tracker:
             tracker.add("cleanup", "Remove temporary archive")
 
-        if zip_path.exists():
+        if meta["cached"]:
+            if tracker:
+                tracker.skip("cleanup", "archive kept in cache")
+        elif zip_path.exists():
             zip_path.unlink()
             if tracker:
                 tracker.complete("cleanup")
@@ -818,49 +1331,76 @@ def download_and_extract_template(project_path: Path, ai_assistant: str, script_
     return project_path
 
 
-def ensure_executable_scripts(project_path: Path, tracker: StepTracker | None = None) -> None:
-    """Ensure POSIX .sh scripts under .specify/scripts (recursively) have execute bits (no-op on Windows)."""
-    if os.name == "nt":
-        return  # Windows: skip silently
-    scripts_root = project_path / ".specify" / "scripts"
-    if not scripts_root.is_dir():
-        return
-    failures: list[str] = []
-    updated = 0
-    for script in scripts_root.rglob("*.sh"):
+def preview_template_merge(project_path: Path, ai_assistant: str, script_type: str, *, client: "httpx.Client", debug: bool = False, github_token: str = None, cache: TemplateCache | None = None, release_tag: str | None = None, source: "TemplateSource | None" = None) -> None:
+    """Print what merging the template into project_path would do, without writing to it."""
+    import zipfile
+
+    from .merge import merge_counts, plan_merge, render_merge_plan
+
+    with console.status(f"[cyan]Fetching release {release_tag or '(latest)'}...[/cyan]"):
+        release_data = fetch_release(client, tag=release_tag, verbose=False, debug=debug, github_token=github_token, cache=cache, source=source)
+    try:
+        zip_path, meta = download_template_from_github(
+            ai_assistant,
+            Path.cwd(),
+            script_type=script_type,
+            verbose=False,
+            client=client,
+            debug=debug,
+            github_token=github_token,
+            cache=cache,
+            release_data=release_data,
+            source=source,
+        )
+    except TemplateError as e:
+        console.print(Panel(str(e), title=e.title, border_style="red"))
+        raise typer.Exit(1)
+    try:
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            entries = plan_merge(zip_ref, project_path)
+    finally:
+        if not meta["cached"]:
+            zip_path.unlink(missing_ok=True)
+
+    counts = merge_counts(entries)
+    console.print(render_merge_plan(entries, title=f"Merge plan for {project_path.name} ({release_data['tag_name']})"))
+    console.print(
+        f"{counts['new']} new, {counts['changed']} changed, {counts['merge']} merged, "
+        f"{counts['identical']} identical [dim](dry run: nothing written)[/dim]"
+    )
+
+def print_profile(tracker: StepTracker, json_path: Path | None = None) -> None:
+    """Print a per-step duration breakdown and optionally write it as JSON."""
+    from rich.table import Table
+
+    profile = tracker.profile()
+    total = profile["total"] or 1e-9
+    table = Table(title=f"{tracker.title} - profile", border_style="cyan")
+    table.add_column("Step")
+    table.add_column("Status")
+    table.add_column("Duration", justify="right")
+    table.add_column("Share", justify="right")
+    table.add_column("Bytes", justify="right")
+    table.add_column("Files", justify="right")
+    for step in profile["steps"]:
+        duration = step["duration"]
+        table.add_row(
+            step["label"],
+            step["status"],
+            "-" if duration is None else f"{duration * 1000:,.1f} ms",
+            "-" if duration is None else f"{duration / total:.0%}",
+            "-" if step["bytes"] is None else _format_bytes(step["bytes"]),
+            "-" if step["files"] is None else f"{step['files']:,}",
+        )
+    console.print(table)
+    console.print(f"[dim]Total {profile['total'] * 1000:,.1f} ms[/dim]")
+
+    if json_path:
         try:
-            if script.is_symlink() or not script.is_file():
-                continue
-            try:
-                with script.open("rb") as f:
-                    if f.read(2) != b"#!":
-                        continue
-            except Exception:
-                continue
-            st = script.stat(); mode = st.st_mode
-            if mode & 0o111:
-                continue
-            new_mode = mode
-            if mode & 0o400: new_mode |= 0o100
-            if mode & 0o040: new_mode |= 0o010
-            if mode & 0o004: new_mode |= 0o001
-            if not (new_mode & 0o100):
-                new_mode |= 0o100
-            os.chmod(script, new_mode)
-            updated += 1
-        except Exception as e:
-            failures.append(f"{script.relative_to(scripts_root)}: {e}")
-    if tracker:
-        detail = f"{updated} updated" + (f", {len(failures)} failed" if failures else "")
-        tracker.add("chmod", "Set script permissions recursively")
-        (tracker.error if failures else tracker.complete)("chmod", detail)
-    else:
-        if updated:
-            console.print(f"[cyan]Updated execute permissions on {updated} script(s) recursively[/cyan]")
-        if failures:
-            console.print("[yellow]Some scripts could not be updated:[/yellow]")
-            for f in failures:
-                console.print(f"  - {f}")
+            json_path.write_text(json.dumps(profile, indent=2) + "\n", encoding="utf-8")
+            console.print(f"[dim]Profile written to {json_path}[/dim]")
+        except OSError as e:
+            console.print(f"[yellow]Warning:[/yellow] could not write profile to {json_path}: {e}")
 
 @app.command()
 def init(
@@ -874,6 +1414,15 @@ def init(
     skip_tls: bool = typer.Option(False, "--skip-tls", help="Skip SSL/TLS verification (not recommended)"),
     debug: bool = typer.Option(False, "--debug", help="Show verbose diagnostic output for network and extraction failures"),
     github_token: str = typer.Option(None, "--github-token", help="GitHub token to use for API requests (or set GH_TOKEN or GITHUB_TOKEN environment variable)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the local template cache and always download from GitHub"),
+    batch: Path = typer.Option(None, "--batch", help="Initialize every project listed in a JSON or TOML manifest", exists=True, dir_okay=False),
+    jobs: int = typer.Option(None, "--jobs", min=1, help="Number of parallel workers for --batch (default: CPU count + 4, max 32)"),
+    pool: str = typer.Option("thread", "--pool", help="Worker pool for --batch: thread or process"),
+    release: str = typer.Option(None, "--release", help="Use this release tag (e.g. v0.0.20) instead of the latest; served from the local cache once downloaded"),
+    template_source: str = typer.Option(None, "--template-source", envvar="SPECIFY_TEMPLATE_SOURCE", help="Resolve templates from a mirror (directory, file:// URI or HTTP base URL serving a `specify mirror sync` index) instead of GitHub"),
+    profile: bool = typer.Option(False, "--profile", help="Print how long each step took"),
+    profile_json: Path = typer.Option(None, "--profile-json", help="Also write the step timings to this JSON file (implies --profile)", dir_okay=False),
+    dry_run: bool = typer.Option(False, "--dry-run", help="With --here, list which template files would be added, changed, merged or left untouched, without writing anything"),
 ):
     """
     Initialize a new Specify project from the latest template.
@@ -898,10 +1447,39 @@ def init(
         specify init --here --ai codebuddy
         specify init --here
         specify init --here --force  # Skip confirmation when current directory not empty
+        specify init --here --ai claude --dry-run  # Preview which files --here would touch
+        specify init --batch projects.toml --jobs 8
+        specify init my-project --ai claude --release v0.0.20
+        specify init my-project --ai claude --template-source http://mirror.internal/spec-kit/
+        specify init my-project --ai claude --profile-json init-profile.json
     """
 
     show_banner()
 
+    source = None
+    if template_source:
+        from .mirror import TemplateSource
+        source = TemplateSource(template_source)
+
+    if batch:
+        if project_name or here:
+            console.print("[red]Error:[/red] Cannot combine --batch with a project name or --here flag")
+            raise typer.Exit(1)
+        from .batch import run_batch_init
+        run_batch_init(
+            batch,
+            jobs=jobs,
+            pool=pool,
+            ignore_agent_tools=ignore_agent_tools,
+            skip_tls=skip_tls,
+            debug=debug,
+            github_token=github_token,
+            no_cache=no_cache,
+            release_tag=release,
+            source=source,
+        )
+        return
+
     if project_name == ".":
         here = True
         project_name = None  # Clear project_name to use existing validation logic
@@ -914,6 +1492,10 @@ def init(
         console.print("[red]Error:[/red] Must specify either a project name, use '.' for current directory, or use --here flag")
         raise typer.Exit(1)
 
+    if dry_run and not here:
+        console.print("[red]Error:[/red] --dry-run previews a merge and requires --here (or '.')")
+        raise typer.Exit(1)
+
     if here:
         project_name = Path.cwd().name
         project_path = Path.cwd()
@@ -922,7 +1504,9 @@ def init(
         if existing_items:
             console.print(f"[yellow]Warning:[/yellow] Current directory is not empty ({len(existing_items)} items)")
             console.print("[yellow]Template files will be merged with existing content and may overwrite existing files[/yellow]")
-            if force:
+            if dry_run:
+                console.print("[cyan]--dry-run supplied: nothing will be written[/cyan]")
+            elif force:
                 console.print("[cyan]--force supplied: skipping confirmation and proceeding with merge[/cyan]")
             else:
                 response = typer.confirm("Do you want to continue?")
@@ -1011,6 +1595,20 @@ def init(
     console.print(f"[cyan]Selected AI assistant:[/cyan] {selected_ai}")
     console.print(f"[cyan]Selected script type:[/cyan] {selected_script}")
 
+    if dry_run:
+        preview_template_merge(
+            project_path,
+            selected_ai,
+            selected_script,
+            client=_http_client(verify=not skip_tls),
+            debug=debug,
+            github_token=github_token,
+            cache=None if no_cache else TemplateCache(),
+            release_tag=release,
+            source=source,
+        )
+        return
+
     tracker = StepTracker("Initialize Specify Project")
 
     sys._specify_tracker_active = True
@@ -1022,12 +1620,11 @@ def init(
     tracker.add("script-select", "Select script type")
     tracker.complete("script-select", selected_script)
     for key, label in [
-        ("fetch", "Fetch latest release"),
+        ("fetch", (f"Fetch release {release}" if release else "Fetch latest release") + (" from mirror" if source else "")),
         ("download", "Download template"),
         ("extract", "Extract template"),
         ("zip-list", "Archive contents"),
         ("extracted-summary", "Extraction summary"),
-        ("chmod", "Ensure scripts executable"),
         ("cleanup", "Cleanup"),
         ("git", "Initialize git repository"),
         ("final", "Finalize")
@@ -1037,26 +1634,24 @@ def init(
     # Track git error message outside Live context so it persists
     git_error_message = None
 
-    with Live(tracker.render(), console=console, refresh_per_second=8, transient=True) as live:
-        tracker.attach_refresh(lambda: live.update(tracker.render()))
-        try:
-            verify = not skip_tls
-            local_ssl_context = ssl_context if verify else False
-            local_client = httpx.Client(verify=local_ssl_context)
+    from rich.live import Live
 
-            download_and_extract_template(project_path, selected_ai, selected_script, here, verbose=False, tracker=tracker, client=local_client, debug=debug, github_token=github_token)
+    # Live pulls the tree at its own refresh rate; tracker updates only mark it dirty
+    with Live(console=console, refresh_per_second=8, transient=True, get_renderable=tracker.renderable):
+        try:
+            local_client = _http_client(verify=not skip_tls)
 
-            ensure_executable_scripts(project_path, tracker=tracker)
+            template_cache = None if no_cache else TemplateCache()
+            download_and_extract_template(project_path, selected_ai, selected_script, here, verbose=False, tracker=tracker, client=local_client, debug=debug, github_token=github_token, cache=template_cache, release_tag=release, source=source)
 
             if not no_git:
                 tracker.start("git")
                 if is_git_repo(project_path):
                     tracker.complete("git", "existing repo detected")
                 elif should_init_git:
-                    success, error_msg = init_git_repo(project_path, quiet=True)
-                    if success:
-                        tracker.complete("git", "initialized")
-                    else:
+                    from .manifest import manifest_files
+                    success, error_msg = init_git_repo(project_path, quiet=True, files=manifest_files(project_path), tracker=tracker)
+                    if not success:
                         tracker.error("git", "init failed")
                         git_error_message = error_msg
                 else:
@@ -1079,12 +1674,17 @@ def init(
                 console.print(Panel("\n".join(env_lines), title="Debug Environment", border_style="magenta"))
             if not here and project_path.exists():
                 shutil.rmtree(project_path)
+            if profile or profile_json:
+                print_profile(tracker, profile_json)
             raise typer.Exit(1)
         finally:
             pass
 
     console.print(tracker.render())
     console.print("\n[bold green]Project ready.[/bold green]")
+    if profile or profile_json:
+        console.print()
+        print_profile(tracker, profile_json)
     
     # Show git error details if initialization failed
     if git_error_message:
@@ -1161,15 +1761,43 @@ def init(
     console.print(enhancements_panel)
 
 @app.command()
-def check():
+def check(
+    versions: bool = typer.Option(False, "--versions", help="Also report the --version output of each installed tool"),
+    refresh: bool = typer.Option(False, "--refresh", help="Ignore cached results, rescan PATH and update the cache"),
+    profile: bool = typer.Option(False, "--profile", help="Print how long each phase of the check took"),
+    profile_json: Path = typer.Option(None, "--profile-json", help="Also write the phase timings to this JSON file (implies --profile)", dir_okay=False),
+):
     """Check that all required tools are installed."""
     show_banner()
     console.print("[bold]Checking for installed tools...[/bold]\n")
 
+    # Phases are timed separately from the per-tool tree, which is filled from cached results
+    timings = StepTracker("Check")
+    timings.add("probe-cache", "Load probe cache")
+    timings.add("resolve", "Resolve tools on PATH")
+    if versions:
+        timings.add("versions", "Query tool versions")
+    timings.add("report", "Build report")
+
+    # Resolve every tool in one parallel pass; check_tool below then reads the results
+    cli_tools = ["git"] + [key for key, config in AGENT_CONFIG.items() if config["requires_cli"]] + ["code", "code-insiders"]
+    timings.start("probe-cache")
+    prober = get_tool_prober(refresh=refresh)
+    timings.complete("probe-cache", "refresh" if refresh else "", files=len(prober.dirs))
+    timings.start("resolve")
+    found = prober.probe(cli_tools)
+    timings.complete("resolve", f"{sum(1 for r in found.values() if r['path'])} of {len(cli_tools)} found", files=len(cli_tools))
+    if versions:
+        timings.start("versions")
+        prober.probe(cli_tools, versions=True)
+        timings.complete("versions")
+    prober.save()
+
+    timings.start("report")
     tracker = StepTracker("Check Available Tools")
 
     tracker.add("git", "Git version control")
-    git_ok = check_tool("git", tracker=tracker)
+    git_ok = check_tool("git", tracker=tracker, versions=versions)
 
     agent_results = {}
     for agent_key, agent_config in AGENT_CONFIG.items():
@@ -1179,7 +1807,7 @@ def check():
         tracker.add(agent_key, agent_name)
 
         if requires_cli:
-            agent_results[agent_key] = check_tool(agent_key, tracker=tracker)
+            agent_results[agent_key] = check_tool(agent_key, tracker=tracker, versions=versions)
         else:
             # IDE-based agent - skip CLI check and mark as optional
             tracker.skip(agent_key, "IDE-based, no CLI check")
@@ -1187,12 +1815,13 @@ def check():
 
     # Check VS Code variants (not in agent config)
     tracker.add("code", "Visual Studio Code")
-    code_ok = check_tool("code", tracker=tracker)
+    code_ok = check_tool("code", tracker=tracker, versions=versions)
 
     tracker.add("code-insiders", "Visual Studio Code Insiders")
-    code_insiders_ok = check_tool("code-insiders", tracker=tracker)
+    code_insiders_ok = check_tool("code-insiders", tracker=tracker, versions=versions)
 
     console.print(tracker.render())
+    timings.complete("report")
 
     console.print("\n[bold green]Specify CLI is ready to use![/bold green]")
 
@@ -1202,6 +1831,893 @@ def check():
     if not any(agent_results.values()):
         console.print("[dim]Tip: Install an AI assistant for the best experience[/dim]")
 
+    if profile or profile_json:
+        console.print()
+        print_profile(timings, profile_json)
+
+@app.command()
+def upgrade(
+    project_path: Path = typer.Argument(Path("."), help="Project to upgrade (default: current directory)", exists=True, file_okay=False),
+    release: str = typer.Option(None, "--release", help="Upgrade to this release tag instead of the latest"),
+    template_source: str = typer.Option(None, "--template-source", envvar="SPECIFY_TEMPLATE_SOURCE", help="Resolve templates from a mirror instead of GitHub (see `specify mirror sync`)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Show what would change without writing anything"),
+    skip_tls: bool = typer.Option(False, "--skip-tls", help="Skip SSL/TLS verification (not recommended)"),
+    debug: bool = typer.Option(False, "--debug", help="Show verbose diagnostic output for network failures"),
+    github_token: str = typer.Option(None, "--github-token", help="GitHub token to use for API requests (or set GH_TOKEN or GITHUB_TOKEN environment variable)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the local template cache and always download from GitHub"),
+):
+    """Move a project to a newer template release without overwriting local edits.
+
+    Compares the hashes recorded in .specify/manifest.json at init time with the
+    new template and the working tree. Files changed upstream and untouched
+    locally are updated; files edited on both sides are reported as conflicts
+    and left as they are, with the new version saved alongside as <file>.upstream.
+
+    Examples:
+        specify upgrade
+        specify upgrade --dry-run
+        specify upgrade path/to/project --release v0.0.20
+    """
+    import zipfile
+
+    from .manifest import MANIFEST_PATH, ManifestError, load_manifest
+    from .upgrade import apply_upgrade, counts, plan_upgrade, render_plan
+
+    project_path = project_path.resolve()
+    try:
+        manifest = load_manifest(project_path)
+    except ManifestError as e:
+        console.print(Panel(str(e), title="Manifest Error", border_style="red"))
+        raise typer.Exit(1)
+    if manifest is None:
+        console.print(Panel(
+            f"{project_path} has no {MANIFEST_PATH}.\n"
+            "It was created before manifests were recorded; re-run [cyan]specify init --here --force[/cyan] once to start tracking it.",
+            title="Nothing to Upgrade",
+            border_style="red",
+        ))
+        raise typer.Exit(1)
+
+    source = None
+    if template_source:
+        from .mirror import TemplateSource
+        source = TemplateSource(template_source)
+
+    client = _http_client(verify=not skip_tls)
+    template_cache = None if no_cache else TemplateCache()
+    with console.status(f"[cyan]Fetching release {release or '(latest)'}...[/cyan]"):
+        release_data = fetch_release(client, tag=release, verbose=False, debug=debug, github_token=github_token, cache=template_cache, source=source)
+    new_release = release_data["tag_name"]
+    if new_release == manifest["release"]:
+        console.print(f"[green]Already on {new_release}[/green] ({manifest['ai']}, {manifest['script']})")
+        return
+
+    try:
+        zip_path, meta = download_template_from_github(
+            manifest["ai"],
+            Path.cwd(),
+            script_type=manifest["script"],
+            verbose=False,
+            client=client,
+            debug=debug,
+            github_token=github_token,
+            cache=template_cache,
+            release_data=release_data,
+            source=source,
+        )
+    except TemplateError as e:
+        console.print(Panel(str(e), title=e.title, border_style="red"))
+        raise typer.Exit(1)
+    try:
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            changes = plan_upgrade(project_path, zip_ref, manifest)
+            if not dry_run:
+                apply_upgrade(project_path, zip_ref, manifest, changes, release=new_release)
+    except (OSError, zipfile.BadZipFile) as e:
+        console.print(Panel(str(e), title="Upgrade Failed", border_style="red"))
+        raise typer.Exit(1)
+    finally:
+        if not meta["cached"]:
+            zip_path.unlink(missing_ok=True)
+
+    tally = counts(changes)
+    verb = "Would upgrade" if dry_run else "Upgraded"
+    console.print(render_plan(changes, title=f"{verb} {manifest['release']} → {new_release}"))
+    console.print(
+        f"{tally['update'] + tally['add']} written, {tally['merge']} merged, {tally['remove']} removed, "
+        f"{tally['current'] + tally['unchanged']} unchanged, {tally['skip']} skipped, "
+        f"[{'red' if tally['conflict'] else 'green'}]{tally['conflict']} conflict(s)[/]"
+        + (" [dim](dry run)[/dim]" if dry_run else "")
+    )
+    if tally["conflict"]:
+        if dry_run:
+            console.print("[yellow]Conflicting files would be left as they are, with the new template version written alongside as <file>.upstream.[/yellow]")
+        else:
+            console.print("[yellow]Conflicting files were left as they are; merge in the <file>.upstream copies by hand and delete them.[/yellow]")
+        raise typer.Exit(1)
+
+@app.command("build-templates")
+def build_templates(
+    version: str = typer.Argument(..., help="Release version including the leading 'v' (e.g. v0.0.21)"),
+    agents: str = typer.Option(None, "--agents", envvar="AGENTS", help="Comma or space separated subset of agents to build (default: all)"),
+    scripts: str = typer.Option(None, "--scripts", envvar="SCRIPTS", help="Comma or space separated subset of script types: sh, ps (default: both)"),
+    source_dir: Path = typer.Option(Path("."), "--source-dir", help="spec-kit source checkout containing memory/, scripts/ and templates/"),
+    output_dir: Path = typer.Option(Path(".genreleases"), "--output-dir", help="Directory for package trees and zip archives (emptied first)"),
+    jobs: int = typer.Option(None, "--jobs", min=1, help="Number of variants to build in parallel"),
+):
+    """Build the release template packages for every agent and script type."""
+    from .build import ALL_AGENTS, ALL_SCRIPTS, BuildError, ReleaseBuilder, parse_selection
+
+    try:
+        agent_list = parse_selection(agents, ALL_AGENTS, "agent")
+        script_list = parse_selection(scripts, ALL_SCRIPTS, "script")
+        builder = ReleaseBuilder(source_dir, output_dir, version)
+    except BuildError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+    console.print(f"[cyan]Building release packages for {version}[/cyan]")
+    console.print(f"[cyan]Agents:[/cyan] {' '.join(agent_list)}")
+    console.print(f"[cyan]Scripts:[/cyan] {' '.join(script_list)}")
+
+    started = time.perf_counter()
+    archives = builder.build(agent_list, script_list, jobs=jobs)
+    elapsed = time.perf_counter() - started
+
+    console.print(f"Archives in {output_dir}:")
+    for archive in archives:
+        console.print(f"  {archive}")
+    console.print(f"[green]Built {len(archives)} package(s) in {elapsed:.2f}s[/green]")
+
+cache_app = typer.Typer(
+    name="cache",
+    help="Manage the local template cache",
+    add_completion=False,
+)
+app.add_typer(cache_app, name="cache")
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+
+@cache_app.command("list")
+def cache_list():
+    """List cached template archives, most recently used first."""
+    from rich.table import Table
+
+    template_cache = TemplateCache()
+    entries = template_cache.entries()
+    if not entries:
+        console.print(f"[dim]Template cache is empty ({template_cache.root})[/dim]")
+        return
+
+    table = Table(title="Cached Templates", border_style="cyan")
+    table.add_column("Release", style="cyan")
+    table.add_column("Asset")
+    table.add_column("Size", justify="right")
+    table.add_column("SHA-256", style="dim")
+    table.add_column("Last Used", style="dim")
+    for entry in entries:
+        last_used = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.get("last_used", 0)))
+        table.add_row(entry["tag"], entry["asset"], _format_bytes(entry["size"]), entry["sha256"][:12], last_used)
+    console.print(table)
+    console.print(f"[dim]{template_cache.root} - {_format_bytes(template_cache.total_bytes())} of {_format_bytes(template_cache.max_bytes)}[/dim]")
+
+@cache_app.command("prune")
+def cache_prune(
+    max_size: int = typer.Option(None, "--max-size", help="Size limit in MB (defaults to SPECIFY_CACHE_MAX_MB or 200)"),
+):
+    """Evict least recently used archives until the cache fits its size limit."""
+    template_cache = TemplateCache()
+    max_bytes = max_size * 1024 * 1024 if max_size is not None else None
+    removed, orphans = template_cache.prune(max_bytes=max_bytes)
+    for entry in removed:
+        console.print(f"[yellow]Evicted:[/yellow] {entry['tag']}/{entry['asset']} ({_format_bytes(entry['size'])})")
+    if orphans:
+        console.print(f"[yellow]Removed {orphans} orphaned file(s)[/yellow]")
+    console.print(f"[green]Cache size:[/green] {_format_bytes(template_cache.total_bytes())}")
+
+@cache_app.command("clear")
+def cache_clear():
+    """Remove every cached template archive and release record."""
+    template_cache = TemplateCache()
+    freed = template_cache.clear()
+    console.print(f"[green]Cleared template cache[/green] ({_format_bytes(freed)} freed)")
+
+mirror_app = typer.Typer(
+    name="mirror",
+    help="Maintain a template mirror for offline installs",
+    add_completion=False,
+)
+app.add_typer(mirror_app, name="mirror")
+
+@mirror_app.command("sync")
+def mirror_sync(
+    directory: Path = typer.Argument(..., help="Mirror directory (created if missing)", file_okay=False),
+    release: list[str] = typer.Option(None, "--release", help="Mirror this release tag (repeatable; default: the latest release)"),
+    all_releases: bool = typer.Option(False, "--all", help="Mirror every published release"),
+    jobs: int = typer.Option(8, "--jobs", min=1, help="Number of parallel downloads"),
+    skip_tls: bool = typer.Option(False, "--skip-tls", help="Skip SSL/TLS verification (not recommended)"),
+    github_token: str = typer.Option(None, "--github-token", help="GitHub token to use for API requests (or set GH_TOKEN or GITHUB_TOKEN environment variable)"),
+):
+    """Download release template assets and a checksummed index into a directory.
+
+    Serve the directory (e.g. `python -m http.server`) or share it, and point
+    `specify init --template-source` at it.
+    """
+    from .mirror import INDEX_NAME, MirrorError, sync_mirror
+
+    if release and all_releases:
+        console.print("[red]Error:[/red] Use either --release or --all, not both")
+        raise typer.Exit(1)
+
+    def report(tag: str, name: str, outcome: str):
+        if outcome == "downloaded":
+            console.print(f"[green]Downloaded[/green] {tag}/{name}")
+        elif outcome != "unchanged":
+            console.print(f"[red]Failed[/red] {tag}/{name}: {outcome[len('failed: '):]}")
+
+    client = _http_client(verify=not skip_tls)
+    start = time.perf_counter()
+    try:
+        summary = sync_mirror(
+            directory,
+            client,
+            headers=_github_auth_headers(github_token),
+            tags=release or None,
+            all_releases=all_releases,
+            jobs=jobs,
+            on_asset=report,
+        )
+    except (MirrorError, OSError) as e:
+        console.print(Panel(str(e), title="Mirror Error", border_style="red"))
+        raise typer.Exit(1)
+
+    console.print(
+        f"\n[bold]{summary['releases']}[/bold] release(s): {summary['downloaded']} downloaded "
+        f"({_format_bytes(summary['bytes'])}), {summary['unchanged']} unchanged, {len(summary['failed'])} failed "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    console.print(f"[dim]Index: {directory / INDEX_NAME}[/dim]")
+    if summary["failed"]:
+        raise typer.Exit(1)
+
+features_app = typer.Typer(
+    name="features",
+    help="Look up feature directories under specs/ through a cached index",
+    add_completion=False,
+)
+app.add_typer(features_app, name="features")
+
+_FEATURES_ROOT_HELP = "Project root (default: the nearest directory containing .specify or .git)"
+
+def _select_feature(ref: Optional[str], root: Optional[Path]) -> tuple[Path, Path]:
+    """Project root and feature directory for a name or numeric prefix, or for the current feature."""
+    from .features import load_index, resolve_feature
+
+    if ref is None:
+        feature = resolve_feature(root)
+        project_root, feature_dir = feature["root"], feature["feature_dir"]
+    else:
+        index = load_index(root)
+        matches = index.find(ref)
+        if len(matches) != 1:
+            problem = f"Multiple spec directories found for '{ref}': {' '.join(matches)}" if matches else f"No spec directory found for '{ref}'"
+            typer.echo(f"ERROR: {problem}", err=True)
+            raise typer.Exit(1)
+        project_root, feature_dir = index.root, index.specs_dir / matches[0]
+    if not feature_dir.is_dir():
+        typer.echo(f"ERROR: Feature directory not found: {feature_dir}", err=True)
+        raise typer.Exit(1)
+    return project_root, feature_dir
+
+@features_app.command("list")
+def features_list(
+    json_output: bool = typer.Option(False, "--json", help="Print the features as JSON"),
+    root: Path = typer.Option(None, "--root", help=_FEATURES_ROOT_HELP, file_okay=False),
+):
+    """List every feature with the artifacts it has."""
+    from .features import load_index
+
+    features = load_index(root, artifacts=True).features()
+    if json_output:
+        typer.echo(json.dumps(features, indent=2))
+        return
+    if not features:
+        console.print("[yellow]No feature directories under specs/[/yellow]")
+        return
+
+    from rich.table import Table
+
+    table = Table(title="Features", border_style="cyan", show_lines=False)
+    table.add_column("#", justify="right", style="cyan")
+    table.add_column("Feature")
+    table.add_column("Artifacts", overflow="fold")
+    table.add_column("Modified", style="bright_black")
+    for feature in features:
+        modified = time.strftime("%Y-%m-%d %H:%M", time.localtime(feature["modified"])) if feature["modified"] else "-"
+        table.add_row(f"{feature['number']:03d}", feature["name"], ", ".join(feature["artifacts"]) or "[bright_black]-[/bright_black]", modified)
+    console.print(table)
+
+@features_app.command("find")
+def features_find(
+    ref: str = typer.Argument(..., help="Branch name or numeric prefix, e.g. 004-fix-login or 004"),
+    root: Path = typer.Option(None, "--root", help=_FEATURES_ROOT_HELP, file_okay=False),
+):
+    """Print the directory of the feature sharing a branch's numeric prefix."""
+    from .features import load_index
+
+    index = load_index(root)
+    matches = index.find(ref)
+    if len(matches) == 1:
+        typer.echo(index.specs_dir / matches[0])
+        return
+    if matches:
+        typer.echo(f"ERROR: Multiple spec directories found for '{ref}': {' '.join(matches)}", err=True)
+    else:
+        typer.echo(f"ERROR: No spec directory found for '{ref}'", err=True)
+    raise typer.Exit(1)
+
+@features_app.command("latest")
+def features_latest(
+    root: Path = typer.Option(None, "--root", help=_FEATURES_ROOT_HELP, file_okay=False),
+):
+    """Print the name of the highest-numbered feature."""
+    from .features import load_index
+
+    latest = load_index(root).latest()
+    if latest is None:
+        raise typer.Exit(1)
+    typer.echo(latest)
+
+@features_app.command("next")
+def features_next(
+    short_name: str = typer.Option(None, "--short-name", help="Only count features and branches named NNN-<short-name>"),
+    refresh_remotes: bool = typer.Option(False, "--refresh-remotes", help="Re-list remote branches even if the cached snapshot is fresh"),
+    offline: bool = typer.Option(False, "--offline", help="Never contact remotes; use the cached snapshot as is"),
+    root: Path = typer.Option(None, "--root", help=_FEATURES_ROOT_HELP, file_okay=False),
+):
+    """Print the next free feature number, zero-padded (e.g. 012).
+
+    In a git repository local, remote-tracking and remote branches count too;
+    remote branches come from a snapshot refreshed every SPECIFY_REMOTE_REFS_TTL
+    seconds (default 300).
+    """
+    from .numbering import next_feature_number
+
+    result = next_feature_number(root, short_name=short_name, refresh_remotes=refresh_remotes, offline=offline)
+    if result["unreachable"]:
+        typer.echo(f"WARNING: Could not list branches on {', '.join(result['unreachable'])}; using the cached snapshot", err=True)
+    typer.echo(f"{result['number']:03d}")
+
+@features_app.command("show")
+def features_show(
+    ref: str = typer.Argument(None, help="Feature name or numeric prefix (default: the current feature)"),
+    json_output: bool = typer.Option(False, "--json", help="Print the parsed spec, plan and tasks as JSON"),
+    root: Path = typer.Option(None, "--root", help=_FEATURES_ROOT_HELP, file_okay=False),
+):
+    """Summarize a feature's parsed spec.md, plan.md and tasks.md."""
+    from dataclasses import asdict
+
+    from .artifacts import ArtifactCache, load_feature
+
+    project_root, feature_dir = _select_feature(ref, root)
+    cache = ArtifactCache(project_root)
+    feature = load_feature(cache, feature_dir)
+    cache.save()
+
+    if json_output:
+        data = asdict(feature)
+        data["path"] = str(feature.path)
+        typer.echo(json.dumps(data, indent=2, ensure_ascii=False))
+        return
+
+    from rich.table import Table
+
+    table = Table(title=feature.name, border_style="cyan", show_header=False)
+    table.add_column("Item", style="cyan")
+    table.add_column("Value", overflow="fold")
+    missing = "[bright_black]missing[/bright_black]"
+    if feature.spec:
+        stories = ", ".join(f"US{s.number} {s.priority or '-'}" for s in feature.spec.stories) or "-"
+        table.add_row("User stories", f"{len(feature.spec.stories)} ({stories})")
+        table.add_row("Requirements", str(len(feature.spec.requirements)))
+        table.add_row("Success criteria", str(len(feature.spec.success_criteria)))
+    else:
+        table.add_row("spec.md", missing)
+    if feature.plan:
+        context = feature.plan.technical_context
+        table.add_row("Technology", " + ".join(v for v in (context.get("Language/Version"), context.get("Primary Dependencies")) if v) or "-")
+    else:
+        table.add_row("plan.md", missing)
+    if feature.tasks:
+        table.add_row("Tasks", f"{feature.tasks.done_count()}/{len(feature.tasks.tasks)} done")
+    else:
+        table.add_row("tasks.md", missing)
+    documents = [d for d in (feature.spec, feature.plan, feature.tasks) if d]
+    clarifications = sum(len(d.clarifications) for d in documents)
+    placeholders = sum(len(d.placeholders) for d in documents)
+    table.add_row("Needs clarification", f"[yellow]{clarifications}[/yellow]" if clarifications else "0")
+    table.add_row("Template placeholders", f"[yellow]{placeholders}[/yellow]" if placeholders else "0")
+    console.print(table)
+
+@features_app.command("refresh")
+def features_refresh(
+    root: Path = typer.Option(None, "--root", help=_FEATURES_ROOT_HELP, file_okay=False),
+):
+    """Rebuild the feature index from scratch."""
+    from .features import INDEX_PATH, load_index
+
+    index = load_index(root, artifacts=True, full=True)
+    console.print(f"Indexed [bold]{len(index.features())}[/bold] feature(s) into {index.root / INDEX_PATH}")
+
+@app.command()
+def paths(
+    json_output: bool = typer.Option(False, "--json", help="Output in JSON format"),
+    require_tasks: bool = typer.Option(False, "--require-tasks", help="Require tasks.md to exist (for implementation phase)"),
+    include_tasks: bool = typer.Option(False, "--include-tasks", help="Include tasks.md in AVAILABLE_DOCS"),
+    paths_only: bool = typer.Option(False, "--paths-only", help="Only output path variables (no prerequisite validation)"),
+    shell: bool = typer.Option(False, "--shell", help="Print KEY='value' lines for eval, as common.sh's get_feature_paths does"),
+    root: Path = typer.Option(None, "--root", help=_FEATURES_ROOT_HELP, file_okay=False),
+):
+    """Print the current feature's paths and available documents (check-prerequisites.sh in one process).
+
+    The branch is read from SPECIFY_FEATURE or .git/HEAD (worktrees included)
+    without running git, and the feature directory comes from the feature index.
+    """
+    import re
+
+    from .features import OPTIONAL_DOCS, available_docs, feature_paths, resolve_feature
+
+    feature = resolve_feature(root)
+    values = feature_paths(feature)
+    branch = feature["branch"]
+    if feature["ambiguous"]:
+        typer.echo(f"ERROR: Multiple spec directories found with prefix '{branch[:3]}': {' '.join(feature['ambiguous'])}", err=True)
+        typer.echo("Please ensure only one spec directory exists per numeric prefix.", err=True)
+
+    if shell:
+        for key, value in values.items():
+            if key == "BRANCH":
+                key = "CURRENT_BRANCH"
+            elif key == "HAS_GIT":
+                value = "true" if value else "false"
+            typer.echo(f"{key}={shlex.quote(value)}")
+        return
+
+    if not feature["has_git"]:
+        typer.echo("[specify] Warning: Git repository not detected; skipped branch validation", err=True)
+    elif not re.match(r"^\d{3}-", branch):
+        typer.echo(f"ERROR: Not on a feature branch. Current branch: {branch}", err=True)
+        typer.echo("Feature branches should be named like: 001-feature-name", err=True)
+        raise typer.Exit(1)
+
+    if paths_only:
+        if json_output:
+            typer.echo(json.dumps(values))
+        else:
+            for key in ("REPO_ROOT", "BRANCH", "FEATURE_DIR", "FEATURE_SPEC", "IMPL_PLAN", "TASKS"):
+                typer.echo(f"{key}: {values[key]}")
+        return
+
+    feature_dir = feature["feature_dir"]
+    problems = [
+        (not feature_dir.is_dir(), f"Feature directory not found: {feature_dir}", "Run /speckit.specify first to create the feature structure."),
+        (not (feature_dir / "plan.md").is_file(), f"plan.md not found in {feature_dir}", "Run /speckit.plan first to create the implementation plan."),
+        (require_tasks and not (feature_dir / "tasks.md").is_file(), f"tasks.md not found in {feature_dir}", "Run /speckit.tasks first to create the task list."),
+    ]
+    for failed, message, hint in problems:
+        if failed:
+            typer.echo(f"ERROR: {message}", err=True)
+            typer.echo(hint, err=True)
+            raise typer.Exit(1)
+
+    docs = available_docs(feature_dir, include_tasks=include_tasks)
+    if json_output:
+        typer.echo(json.dumps({**values, "AVAILABLE_DOCS": docs}))
+        return
+    typer.echo(f"FEATURE_DIR:{feature_dir}")
+    typer.echo("AVAILABLE_DOCS:")
+    candidates = list(OPTIONAL_DOCS) + (["tasks.md"] if include_tasks else [])
+    for doc in candidates:
+        typer.echo(f"  {'✓' if doc in docs else '✗'} {doc}")
+
+@app.command()
+def analyze(
+    feature: str = typer.Option(None, "--feature", help="Feature name or numeric prefix (default: the current feature)"),
+    all_features: bool = typer.Option(False, "--all", help="Analyze every feature under specs/"),
+    json_output: bool = typer.Option(False, "--json", help="Print the findings and metrics as JSON"),
+    root: Path = typer.Option(None, "--root", help=_FEATURES_ROOT_HELP, file_okay=False),
+):
+    """Check spec.md, plan.md and tasks.md for coverage gaps, unknown IDs, duplicates and leftovers.
+
+    Runs the mechanical passes of /speckit.analyze; judgement calls
+    (constitution alignment, terminology drift) are left to the agent.
+    """
+    from dataclasses import asdict
+
+    from .analyze import SEVERITIES, SEVERITY_STYLES, analyze_features
+    from .features import load_index
+
+    if feature and all_features:
+        console.print("[red]Error:[/red] --feature and --all cannot be combined")
+        raise typer.Exit(1)
+
+    if all_features:
+        index = load_index(root)
+        project_root = index.root
+        feature_dirs = [index.specs_dir / name for name in sorted(index.names())]
+    else:
+        project_root, feature_dir = _select_feature(feature, root)
+        feature_dirs = [feature_dir]
+
+    reports = analyze_features(project_root, feature_dirs)
+
+    if json_output:
+        typer.echo(json.dumps({"features": [asdict(report) for report in reports]}, indent=2, ensure_ascii=False))
+        return
+
+    from rich.table import Table
+
+    if len(reports) > 1:
+        table = Table(title=f"Analysis of {len(reports)} features", border_style="cyan")
+        table.add_column("Feature", style="cyan")
+        table.add_column("Reqs", justify="right")
+        table.add_column("Tasks", justify="right")
+        table.add_column("Coverage", justify="right")
+        for severity in SEVERITIES:
+            table.add_column(severity.title(), justify="right")
+        for report in reports:
+            counts = report.counts()
+            coverage = report.metrics["coverage"]
+            table.add_row(
+                report.feature,
+                str(report.metrics["requirements"]),
+                str(report.metrics["tasks"]),
+                "-" if coverage is None else f"{coverage:g}%",
+                *(f"[{SEVERITY_STYLES[s]}]{counts[s]}[/{SEVERITY_STYLES[s]}]" if counts[s] else "0" for s in SEVERITIES),
+            )
+        console.print(table)
+        console.print("[dim]Use --feature NNN for the findings of one feature.[/dim]")
+        return
+
+    report = reports[0]
+    if not report.findings:
+        console.print(f"[green]No findings for {report.feature}[/green]")
+    else:
+        table = Table(title=f"Analysis: {report.feature}", border_style="cyan")
+        table.add_column("ID", style="cyan")
+        table.add_column("Category")
+        table.add_column("Severity")
+        table.add_column("Location", style="bright_black")
+        table.add_column("Summary", overflow="fold")
+        for finding in report.findings:
+            style = SEVERITY_STYLES[finding.severity]
+            table.add_row(finding.id, finding.category, f"[{style}]{finding.severity}[/{style}]", finding.location, finding.summary)
+        console.print(table)
+    metrics = report.metrics
+    coverage = "n/a" if metrics["coverage"] is None else f"{metrics['coverage']:g}%"
+    console.print(
+        f"Requirements: {metrics['requirements']}  Tasks: {metrics['tasks']} ({metrics['tasks_done']} done)  "
+        f"Coverage: {coverage}  Ambiguity: {metrics['ambiguity']}  Duplication: {metrics['duplication']}  "
+        f"Critical: {metrics['critical']}"
+    )
+
+tasks_app = typer.Typer(
+    name="tasks",
+    help="Work with a feature's tasks.md",
+    add_completion=False,
+)
+app.add_typer(tasks_app, name="tasks")
+
+@tasks_app.command("graph")
+def tasks_graph(
+    ref: str = typer.Argument(None, help="Feature name or numeric prefix (default: the current feature)"),
+    output_format: str = typer.Option("text", "--format", "-f", help="Output format: text, json or dot"),
+    remaining: bool = typer.Option(False, "--remaining", help="Leave out completed tasks"),
+    root: Path = typer.Option(None, "--root", help=_FEATURES_ROOT_HELP, file_okay=False),
+):
+    """Show the task dependency graph: parallel waves, critical path and useful concurrency.
+
+    Edges come from "depends on" notes, phase order, [P] markers and tasks
+    touching the same file. Exits with 1 if the dependencies form a cycle.
+    """
+    from .artifacts import ArtifactCache, load_feature
+    from .taskgraph import TaskGraphError, build_graph, schedule, to_dict, to_dot, without_done
+
+    if output_format not in ("text", "json", "dot"):
+        console.print(f"[red]Error:[/red] Unknown format '{output_format}'. Choose from: text, json, dot")
+        raise typer.Exit(1)
+
+    project_root, feature_dir = _select_feature(ref, root)
+    cache = ArtifactCache(project_root)
+    feature = load_feature(cache, feature_dir)
+    cache.save()
+    if feature.tasks is None:
+        typer.echo(f"ERROR: tasks.md not found in {feature_dir}", err=True)
+        typer.echo("Run /speckit.tasks first to create the task list.", err=True)
+        raise typer.Exit(1)
+
+    graph = build_graph(feature.tasks)
+    if remaining:
+        graph = without_done(graph)
+    try:
+        plan = schedule(graph)
+    except TaskGraphError as e:
+        typer.echo(f"ERROR: {e}", err=True)
+        raise typer.Exit(1)
+
+    if output_format == "json":
+        data = {"feature": feature.name, **to_dict(graph, plan)}
+        typer.echo(json.dumps(data, indent=2, ensure_ascii=False))
+        return
+    if output_format == "dot":
+        typer.echo(to_dot(graph, plan, feature.name), nl=False)
+        return
+
+    for warning in graph.warnings:
+        console.print(f"[yellow]Warning:[/yellow] {warning}")
+    done = sum(1 for task in graph.tasks.values() if task.done)
+    console.print(
+        f"[cyan]{feature.name}[/cyan]: {len(graph.tasks)} tasks ({done} done), "
+        f"{graph.edge_count()} dependencies, {len(plan.waves)} waves"
+    )
+    width = len(str(len(plan.waves)))
+    for number, wave in enumerate(plan.waves, 1):
+        ids = " ".join(
+            f"[bright_black]{task_id}[/bright_black]" if graph.tasks[task_id].done else task_id
+            for task_id in wave
+        )
+        console.print(f"  Wave {number:>{width}} ({len(wave)}): {ids}")
+    if plan.critical_path:
+        console.print(f"Critical path ({len(plan.critical_path)}): [red]{' → '.join(plan.critical_path)}[/red]")
+    console.print(
+        f"Max concurrency: {plan.max_concurrency}  "
+        f"Workers needed to finish in {len(plan.critical_path)} waves: [bold]{plan.workers}[/bold]"
+    )
+
+@app.command()
+def implement(
+    ref: str = typer.Argument(None, help="Feature name or numeric prefix (default: the current feature)"),
+    jobs: int = typer.Option(None, "--jobs", "-j", min=1, help="Number of workers (default: as many as the task graph can use, up to 4)"),
+    agent: str = typer.Option(None, "--agent", help="Agent CLI to run, or 'stub' for a stand-in that only appends to the task's files (default: the agent chosen at init)"),
+    agent_command: str = typer.Option(None, "--agent-command", help="Custom agent command line; {prompt}, {task} and {feature_dir} are substituted, and without {prompt} the prompt is sent on stdin"),
+    timeout: float = typer.Option(None, "--timeout", min=1, help="Seconds before an agent run is stopped and its task counted as failed"),
+    fail_fast: bool = typer.Option(False, "--fail-fast", help="Start no new tasks after the first failure"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Show the schedule and the agent command without running anything"),
+    root: Path = typer.Option(None, "--root", help=_FEATURES_ROOT_HELP, file_okay=False),
+):
+    """Implement the open tasks of tasks.md with several agents working in parallel.
+
+    Each worker is a git worktree running the agent on one task at a time;
+    a task starts once its prerequisites are integrated, finished work is
+    cherry-picked onto one line of commits and ticked in tasks.md, and the
+    current branch is fast-forwarded to it at the end.
+    """
+    from .artifacts import ArtifactCache, load_feature
+    from .implement import DEFAULT_MAX_JOBS, DONE, STUB_AGENT, ImplementError, Runner, agent_command as build_agent_command, render_command, task_prompt
+    from .manifest import load_manifest
+    from .taskgraph import TaskGraphError, build_graph, schedule, without_done
+
+    project_root, feature_dir = _select_feature(ref, root)
+    cache = ArtifactCache(project_root)
+    feature = load_feature(cache, feature_dir)
+    cache.save()
+    if feature.tasks is None:
+        typer.echo(f"ERROR: tasks.md not found in {feature_dir}", err=True)
+        typer.echo("Run /speckit.tasks first to create the task list.", err=True)
+        raise typer.Exit(1)
+
+    if agent is None and not agent_command:
+        agent = (load_manifest(project_root) or {}).get("ai")
+        if agent is None:
+            console.print("[red]Error:[/red] No agent recorded for this project; pass --agent or --agent-command")
+            raise typer.Exit(1)
+    if agent and agent != STUB_AGENT and agent not in AGENT_CONFIG:
+        console.print(f"[red]Error:[/red] Unknown agent '{agent}'. Choose from: {', '.join(AGENT_CONFIG)}, {STUB_AGENT}")
+        raise typer.Exit(1)
+    try:
+        command = build_agent_command(agent, agent_command)
+    except ImplementError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+    graph = without_done(build_graph(feature.tasks))
+    try:
+        plan = schedule(graph)
+    except TaskGraphError as e:
+        typer.echo(f"ERROR: {e}", err=True)
+        raise typer.Exit(1)
+    for warning in graph.warnings:
+        console.print(f"[yellow]Warning:[/yellow] {warning}")
+    if not graph.tasks:
+        console.print(f"[green]All tasks in {feature.name} are done.[/green]")
+        return
+
+    jobs = jobs or max(1, min(plan.workers, DEFAULT_MAX_JOBS))
+    agent_label = AGENT_CONFIG[agent]["name"] if agent in AGENT_CONFIG else agent or "custom command"
+    console.print(
+        f"[cyan]{feature.name}[/cyan]: {len(graph.tasks)} open tasks, critical path {len(plan.critical_path)}, "
+        f"up to {plan.workers} useful workers; running {jobs} with {agent_label}"
+    )
+    if dry_run:
+        width = len(str(len(plan.waves)))
+        for number, wave in enumerate(plan.waves, 1):
+            console.print(f"  Wave {number:>{width}} ({len(wave)}): {' '.join(wave)}")
+        first = graph.tasks[plan.order[0]]
+        feature_rel = feature_dir.relative_to(project_root).as_posix()
+        if agent == STUB_AGENT and not agent_command:
+            console.print(f"Command for {first.id}: [bright_black]built-in stub agent[/bright_black]")
+        else:
+            argv, stdin = render_command(command, first, "<prompt>", feature_rel)
+            console.print(f"Command for {first.id}: [bright_black]{shlex.join(argv)}[/bright_black]" + (" (prompt on stdin)" if stdin else ""))
+        console.print(Panel(task_prompt(first, feature_rel), title=f"Prompt for {first.id}", border_style="cyan"))
+        return
+
+    styles = {"start": ("▶", "cyan"), "done": ("✓", "green"), "failed": ("✗", "red"), "retry": ("↻", "yellow")}
+
+    def report(event: str, task_id: str, detail: str) -> None:
+        symbol, style = styles[event]
+        console.print(f"[bright_black]{time.strftime('%H:%M:%S')}[/bright_black] [{style}]{symbol} {task_id}[/{style}] [bright_black]{detail}[/bright_black]")
+
+    runner = Runner(project_root, feature_dir, graph, command, jobs=jobs, timeout=timeout, fail_fast=fail_fast, report=report)
+    start = time.perf_counter()
+    try:
+        summary = runner.run()
+    except ImplementError as e:
+        console.print(Panel(str(e), title="Implement Failed", border_style="red"))
+        raise typer.Exit(1)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Interrupted.[/yellow] Finished tasks are integrated and ticked in tasks.md; run again to continue.")
+        raise typer.Exit(130)
+
+    console.print(
+        f"\n[bold]{summary.count(DONE)}[/bold] done, {len(summary.results) - summary.count(DONE)} not done "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    unfinished = [result for result in summary.results.values() if result.status != DONE]
+    if unfinished:
+        from rich.table import Table
+
+        table = Table(border_style="red", show_header=True)
+        table.add_column("Task", style="cyan")
+        table.add_column("Status")
+        table.add_column("Reason", overflow="fold")
+        table.add_column("Log", style="bright_black", overflow="fold")
+        for result in unfinished:
+            table.add_row(result.task_id, result.status, result.message, str(result.log or ""))
+        console.print(table)
+    if summary.fast_forwarded:
+        console.print(f"Fast-forwarded to {summary.tip[:12]}")
+    elif summary.tip != summary.base:
+        console.print(f"[yellow]The branch moved during the run; the integrated work is at {summary.ref} ({summary.tip[:12]}).[/yellow] Merge it with: git merge {summary.ref}")
+    if unfinished:
+        raise typer.Exit(1)
+
+@app.command()
+def search(
+    query: list[str] = typer.Argument(..., help="Search terms"),
+    feature: list[str] = typer.Option(None, "--feature", "-f", help="Only this feature (name or numeric prefix); repeatable"),
+    artifact_type: list[str] = typer.Option(None, "--type", "-t", help="Only this artifact type (spec, plan, tasks, research, data-model, quickstart, contracts, checklist, constitution, memory, other); repeatable"),
+    section: str = typer.Option(None, "--section", "-s", help="Only sections whose heading contains this text, e.g. 'Functional Requirements'"),
+    limit: int = typer.Option(10, "--limit", "-n", min=1, help="Maximum number of hits"),
+    json_output: bool = typer.Option(False, "--json", help="Print the hits as JSON"),
+    rebuild: bool = typer.Option(False, "--rebuild", help="Rebuild the index from scratch first"),
+    root: Path = typer.Option(None, "--root", help=_FEATURES_ROOT_HELP, file_okay=False),
+):
+    """Search specs/ and memory/ by section, ranked with BM25.
+
+    The index in .specify/cache/search.sqlite is brought up to date before
+    each query by reindexing only the files that changed. Exits with status 1
+    when nothing matches, with or without --json.
+    """
+    from dataclasses import asdict
+
+    from .features import find_project_root, load_index
+    from .search import ARTIFACT_TYPES, SearchIndex
+
+    unknown = [t for t in artifact_type or [] if t not in ARTIFACT_TYPES]
+    if unknown:
+        console.print(f"[red]Error:[/red] Unknown artifact type '{unknown[0]}'. Choose from: {', '.join(ARTIFACT_TYPES)}")
+        raise typer.Exit(1)
+
+    project_root = find_project_root(root)
+    features: list[str] = []
+    if feature:
+        index = load_index(project_root)
+        for ref in feature:
+            matches = index.find(ref)
+            if not matches:
+                typer.echo(f"ERROR: No spec directory found for '{ref}'", err=True)
+                raise typer.Exit(1)
+            features.extend(matches)
+
+    start = time.perf_counter()
+    search_index = SearchIndex(project_root)
+    try:
+        if rebuild:
+            search_index.rebuild()
+        stats = search_index.update()
+        hits, matched = search_index.search(" ".join(query), features=features, types=artifact_type, section=section, limit=limit)
+    finally:
+        search_index.close()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if json_output:
+        typer.echo(json.dumps({"query": " ".join(query), "matched": matched, "hits": [asdict(hit) for hit in hits]}, indent=2, ensure_ascii=False))
+        # Same exit status as text mode, like grep
+        if not hits:
+            raise typer.Exit(1)
+        return
+
+    if not hits:
+        console.print(f"[yellow]No matches[/yellow] [bright_black]({stats['files']} files searched)[/bright_black]")
+        raise typer.Exit(1)
+    width = len(str(len(hits)))
+    for number, hit in enumerate(hits, 1):
+        console.print(
+            f"{number:>{width}}. [cyan]{hit.path}:{hit.line}[/cyan]  {hit.section or '[bright_black](top)[/bright_black]'}  "
+            f"[bright_black]{hit.score:.2f}[/bright_black]",
+            highlight=False,
+        )
+        if hit.snippet:
+            console.print(f"{' ' * (width + 2)}{hit.snippet}", markup=False, highlight=False)
+    reindexed = f", {stats['indexed']} reindexed" if stats["indexed"] else ""
+    console.print(
+        f"[bright_black]{len(hits)} of {matched} matching sections; {stats['files']} files{reindexed}; "
+        f"{elapsed_ms:.0f} ms[/bright_black]"
+    )
+
+agent_context_app = typer.Typer(
+    name="agent-context",
+    help="Maintain the agent context files (CLAUDE.md, AGENTS.md, ...) from the current plan",
+    add_completion=False,
+)
+app.add_typer(agent_context_app, name="agent-context")
+
+@agent_context_app.command("update")
+def agent_context_update(
+    agent: list[str] = typer.Option(None, "--agent", help="Agent whose context file to update (repeatable), e.g. claude, copilot"),
+    all_agents: bool = typer.Option(False, "--all", help="Update every agent context file that exists (the default)"),
+    root: Path = typer.Option(None, "--root", help=_FEATURES_ROOT_HELP, file_okay=False),
+):
+    """Record the current feature's technologies in the agent context files."""
+    from .agent_context import AgentContextError, parse_plan, update_agent_context
+    from .features import resolve_feature
+
+    if agent and all_agents:
+        console.print("[red]Error:[/red] --agent and --all cannot be combined")
+        raise typer.Exit(1)
+
+    feature = resolve_feature(root)
+    plan_path = feature["feature_dir"] / "plan.md"
+    if feature["ambiguous"]:
+        console.print(f"[yellow]Multiple spec directories share the prefix of {feature['branch']}:[/yellow] {' '.join(feature['ambiguous'])}")
+    if not plan_path.is_file():
+        hint = "Make sure you're on a feature branch" if feature["has_git"] else "Set SPECIFY_FEATURE or create a feature first"
+        console.print(Panel(f"No plan.md found at {plan_path}\n{hint}", title="Agent Context", border_style="red"))
+        raise typer.Exit(1)
+
+    try:
+        plan = parse_plan(plan_path)
+        updates = update_agent_context(feature["root"], plan, branch=feature["branch"], agents=agent or None)
+    except AgentContextError as e:
+        console.print(Panel(str(e), title="Agent Context", border_style="red"))
+        raise typer.Exit(1)
+
+    console.print(f"[cyan]Feature:[/cyan] {feature['branch']}")
+    for label, value in (("Language", plan.language), ("Framework", plan.framework), ("Database", plan.database)):
+        if value:
+            console.print(f"[cyan]{label}:[/cyan] {value}")
+    styles = {"created": "green", "updated": "green", "unchanged": "bright_black"}
+    for update in updates:
+        rel = update.path.relative_to(feature["root"]).as_posix()
+        names = ", ".join(AGENT_CONFIG[a]["name"] for a in update.agents)
+        style = styles[update.action]
+        console.print(f"[{style}]{update.action:>9}[/{style}] {rel} [bright_black]({names})[/bright_black]")
+
 def main():
     app()
 
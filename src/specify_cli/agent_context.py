@@ -0,0 +1,277 @@
+"""
+Agent context files: `specify agent-context update`.
+
+The technology fields of the current feature's plan.md are recorded in each
+agent's context file (CLAUDE.md, AGENTS.md, .github/copilot-instructions.md,
+...). New files are rendered from .specify/templates/agent-file-template.md;
+existing ones get new "Active Technologies" entries, a new "Recent Changes"
+entry (keeping the two before it) and a refreshed "Last updated" date.
+
+This is the same update update-agent-context.sh performs, but plan.md is parsed
+once, every file is patched in memory and written atomically, and a file
+shared by several agents (AGENTS.md) is only updated once.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+TEMPLATE_PATH = Path(".specify") / "templates" / "agent-file-template.md"
+
+# Context file for each agent, relative to the project root
+AGENT_CONTEXT_FILES = {
+    "claude": "CLAUDE.md",
+    "gemini": "GEMINI.md",
+    "copilot": ".github/copilot-instructions.md",
+    "cursor-agent": ".cursor/rules/specify-rules.mdc",
+    "qwen": "QWEN.md",
+    "opencode": "AGENTS.md",
+    "codex": "AGENTS.md",
+    "windsurf": ".windsurf/rules/specify-rules.md",
+    "kilocode": ".kilocode/rules/specify-rules.md",
+    "auggie": ".augment/rules/specify-rules.md",
+    "roo": ".roo/rules/specify-rules.md",
+    "codebuddy": "CODEBUDDY.md",
+    "amp": "AGENTS.md",
+    "q": "AGENTS.md",
+}
+DEFAULT_AGENT = "claude"
+
+PLAN_FIELDS = {
+    "language": "Language/Version",
+    "framework": "Primary Dependencies",
+    "database": "Storage",
+    "project_type": "Project Type",
+}
+
+TECH_HEADING = "## Active Technologies"
+CHANGES_HEADING = "## Recent Changes"
+KEEP_CHANGES = 2
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+LAST_UPDATED_RE = re.compile(r"\*\*Last updated\*\*:.*\d{4}-\d{2}-\d{2}")
+
+
+class AgentContextError(Exception):
+    """Raised when the agent context cannot be updated."""
+
+
+@dataclass
+class PlanData:
+    language: str = ""
+    framework: str = ""
+    database: str = ""
+    project_type: str = ""
+
+    @property
+    def tech_stack(self) -> str:
+        return " + ".join(part for part in (self.language, self.framework) if part)
+
+
+@dataclass
+class ContextUpdate:
+    path: Path
+    agents: list[str] = field(default_factory=list)
+    action: str = ""  # "created", "updated" or "unchanged"
+
+
+def parse_plan(plan_path: Path) -> PlanData:
+    """Read the technology fields from plan.md in one pass.
+
+    A field is the first ``**Name**: value`` line; values still marked
+    NEEDS CLARIFICATION, or N/A, count as missing.
+    """
+    try:
+        text = plan_path.read_text(encoding="utf-8")
+    except OSError as e:
+        raise AgentContextError(f"Cannot read {plan_path}: {e}") from e
+
+    wanted = {f"**{label}**: ": attr for attr, label in PLAN_FIELDS.items()}
+    values: dict[str, str] = {}
+    for line in text.splitlines():
+        if not line.startswith("**"):
+            continue
+        for prefix, attr in wanted.items():
+            if attr not in values and line.startswith(prefix):
+                values[attr] = line[len(prefix):].strip()
+        if len(values) == len(wanted):
+            break
+    return PlanData(**{
+        attr: value for attr, value in values.items()
+        if "NEEDS CLARIFICATION" not in value and value != "N/A"
+    })
+
+
+def _project_structure(project_type: str) -> str:
+    return "backend/\nfrontend/\ntests/" if "web" in project_type else "src/\ntests/"
+
+
+def _commands_for_language(language: str) -> str:
+    if "Python" in language:
+        return "cd src && pytest && ruff check ."
+    if "Rust" in language:
+        return "cargo test && cargo clippy"
+    if "JavaScript" in language or "TypeScript" in language:
+        return "npm test && npm run lint"
+    return f"# Add commands for {language}"
+
+
+def render_new_file(template: str, plan: PlanData, *, branch: str, project_name: str, today: str) -> str:
+    """Fill the agent file template for a project that has no context file yet."""
+    tech_stack = plan.tech_stack
+    tech_line = f"- {tech_stack} ({branch})" if tech_stack else f"- ({branch})"
+    change_line = f"- {branch}: Added {tech_stack}" if tech_stack else f"- {branch}: Added"
+    substitutions = {
+        "[PROJECT NAME]": project_name,
+        "[DATE]": today,
+        "[EXTRACTED FROM ALL PLAN.MD FILES]": tech_line,
+        "[ACTUAL STRUCTURE FROM PLANS]": _project_structure(plan.project_type),
+        "[ONLY COMMANDS FOR ACTIVE TECHNOLOGIES]": _commands_for_language(plan.language),
+        "[LANGUAGE-SPECIFIC, ONLY FOR LANGUAGES IN USE]": f"{plan.language}: Follow standard conventions",
+        "[LAST 3 FEATURES AND WHAT THEY ADDED]": change_line,
+    }
+    for placeholder, value in substitutions.items():
+        template = template.replace(placeholder, value)
+    return template
+
+
+def patch_existing_file(content: str, plan: PlanData, *, branch: str, today: str) -> str:
+    """Add the plan's technologies and a Recent Changes entry to an existing context file."""
+    tech_stack = plan.tech_stack
+    new_tech = []
+    if tech_stack and tech_stack not in content:
+        new_tech.append(f"- {tech_stack} ({branch})")
+    if plan.database and plan.database not in content:
+        new_tech.append(f"- {plan.database} ({branch})")
+
+    if tech_stack:
+        new_change: Optional[str] = f"- {branch}: Added {tech_stack}"
+    elif plan.database:
+        new_change = f"- {branch}: Added {plan.database}"
+    else:
+        new_change = None
+
+    newline = "\r\n" if "\r\n" in content else "\n"
+    lines = content.splitlines()
+    has_tech = TECH_HEADING in lines
+    has_changes = CHANGES_HEADING in lines
+
+    out: list[str] = []
+    in_tech = in_changes = tech_added = False
+    kept_changes = 0
+    for line in lines:
+        if line == TECH_HEADING:
+            out.append(line)
+            in_tech = True
+            continue
+        if in_tech and (line.startswith("## ") or not line):
+            # New entries go before the blank line or heading that ends the list
+            if not tech_added:
+                out.extend(new_tech)
+                tech_added = True
+            if not line:
+                out.append(line)
+                continue
+            in_tech = False
+
+        if line == CHANGES_HEADING:
+            out.append(line)
+            if new_change:
+                out.append(new_change)
+            in_changes = True
+            continue
+        if in_changes and line.startswith("## "):
+            out.append(line)
+            in_changes = False
+            continue
+        if in_changes and line.startswith("- "):
+            if kept_changes < KEEP_CHANGES:
+                out.append(line)
+                kept_changes += 1
+            continue
+
+        if LAST_UPDATED_RE.search(line):
+            line = DATE_RE.sub(today, line, count=1)
+        out.append(line)
+
+    if in_tech and not tech_added:
+        out.extend(new_tech)
+    if not has_tech and new_tech:
+        out.extend(["", TECH_HEADING, *new_tech])
+    if not has_changes and new_change:
+        out.extend(["", CHANGES_HEADING, new_change])
+    return newline.join(out) + newline
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        try:
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def select_targets(root: Path, agents: Optional[list[str]]) -> list[ContextUpdate]:
+    """Context files to update: those of the given agents, else every one that exists (else Claude's)."""
+    targets: dict[str, ContextUpdate] = {}
+    if agents:
+        for agent in agents:
+            if agent not in AGENT_CONTEXT_FILES:
+                raise AgentContextError(
+                    f"Unknown agent '{agent}'. Choose from: {', '.join(AGENT_CONTEXT_FILES)}"
+                )
+            rel = AGENT_CONTEXT_FILES[agent]
+            targets.setdefault(rel, ContextUpdate(root / rel)).agents.append(agent)
+    else:
+        for agent, rel in AGENT_CONTEXT_FILES.items():
+            if (root / rel).is_file():
+                targets.setdefault(rel, ContextUpdate(root / rel)).agents.append(agent)
+        if not targets:
+            rel = AGENT_CONTEXT_FILES[DEFAULT_AGENT]
+            targets[rel] = ContextUpdate(root / rel, [DEFAULT_AGENT])
+    return list(targets.values())
+
+
+def update_agent_context(root: Path, plan: PlanData, *, branch: str, agents: Optional[list[str]] = None) -> list[ContextUpdate]:
+    """Create or patch the selected context files; returns what was done to each."""
+    targets = select_targets(root, agents)
+    today = date.today().isoformat()
+    template: Optional[str] = None
+
+    for target in targets:
+        try:
+            current = target.path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            current = None
+        except OSError as e:
+            raise AgentContextError(f"Cannot read {target.path}: {e}") from e
+
+        if current is None:
+            if template is None:
+                template_path = root / TEMPLATE_PATH
+                try:
+                    template = template_path.read_text(encoding="utf-8")
+                except OSError as e:
+                    raise AgentContextError(f"Template not found at {template_path}") from e
+            content = render_new_file(template, plan, branch=branch, project_name=root.name, today=today)
+            target.action = "created"
+        else:
+            content = patch_existing_file(current, plan, branch=branch, today=today)
+            target.action = "updated" if content != current else "unchanged"
+
+        if target.action != "unchanged":
+            try:
+                target.path.parent.mkdir(parents=True, exist_ok=True)
+                _write_atomic(target.path, content)
+            except OSError as e:
+                raise AgentContextError(f"Cannot write {target.path}: {e}") from e
+    return targets
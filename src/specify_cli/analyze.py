@@ -0,0 +1,231 @@
+"""
+Mechanical cross-artifact checks: `specify analyze`.
+
+These are the detection passes of /speckit.analyze that need no judgement,
+run over the parsed spec.md, plan.md and tasks.md of each feature
+(see artifacts.py). Per feature, requirement, story and task ID maps are
+built once and every check is a lookup in them:
+
+    Missing artifact     spec.md, plan.md or tasks.md absent
+    Coverage             requirements or stories no task references, and
+                         story phases with tasks not tagged [USn]
+    Inconsistency        tasks naming unknown stories, requirements or tasks,
+                         dependencies on later tasks, duplicate IDs
+    Duplication          requirements with the same or nearly the same text
+    Ambiguity            [NEEDS CLARIFICATION] markers, leftover placeholders,
+                         vague adjectives without a measurable figure
+    Underspecification   no stories or requirements, stories without
+                         acceptance scenarios, no language in the plan
+
+Findings get stable IDs (category initial plus a counter) so reruns without
+edits produce the same report. Constitution alignment and terminology drift
+are left to the agent.
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from .artifacts import ArtifactCache, FeatureArtifacts, Item, load_feature
+
+CRITICAL = "CRITICAL"
+HIGH = "HIGH"
+MEDIUM = "MEDIUM"
+LOW = "LOW"
+SEVERITIES = (CRITICAL, HIGH, MEDIUM, LOW)
+SEVERITY_STYLES = {CRITICAL: "bold red", HIGH: "red", MEDIUM: "yellow", LOW: "bright_black"}
+
+CATEGORY_PREFIXES = {
+    "Missing artifact": "M",
+    "Coverage": "C",
+    "Inconsistency": "I",
+    "Duplication": "D",
+    "Ambiguity": "A",
+    "Underspecification": "U",
+}
+
+VAGUE_RE = re.compile(
+    r"\b(fast|quick(?:ly)?|scalable|secure|intuitive|robust|user[- ]friendly|easy|efficient(?:ly)?|"
+    r"responsive|reliable|seamless(?:ly)?|performant|simple)\b",
+    re.IGNORECASE,
+)
+WORD_RE = re.compile(r"[a-z0-9]+")
+# Requirements whose word sets overlap this much are reported as near-duplicates
+NEAR_DUPLICATE = 0.85
+# Placeholders listed per finding before the rest are summarized as a count
+PLACEHOLDER_SAMPLE = 5
+
+
+@dataclass
+class Finding:
+    id: str
+    category: str
+    severity: str
+    location: str
+    summary: str
+
+
+@dataclass
+class FeatureReport:
+    feature: str
+    path: str
+    findings: list[Finding] = field(default_factory=list)
+    metrics: dict = field(default_factory=dict)
+
+    def add(self, category: str, severity: str, location: str, summary: str) -> None:
+        self.findings.append(Finding("", category, severity, location, summary))
+
+    def number_findings(self) -> None:
+        """Give each finding its category initial and a per-category counter (A1, A2, C1, ...)."""
+        counters: dict[str, int] = {}
+        for finding in self.findings:
+            counters[finding.category] = counters.get(finding.category, 0) + 1
+            finding.id = f"{CATEGORY_PREFIXES[finding.category]}{counters[finding.category]}"
+
+    def counts(self) -> dict[str, int]:
+        result = {severity: 0 for severity in SEVERITIES}
+        for finding in self.findings:
+            result[finding.severity] += 1
+        return result
+
+
+def _words(text: str) -> frozenset[str]:
+    return frozenset(WORD_RE.findall(text.lower()))
+
+
+def _duplicates(requirements: list[Item]) -> list[tuple[Item, Item, bool]]:
+    """Pairs of requirements with identical (True) or nearly identical (False) wording."""
+    words = [_words(item.text) for item in requirements]
+    pairs = []
+    for i in range(len(requirements)):
+        for j in range(i + 1, len(requirements)):
+            a, b = words[i], words[j]
+            if not a or not b:
+                continue
+            # Jaccard can only reach the threshold when the sizes are close
+            if min(len(a), len(b)) < NEAR_DUPLICATE * max(len(a), len(b)):
+                continue
+            similarity = len(a & b) / len(a | b)
+            if similarity >= NEAR_DUPLICATE:
+                pairs.append((requirements[i], requirements[j], a == b))
+    return pairs
+
+
+def _placeholder_summary(markers) -> str:
+    sample = ", ".join(f"{m.text} (L{m.line})" for m in markers[:PLACEHOLDER_SAMPLE])
+    more = len(markers) - PLACEHOLDER_SAMPLE
+    return sample + (f" and {more} more" if more > 0 else "")
+
+
+def analyze_feature(artifacts: FeatureArtifacts) -> FeatureReport:
+    report = FeatureReport(artifacts.name, str(artifacts.path))
+    spec, plan, tasks = artifacts.spec, artifacts.plan, artifacts.tasks
+
+    for document, name, hint in ((spec, "spec.md", "/speckit.specify"), (plan, "plan.md", "/speckit.plan"), (tasks, "tasks.md", "/speckit.tasks")):
+        if document is None:
+            report.add("Missing artifact", CRITICAL, name, f"{name} is missing; run {hint}")
+
+    # ID maps, built once
+    requirements: dict[str, Item] = {}
+    stories: dict[str, object] = {}
+    task_index: dict[str, int] = {}
+    if spec:
+        for item in spec.requirements + spec.success_criteria:
+            if item.id in requirements:
+                report.add("Inconsistency", HIGH, f"spec.md:L{item.line}", f"{item.id} is defined twice (also L{requirements[item.id].line})")
+            else:
+                requirements[item.id] = item
+        for story in spec.stories:
+            stories[f"US{story.number}"] = story
+    task_list = tasks.tasks if tasks else []
+    for position, task in enumerate(task_list):
+        if task.id in task_index:
+            report.add("Inconsistency", HIGH, f"tasks.md:L{task.line}", f"Task ID {task.id} is used twice (also L{task_list[task_index[task.id]].line})")
+        else:
+            task_index[task.id] = position
+
+    covered: dict[str, list[str]] = {}
+    story_tasks: dict[str, list[str]] = {}
+    for position, task in enumerate(task_list):
+        location = f"tasks.md:L{task.line}"
+        if task.story:
+            story_tasks.setdefault(task.story, []).append(task.id)
+            if spec and task.story not in stories:
+                report.add("Inconsistency", HIGH, location, f"{task.id} is tagged [{task.story}] but spec.md has no User Story {task.story[2:]}")
+        elif "user story" in task.phase.lower():
+            report.add("Coverage", LOW, location, f"{task.id} is in '{task.phase}' but has no [USn] tag")
+        for ref in task.refs:
+            covered.setdefault(ref, []).append(task.id)
+            if spec and ref not in requirements:
+                report.add("Inconsistency", HIGH, location, f"{task.id} references {ref}, which spec.md does not define")
+        for dep in task.depends_on:
+            if dep not in task_index:
+                report.add("Inconsistency", HIGH, location, f"{task.id} depends on {dep}, which does not exist")
+            elif task_index[dep] > position:
+                report.add("Inconsistency", MEDIUM, location, f"{task.id} depends on {dep}, which is listed after it")
+
+    if spec and tasks:
+        if any(ref.startswith(("FR-", "NFR-")) for ref in covered):
+            for item in spec.requirements:
+                if item.id not in covered:
+                    report.add("Coverage", HIGH, f"spec.md:L{item.line}", f"{item.id} has no task referencing it")
+        elif spec.requirements and task_list:
+            report.add("Coverage", LOW, "tasks.md", "No task references a requirement ID (FR-###); requirement coverage cannot be checked mechanically")
+        if story_tasks:
+            for key, story in stories.items():
+                if key not in story_tasks:
+                    report.add("Coverage", MEDIUM, f"spec.md:L{story.line}", f"User Story {story.number} ({story.priority or 'no priority'}) has no [{key}] tasks")
+
+    if spec:
+        for a, b, exact in _duplicates(spec.requirements):
+            wording = "the same text as" if exact else "nearly the same text as"
+            report.add("Duplication", HIGH, f"spec.md:L{a.line},L{b.line}", f"{b.id} has {wording} {a.id}")
+        for item in spec.requirements + spec.success_criteria:
+            vague = VAGUE_RE.search(item.text)
+            if vague and not re.search(r"\d", item.text):
+                report.add("Ambiguity", MEDIUM, f"spec.md:L{item.line}", f"{item.id} uses '{vague.group(0)}' without a measurable criterion")
+        if not spec.stories:
+            report.add("Underspecification", HIGH, "spec.md", "No user stories (### User Story N - Title (Priority: Pn))")
+        if not spec.requirements:
+            report.add("Underspecification", HIGH, "spec.md", "No functional requirements (- **FR-###**: ...)")
+        for story in spec.stories:
+            if not story.scenarios:
+                report.add("Underspecification", MEDIUM, f"spec.md:L{story.line}", f"User Story {story.number} has no acceptance scenarios")
+            if not story.priority:
+                report.add("Underspecification", LOW, f"spec.md:L{story.line}", f"User Story {story.number} has no priority")
+    if plan and not plan.technical_context.get("Language/Version"):
+        report.add("Underspecification", MEDIUM, "plan.md", "Technical Context does not name a Language/Version")
+
+    for document, name in ((spec, "spec.md"), (plan, "plan.md"), (tasks, "tasks.md")):
+        if document is None:
+            continue
+        for marker in document.clarifications:
+            report.add("Ambiguity", HIGH, f"{name}:L{marker.line}", f"Needs clarification: {marker.text}" if marker.text else "Needs clarification")
+        if document.placeholders:
+            report.add("Ambiguity", MEDIUM, name, f"{len(document.placeholders)} template placeholder(s) left: {_placeholder_summary(document.placeholders)}")
+
+    report.number_findings()
+    counts = report.counts()
+    requirement_ids = [item.id for item in spec.requirements] if spec else []
+    checkable = any(ref.startswith(("FR-", "NFR-")) for ref in covered)
+    report.metrics = {
+        "requirements": len(requirement_ids),
+        "stories": len(stories),
+        "tasks": len(task_list),
+        "tasks_done": sum(1 for task in task_list if task.done),
+        "coverage": round(100 * sum(1 for r in requirement_ids if r in covered) / len(requirement_ids), 1)
+        if checkable and requirement_ids else None,
+        "ambiguity": sum(1 for f in report.findings if f.category == "Ambiguity"),
+        "duplication": sum(1 for f in report.findings if f.category == "Duplication"),
+        "critical": counts[CRITICAL],
+    }
+    return report
+
+
+def analyze_features(root: Path, feature_dirs: list[Path], cache: Optional[ArtifactCache] = None) -> list[FeatureReport]:
+    """Analyze each feature directory, reusing cached parse results."""
+    cache = cache or ArtifactCache(root)
+    reports = [analyze_feature(load_feature(cache, feature_dir)) for feature_dir in feature_dirs]
+    cache.save()
+    return reports
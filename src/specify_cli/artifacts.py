@@ -0,0 +1,455 @@
+"""
+Structured views of a feature's spec.md, plan.md and tasks.md.
+
+The parsers understand the layout the templates in ``templates/`` produce:
+
+    spec.md    ### User Story N - Title (Priority: Pn), - **FR-###**: ...,
+               - **SC-###**: ..., Key Entities
+    plan.md    the **Field**: value lines of "Technical Context"
+    tasks.md   - [ ] T### [P] [USn] description (depends on T###, ...)
+
+plus, in every file, ``[NEEDS CLARIFICATION: ...]`` markers and leftover
+template placeholders such as ``[DATE]``, ``[Brief Title]`` or TODO. Fenced code
+blocks and HTML comments are skipped.
+
+Parse results are cached in ``.specify/cache/artifacts/<feature>.json`` keyed
+by each file's name, size and mtime, so querying hundreds of features only
+stats the files and loads small JSON shards. As with the feature index, an
+mtime too close to the moment an entry was cached is not trusted.
+"""
+
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Optional
+
+from .features import RACY_NS, ensure_cache_dir
+
+CACHE_DIR = Path(".specify") / "cache" / "artifacts"
+# Bump whenever the parsers change what they produce
+PARSER_VERSION = 4
+
+SPEC = "spec"
+PLAN = "plan"
+TASKS = "tasks"
+ARTIFACT_NAMES = {SPEC: "spec.md", PLAN: "plan.md", TASKS: "tasks.md"}
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FIELD_RE = re.compile(r"\*\*([^*]+?)\*\*\s*:\s*(.*?)\s*(?=\s\|\s\*\*|$)")
+CLARIFICATION_RE = re.compile(r"\[NEEDS CLARIFICATION(?::\s*([^\]]*))?\]")
+BRACKET_RE = re.compile(r"\[([^\[\]\n]+)\](?![(:\[])")
+# Bracketed tokens the templates use as markup rather than as placeholders
+NOT_PLACEHOLDER_RE = re.compile(r"^(?:[ xX]|P\d*\??|US\d+|T\d+|\d+|ID|Story|NEEDS CLARIFICATION.*|!\w+)$")
+INLINE_CODE_RE = re.compile(r"`[^`]*`")
+TODO_RE = re.compile(r"\b(?:TODO|TKTK|FIXME|TBD)\b|\?\?\?")
+STORY_RE = re.compile(
+    r"^User Story\s+(\d+)\s*(?:[-–—:]\s*(.*?))?\s*(?:\(Priority:\s*(P\d+)\))?\s*(?:🎯.*)?$",
+    re.IGNORECASE,
+)
+ITEM_RE = re.compile(r"^\s*[-*]\s+\*\*((?:N?FR|SC)-\d+)\*\*\s*:?\s*(.*)$")
+ENTITY_RE = re.compile(r"^\s*[-*]\s+\*\*([^*]+)\*\*\s*:?\s*(.*)$")
+SCENARIO_RE = re.compile(r"^\s*\d+\.\s+\*\*Given\*\*", re.IGNORECASE)
+TASK_RE = re.compile(r"^\s*[-*]\s+\[([ xX])\]\s+(T\d+)\b\s*(.*)$")
+TASK_MARKER_RE = re.compile(r"^\[(P|US\d+)\]\s*")
+DEPENDS_RE = re.compile(r"depends on\s+((?:T\d+(?:\s*(?:,|and|&)\s*)?)+)", re.IGNORECASE)
+TASK_ID_RE = re.compile(r"\bT\d+\b")
+REF_RE = re.compile(r"\b(?:N?FR|SC)-\d+\b")
+# Paths with a directory part, or bare file names with an extension
+FILE_RE = re.compile(r"(?<![\w/.-])((?:[\w.-]+/)+[\w.-]*\w|[\w-]+\.[A-Za-z][A-Za-z0-9]{0,5})(?![\w/])")
+
+
+@dataclass
+class Marker:
+    text: str
+    line: int
+
+
+@dataclass
+class UserStory:
+    number: int
+    title: str
+    priority: Optional[str]
+    line: int
+    scenarios: int = 0
+
+
+@dataclass
+class Item:
+    """A numbered requirement (FR-###) or success criterion (SC-###)."""
+    id: str
+    text: str
+    line: int
+
+
+@dataclass
+class Spec:
+    title: str = ""
+    metadata: dict[str, str] = field(default_factory=dict)
+    stories: list[UserStory] = field(default_factory=list)
+    requirements: list[Item] = field(default_factory=list)
+    success_criteria: list[Item] = field(default_factory=list)
+    entities: list[str] = field(default_factory=list)
+    clarifications: list[Marker] = field(default_factory=list)
+    placeholders: list[Marker] = field(default_factory=list)
+
+
+@dataclass
+class Plan:
+    title: str = ""
+    metadata: dict[str, str] = field(default_factory=dict)
+    technical_context: dict[str, str] = field(default_factory=dict)
+    clarifications: list[Marker] = field(default_factory=list)
+    placeholders: list[Marker] = field(default_factory=list)
+
+
+@dataclass
+class Task:
+    id: str
+    description: str
+    done: bool
+    parallel: bool
+    story: Optional[str]
+    phase: str
+    line: int
+    depends_on: list[str] = field(default_factory=list)
+    files: list[str] = field(default_factory=list)
+    refs: list[str] = field(default_factory=list)
+    section: str = ""  # the ### heading within the phase, e.g. "Tests for User Story 1"
+
+
+@dataclass
+class TaskList:
+    title: str = ""
+    phases: list[str] = field(default_factory=list)
+    tasks: list[Task] = field(default_factory=list)
+    clarifications: list[Marker] = field(default_factory=list)
+    placeholders: list[Marker] = field(default_factory=list)
+
+    def done_count(self) -> int:
+        return sum(1 for task in self.tasks if task.done)
+
+
+DOCUMENT_TYPES = {SPEC: Spec, PLAN: Plan, TASKS: TaskList}
+
+# Cached documents are stored as positional rows rather than dicts: smaller,
+# and much faster to produce than dataclasses.asdict()
+_NESTED = {
+    Spec: {"stories": UserStory, "requirements": Item, "success_criteria": Item, "clarifications": Marker, "placeholders": Marker},
+    Plan: {"clarifications": Marker, "placeholders": Marker},
+    TaskList: {"tasks": Task, "clarifications": Marker, "placeholders": Marker},
+}
+_FIELDS: dict[type, list[str]] = {}
+
+
+def _field_names(cls: type) -> list[str]:
+    names = _FIELDS.get(cls)
+    if names is None:
+        names = _FIELDS[cls] = [f.name for f in fields(cls)]
+    return names
+
+
+def _to_row(obj) -> list:
+    nested = _NESTED.get(type(obj), {})
+    return [
+        [_to_row(item) for item in getattr(obj, name)] if name in nested else getattr(obj, name)
+        for name in _field_names(type(obj))
+    ]
+
+
+def _from_row(cls: type, row: list):
+    nested = _NESTED.get(cls)
+    if not nested:
+        return cls(*row)
+    return cls(*[
+        [_from_row(nested[name], item) for item in value] if name in nested else value
+        for name, value in zip(_field_names(cls), row)
+    ])
+
+
+# ----------------------------------------------------------------------
+# Parsing
+# ----------------------------------------------------------------------
+def _content_lines(text: str):
+    """Yield (line number, line) outside fenced code blocks and HTML comments."""
+    fence = None
+    in_comment = False
+    for number, line in enumerate(text.splitlines(), 1):
+        stripped = line.strip()
+        if fence:
+            if stripped.startswith(fence):
+                fence = None
+            continue
+        if in_comment:
+            end = line.find("-->")
+            if end < 0:
+                continue
+            in_comment = False
+            line = line[end + 3:]
+        if stripped.startswith(("```", "~~~")):
+            fence = stripped[:3]
+            continue
+        while "<!--" in line:
+            start = line.index("<!--")
+            end = line.find("-->", start + 4)
+            if end < 0:
+                line = line[:start]
+                in_comment = True
+                break
+            line = line[:start] + line[end + 3:]
+        yield number, line
+
+
+def _scan_markers(line: str, number: int, clarifications: list[Marker], placeholders: list[Marker]) -> None:
+    for match in CLARIFICATION_RE.finditer(line):
+        clarifications.append(Marker((match.group(1) or "").strip(), number))
+    prose = INLINE_CODE_RE.sub("", line)
+    for match in BRACKET_RE.finditer(prose):
+        token = match.group(1).strip()
+        if token and not NOT_PLACEHOLDER_RE.match(token):
+            placeholders.append(Marker(token, number))
+    for match in TODO_RE.finditer(prose):
+        placeholders.append(Marker(match.group(0), number))
+
+
+def _strip_title(heading: str, prefix: str) -> str:
+    return heading[len(prefix):].strip() if heading.startswith(prefix) else heading
+
+
+def parse_spec(text: str) -> Spec:
+    spec = Spec()
+    section = ""
+    subsection = ""
+    story: Optional[UserStory] = None
+    for number, line in _content_lines(text):
+        heading = HEADING_RE.match(line)
+        if heading:
+            level, title = len(heading.group(1)), heading.group(2)
+            if level == 1 and not spec.title:
+                spec.title = _strip_title(title, "Feature Specification:")
+            elif level == 2:
+                section, subsection, story = title, "", None
+            else:
+                subsection, story = title, None
+                match = STORY_RE.match(title)
+                if match:
+                    story = UserStory(int(match.group(1)), (match.group(2) or "").strip(), match.group(3), number)
+                    spec.stories.append(story)
+            _scan_markers(line, number, spec.clarifications, spec.placeholders)
+            continue
+
+        _scan_markers(line, number, spec.clarifications, spec.placeholders)
+        if not section:
+            for key, value in FIELD_RE.findall(line):
+                spec.metadata[key.strip()] = value
+            continue
+        if story is not None and SCENARIO_RE.match(line):
+            story.scenarios += 1
+            continue
+        item = ITEM_RE.match(line)
+        if item:
+            target = spec.success_criteria if item.group(1).startswith("SC-") else spec.requirements
+            target.append(Item(item.group(1), item.group(2).strip(), number))
+            continue
+        if subsection.startswith("Key Entities"):
+            entity = ENTITY_RE.match(line)
+            if entity:
+                spec.entities.append(entity.group(1).strip())
+    return spec
+
+
+def parse_plan(text: str) -> Plan:
+    plan = Plan()
+    section = ""
+    for number, line in _content_lines(text):
+        heading = HEADING_RE.match(line)
+        if heading:
+            level, title = len(heading.group(1)), heading.group(2)
+            if level == 1 and not plan.title:
+                plan.title = _strip_title(title, "Implementation Plan:")
+            elif level == 2:
+                section = title
+            _scan_markers(line, number, plan.clarifications, plan.placeholders)
+            continue
+
+        _scan_markers(line, number, plan.clarifications, plan.placeholders)
+        fields = FIELD_RE.findall(line)
+        if not fields:
+            continue
+        if not section:
+            for key, value in fields:
+                plan.metadata[key.strip()] = value
+        elif section == "Technical Context":
+            for key, value in fields:
+                key = key.strip()
+                plan.technical_context[key] = value
+                # The template asks for a bare "NEEDS CLARIFICATION" value here
+                if "NEEDS CLARIFICATION" in value and not CLARIFICATION_RE.search(value):
+                    plan.clarifications.append(Marker(key, number))
+    return plan
+
+
+def parse_tasks(text: str) -> TaskList:
+    tasks = TaskList()
+    phase = section = ""
+    for number, line in _content_lines(text):
+        heading = HEADING_RE.match(line)
+        if heading:
+            level, title = len(heading.group(1)), heading.group(2)
+            if level == 1 and not tasks.title:
+                tasks.title = _strip_title(title, "Tasks:")
+            elif level == 2:
+                phase, section = title, ""
+                if title.lower().startswith("phase"):
+                    tasks.phases.append(title)
+            elif level == 3:
+                section = title
+            _scan_markers(line, number, tasks.clarifications, tasks.placeholders)
+            continue
+
+        match = TASK_RE.match(line)
+        if not match:
+            _scan_markers(line, number, tasks.clarifications, tasks.placeholders)
+            continue
+        checkbox, task_id, rest = match.groups()
+        parallel, story = False, None
+        while True:
+            marker = TASK_MARKER_RE.match(rest)
+            if not marker:
+                break
+            if marker.group(1) == "P":
+                parallel = True
+            else:
+                story = marker.group(1)
+            rest = rest[marker.end():]
+        depends_on = []
+        for group in DEPENDS_RE.findall(rest):
+            depends_on.extend(dep for dep in TASK_ID_RE.findall(group) if dep != task_id)
+        files = []
+        # A path with a [placeholder] in it (test_[name].py) is not a real file; mark
+        # where placeholders were and drop any candidate that touches one
+        masked = BRACKET_RE.sub("\0", rest)
+        for path_match in FILE_RE.finditer(masked):
+            start, end = path_match.span()
+            if masked[start - 1:start] == "\0" or masked[end:end + 1] == "\0":
+                continue
+            path = path_match.group(1).rstrip(".")
+            if path not in files:
+                files.append(path)
+        tasks.tasks.append(Task(
+            id=task_id,
+            description=rest.strip(),
+            done=checkbox != " ",
+            parallel=parallel,
+            story=story,
+            phase=phase,
+            line=number,
+            depends_on=depends_on,
+            files=files,
+            refs=sorted(set(REF_RE.findall(rest))),
+            section=section,
+        ))
+        _scan_markers(rest, number, tasks.clarifications, tasks.placeholders)
+    return tasks
+
+
+PARSERS = {SPEC: parse_spec, PLAN: parse_plan, TASKS: parse_tasks}
+
+
+# ----------------------------------------------------------------------
+# Cache
+# ----------------------------------------------------------------------
+class ArtifactCache:
+    """Parse results for one project, reused while a file's size and mtime are unchanged.
+
+    Entries are sharded by directory (one JSON file per feature), so looking
+    at one feature never loads the parse results of the others.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.path = root / CACHE_DIR
+        self._shards: dict[str, dict[str, dict]] = {}
+        self._dirty: set[str] = set()
+        self._now = time.time_ns()
+
+    def _shard(self, name: str) -> dict[str, dict]:
+        entries = self._shards.get(name)
+        if entries is None:
+            entries = {}
+            try:
+                with open(self.path / f"{name}.json", "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == PARSER_VERSION and isinstance(data.get("entries"), dict):
+                    entries = data["entries"]
+            except (OSError, ValueError):
+                pass
+            self._shards[name] = entries
+        return entries
+
+    def load(self, path: Path, kind: str):
+        """Return the parsed document at path (a Spec, Plan or TaskList), or None if it does not exist."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        shard_name = path.parent.name
+        entries = self._shard(shard_name)
+        entry = entries.get(path.name)
+        if (
+            entry is not None
+            and entry["kind"] == kind
+            and entry["size"] == st.st_size
+            and entry["mtime_ns"] == st.st_mtime_ns
+            and st.st_mtime_ns + RACY_NS < entry["cached_at_ns"]
+        ):
+            return _from_row(DOCUMENT_TYPES[kind], entry["data"])
+
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            document = PARSERS[kind](f.read())
+        entries[path.name] = {
+            "kind": kind,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "cached_at_ns": self._now,
+            "data": _to_row(document),
+        }
+        self._dirty.add(shard_name)
+        return document
+
+    def save(self) -> None:
+        """Write back the shards that changed; an unwritable project is not an error."""
+        for name in sorted(self._dirty):
+            target = self.path / f"{name}.json"
+            tmp = target.with_name(target.name + ".tmp")
+            try:
+                ensure_cache_dir(self.path.parent)
+                self.path.mkdir(exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"version": PARSER_VERSION, "entries": self._shards[name]}, f, separators=(",", ":"))
+                os.replace(tmp, target)
+            except OSError:
+                tmp.unlink(missing_ok=True)
+        self._dirty.clear()
+
+
+@dataclass
+class FeatureArtifacts:
+    name: str
+    path: Path
+    spec: Optional[Spec] = None
+    plan: Optional[Plan] = None
+    tasks: Optional[TaskList] = None
+
+
+def load_feature(cache: ArtifactCache, feature_dir: Path) -> FeatureArtifacts:
+    """Parse (or fetch from the cache) the spec, plan and tasks of one feature directory."""
+    return FeatureArtifacts(
+        name=feature_dir.name,
+        path=feature_dir,
+        spec=cache.load(feature_dir / ARTIFACT_NAMES[SPEC], SPEC),
+        plan=cache.load(feature_dir / ARTIFACT_NAMES[PLAN], PLAN),
+        tasks=cache.load(feature_dir / ARTIFACT_NAMES[TASKS], TASKS),
+    )
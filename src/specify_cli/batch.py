@@ -0,0 +1,341 @@
+"""
+Batch project initialization for `specify init --batch`.
+
+A manifest lists the projects to create. The release (the latest, or the one
+given with --release) is resolved once, each distinct template asset is
+downloaded once, and extraction (which also sets script permissions) and
+git initialization then fan out across a worker pool.
+
+Manifest (JSON or TOML):
+
+    [defaults]
+    ai = "claude"
+    script = "sh"
+
+    [[projects]]
+    path = "services/billing"
+
+    [[projects]]
+    path = "services/search"
+    ai = "copilot"
+    no_git = true
+
+Project paths are resolved relative to the manifest file. An existing target
+directory is only merged into when the entry sets ``force = true``.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import tomllib
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+import typer
+from rich.panel import Panel
+from rich.table import Table
+
+from . import (
+    AGENT_CONFIG,
+    SCRIPT_TYPE_CHOICES,
+    StepTracker,
+    TemplateError,
+    _http_client,
+    check_tool,
+    console,
+    download_template_from_github,
+    extract_template_archive,
+    fetch_release,
+    init_git_repo,
+    is_git_repo,
+)
+from .cache import TemplateCache
+from .manifest import manifest_files, write_manifest
+
+POOL_CHOICES = ("thread", "process")
+
+# Steps reported per project, in display order
+PROJECT_STEPS = [
+    ("download", "Template"),
+    ("extract", "Extract"),
+    ("git", "Git"),
+]
+
+
+@dataclass
+class BatchProject:
+    path: Path
+    ai: str
+    script: str
+    no_git: bool = False
+    force: bool = False
+
+    @property
+    def asset_key(self) -> tuple[str, str]:
+        return (self.ai, self.script)
+
+
+def _option(entry: dict, name: str, default=None):
+    """Read a manifest option, accepting both snake_case and CLI-style dashes."""
+    if name in entry:
+        return entry[name]
+    return entry.get(name.replace("_", "-"), default)
+
+
+def load_manifest(manifest_path: Path) -> list[BatchProject]:
+    """Parse and validate a JSON or TOML batch manifest."""
+    try:
+        if manifest_path.suffix.lower() == ".toml":
+            with open(manifest_path, "rb") as f:
+                data = tomllib.load(f)
+        else:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Could not read manifest {manifest_path}: {e}")
+
+    if isinstance(data, list):
+        data = {"projects": data}
+    defaults = data.get("defaults", {}) or {}
+    entries = data.get("projects")
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("Manifest must contain a non-empty 'projects' list")
+
+    default_script = "ps" if os.name == "nt" else "sh"
+    base_dir = manifest_path.resolve().parent
+    projects: list[BatchProject] = []
+    seen: set[Path] = set()
+    errors: list[str] = []
+
+    for i, entry in enumerate(entries, start=1):
+        if isinstance(entry, str):
+            entry = {"path": entry}
+        merged = {**defaults, **entry}
+        raw_path = merged.get("path")
+        if not raw_path:
+            errors.append(f"project #{i}: missing 'path'")
+            continue
+        path = (base_dir / Path(raw_path).expanduser()).resolve()
+        ai = _option(merged, "ai")
+        script = _option(merged, "script", default_script)
+
+        if ai not in AGENT_CONFIG:
+            errors.append(f"{raw_path}: invalid or missing 'ai' ({ai!r}); choose from {', '.join(AGENT_CONFIG)}")
+            continue
+        if script not in SCRIPT_TYPE_CHOICES:
+            errors.append(f"{raw_path}: invalid 'script' ({script!r}); choose from {', '.join(SCRIPT_TYPE_CHOICES)}")
+            continue
+        if path in seen:
+            errors.append(f"{raw_path}: listed more than once")
+            continue
+        seen.add(path)
+
+        projects.append(BatchProject(
+            path=path,
+            ai=ai,
+            script=script,
+            no_git=bool(_option(merged, "no_git", False)),
+            force=bool(_option(merged, "force", False)),
+        ))
+
+    if errors:
+        raise ValueError("Invalid manifest:\n" + "\n".join(f"  - {e}" for e in errors))
+    return projects
+
+
+def init_batch_project(project: BatchProject, zip_path: str, asset_detail: str, git_available: bool, release: str) -> StepTracker:
+    """Extract and git-init a single project. Runs inside a pool worker."""
+    tracker = StepTracker(str(project.path))
+    for key, label in PROJECT_STEPS:
+        tracker.add(key, label)
+    tracker.complete("download", asset_detail)
+
+    merge = project.path.exists()
+    created = False
+    tracker.start("extract")
+    try:
+        if merge and not project.force:
+            raise FileExistsError("directory exists (set force = true to merge)")
+        project.path.mkdir(parents=True, exist_ok=merge)
+        created = not merge
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            summary = extract_template_archive(zip_ref, project.path, merge=merge, verbose=False, tracker=tracker)
+        write_manifest(project.path, release=release, ai=project.ai, script=project.script, files=summary["hashes"])
+        tracker.complete("extract", f"{summary['files']} files" + (f" merged, {summary['identical']} identical" if merge else ""))
+    except Exception as e:
+        tracker.error("extract", str(e))
+        tracker.skip("git")
+        # Like single-project init, don't leave a half-extracted new directory behind
+        if created:
+            shutil.rmtree(project.path, ignore_errors=True)
+        return tracker
+
+    if project.no_git:
+        tracker.skip("git", "no_git")
+    elif is_git_repo(project.path):
+        tracker.complete("git", "existing repo detected")
+    elif not git_available:
+        tracker.skip("git", "git not available")
+    else:
+        success, error_msg = init_git_repo(project.path, quiet=True, files=manifest_files(project.path), tracker=tracker)
+        if not success:
+            tracker.error("git", (error_msg or "init failed").splitlines()[-1])
+    return tracker
+
+
+def _failed(tracker: StepTracker) -> bool:
+    return any(step["status"] == "error" for step in tracker.steps)
+
+
+def render_results(projects: list[BatchProject], results: dict[Path, StepTracker]) -> Table:
+    """Build a per-project result table from each project's StepTracker."""
+    symbols = {
+        "done": "[green]●[/green]",
+        "error": "[red]●[/red]",
+        "skipped": "[yellow]○[/yellow]",
+        "running": "[cyan]○[/cyan]",
+        "pending": "[green dim]○[/green dim]",
+    }
+    table = Table(title="Batch Initialization", border_style="cyan", show_lines=False)
+    table.add_column("Project", style="cyan", overflow="fold")
+    table.add_column("Agent")
+    for _, label in PROJECT_STEPS:
+        table.add_column(label, overflow="fold")
+
+    for project in projects:
+        tracker = results.get(project.path)
+        cells = []
+        for key, _ in PROJECT_STEPS:
+            step = tracker.get(key) if tracker else None
+            if step is None:
+                cells.append("[bright_black]-[/bright_black]")
+                continue
+            detail = f" [bright_black]{step['detail']}[/bright_black]" if step["detail"] else ""
+            cells.append(f"{symbols.get(step['status'], ' ')}{detail}")
+        table.add_row(str(project.path), f"{project.ai} ({project.script})", *cells)
+    return table
+
+
+def run_batch_init(
+    manifest_path: Path,
+    *,
+    jobs: int | None = None,
+    pool: str = "thread",
+    ignore_agent_tools: bool = False,
+    skip_tls: bool = False,
+    debug: bool = False,
+    github_token: str | None = None,
+    no_cache: bool = False,
+    release_tag: str | None = None,
+    source=None,
+) -> None:
+    """Initialize every project listed in a manifest. Exits non-zero if any project fails."""
+    if pool not in POOL_CHOICES:
+        console.print(f"[red]Error:[/red] Invalid pool '{pool}'. Choose from: {', '.join(POOL_CHOICES)}")
+        raise typer.Exit(1)
+
+    try:
+        projects = load_manifest(manifest_path)
+    except ValueError as e:
+        console.print(Panel(str(e), title="[red]Manifest Error[/red]", border_style="red"))
+        raise typer.Exit(1)
+
+    workers = jobs or min(32, (os.cpu_count() or 1) + 4)
+    console.print(f"[cyan]Batch manifest:[/cyan] {manifest_path} ({len(projects)} projects, {workers} {pool} workers)")
+
+    git_available = check_tool("git") if any(not p.no_git for p in projects) else False
+    if not git_available and any(not p.no_git for p in projects):
+        console.print("[yellow]Git not found - will skip repository initialization[/yellow]")
+
+    results: dict[Path, StepTracker] = {}
+    blocked: dict[tuple[str, str], str] = {}
+
+    if not ignore_agent_tools:
+        for ai in sorted({p.ai for p in projects}):
+            agent_config = AGENT_CONFIG[ai]
+            if agent_config["requires_cli"] and not check_tool(ai):
+                for script in SCRIPT_TYPE_CHOICES:
+                    blocked[(ai, script)] = f"{ai} CLI not found (use --ignore-agent-tools)"
+
+    client = _http_client(verify=not skip_tls)
+    template_cache = None if no_cache else TemplateCache()
+    asset_keys = sorted({p.asset_key for p in projects} - set(blocked))
+
+    with tempfile.TemporaryDirectory(prefix="specify-batch-") as download_dir:
+        assets: dict[tuple[str, str], tuple[Path, str]] = {}
+        if asset_keys:
+            with console.status(f"[cyan]Fetching release {release_tag or '(latest)'}...[/cyan]"):
+                release_data = fetch_release(client, tag=release_tag, verbose=False, debug=debug, github_token=github_token, cache=template_cache, source=source)
+
+            def fetch_asset(key):
+                ai, script = key
+                return download_template_from_github(
+                    ai,
+                    Path(download_dir),
+                    script_type=script,
+                    verbose=False,
+                    show_progress=False,
+                    client=client,
+                    debug=debug,
+                    github_token=github_token,
+                    cache=template_cache,
+                    release_data=release_data,
+                    source=source,
+                )
+
+            with console.status(f"[cyan]Downloading {len(asset_keys)} template(s) from {release_data['tag_name']}...[/cyan]"):
+                with ThreadPoolExecutor(max_workers=min(workers, len(asset_keys))) as executor:
+                    futures = {executor.submit(fetch_asset, key): key for key in asset_keys}
+                    for future in as_completed(futures):
+                        key = futures[future]
+                        try:
+                            zip_path, meta = future.result()
+                        except TemplateError as e:
+                            # The first line is the reason; DownloadError details carry headers and body after it
+                            blocked[key] = str(e).splitlines()[0]
+                            continue
+                        except Exception as e:
+                            blocked[key] = f"download failed: {e}" if str(e) else "download failed"
+                            continue
+                        detail = f"{meta['release']}" + (" (cached)" if meta["cache_hit"] else " (mirror)" if meta["mirror"] else "")
+                        assets[key] = (zip_path, detail)
+
+        for project in projects:
+            if project.asset_key in blocked:
+                tracker = StepTracker(str(project.path))
+                for key, label in PROJECT_STEPS:
+                    tracker.add(key, label)
+                tracker.error("download", blocked[project.asset_key])
+                results[project.path] = tracker
+
+        runnable = [p for p in projects if p.asset_key in assets]
+        executor_cls = ProcessPoolExecutor if pool == "process" else ThreadPoolExecutor
+        if runnable:
+            with console.status(f"[cyan]Initializing {len(runnable)} project(s)...[/cyan]") as status:
+                with executor_cls(max_workers=min(workers, len(runnable))) as executor:
+                    futures = {
+                        executor.submit(init_batch_project, p, str(assets[p.asset_key][0]), assets[p.asset_key][1], git_available, release_data["tag_name"]): p
+                        for p in runnable
+                    }
+                    done = 0
+                    for future in as_completed(futures):
+                        project = futures[future]
+                        try:
+                            results[project.path] = future.result()
+                        except Exception as e:
+                            tracker = StepTracker(str(project.path))
+                            tracker.error("extract", str(e))
+                            results[project.path] = tracker
+                        done += 1
+                        status.update(f"[cyan]Initializing projects... {done}/{len(runnable)}[/cyan]")
+
+    console.print(render_results(projects, results))
+
+    failed = [p for p in projects if _failed(results[p.path])]
+    if failed:
+        console.print(f"\n[red]{len(failed)} of {len(projects)} project(s) failed.[/red]")
+        raise typer.Exit(1)
+    console.print(f"\n[bold green]{len(projects)} project(s) ready.[/bold green]")
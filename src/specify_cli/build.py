@@ -0,0 +1,324 @@
+"""
+Release template package builder.
+
+Python port of `.github/workflows/scripts/create-release-packages.sh`. Each
+`templates/commands/*.md` file is read and its frontmatter parsed once; the
+`{SCRIPT}`, `{AGENT_SCRIPT}`, `{ARGS}` and `__AGENT__` placeholders and the
+memory/scripts/templates path rewrites are applied in memory for every
+agent x script variant. Package trees are written under the output directory
+(default `.genreleases/`) with the same contents as the shell pipeline, and
+all variants are built and zipped in parallel.
+
+Usage:
+    specify build-templates v0.0.21
+    specify build-templates v0.0.21 --agents claude,copilot --scripts sh
+"""
+
+import os
+import re
+import shutil
+import stat
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+VERSION_PATTERN = re.compile(r"^v\d+\.\d+\.\d+$")
+
+ALL_SCRIPTS = ["sh", "ps"]
+
+# Script variant -> source directory under scripts/
+SCRIPT_DIRS = {"sh": "bash", "ps": "powershell"}
+
+# NOTE: {ARGS} is substituted internally. Outward tokens differ intentionally:
+#   * Markdown/prompt agents: $ARGUMENTS
+#   * TOML agents (gemini, qwen): {{args}}
+# agent -> (commands directory, file extension, argument token)
+AGENT_FORMATS = {
+    "claude": (".claude/commands", "md", "$ARGUMENTS"),
+    "gemini": (".gemini/commands", "toml", "{{args}}"),
+    "copilot": (".github/prompts", "prompt.md", "$ARGUMENTS"),
+    "cursor-agent": (".cursor/commands", "md", "$ARGUMENTS"),
+    "qwen": (".qwen/commands", "toml", "{{args}}"),
+    "opencode": (".opencode/command", "md", "$ARGUMENTS"),
+    "windsurf": (".windsurf/workflows", "md", "$ARGUMENTS"),
+    "codex": (".codex/prompts", "md", "$ARGUMENTS"),
+    "kilocode": (".kilocode/workflows", "md", "$ARGUMENTS"),
+    "auggie": (".augment/commands", "md", "$ARGUMENTS"),
+    "roo": (".roo/commands", "md", "$ARGUMENTS"),
+    "codebuddy": (".codebuddy/commands", "md", "$ARGUMENTS"),
+    "amp": (".agents/commands", "md", "$ARGUMENTS"),
+    "q": (".amazonq/prompts", "md", "$ARGUMENTS"),
+}
+
+ALL_AGENTS = list(AGENT_FORMATS)
+
+# Extra files copied into specific agent packages: agent -> [(source, destination)]
+AGENT_EXTRA_FILES = {
+    "gemini": [("agent_templates/gemini/GEMINI.md", "GEMINI.md")],
+    "qwen": [("agent_templates/qwen/QWEN.md", "QWEN.md")],
+    "copilot": [("templates/vscode-settings.json", ".vscode/settings.json")],
+}
+
+_PATH_REWRITES = [
+    (re.compile(r"(/?)memory/"), ".specify/memory/"),
+    (re.compile(r"(/?)scripts/"), ".specify/scripts/"),
+    (re.compile(r"(/?)templates/"), ".specify/templates/"),
+]
+
+
+class BuildError(Exception):
+    """Raised for invalid build arguments or inputs."""
+
+
+def _sed_replacement(replacement: str, matched: str) -> str:
+    """Expand a sed s/// replacement string (& and backslash escapes) literally."""
+    out = []
+    i = 0
+    while i < len(replacement):
+        ch = replacement[i]
+        if ch == "\\" and i + 1 < len(replacement):
+            nxt = replacement[i + 1]
+            out.append("\n" if nxt == "n" else nxt)
+            i += 2
+            continue
+        out.append(matched if ch == "&" else ch)
+        i += 1
+    return "".join(out)
+
+
+def _sed_sub(text: str, literal: str, replacement: str) -> str:
+    return text.replace(literal, _sed_replacement(replacement, literal))
+
+
+@dataclass
+class CommandTemplate:
+    """A command template with its frontmatter parsed once."""
+
+    name: str
+    content: str  # \r removed, trailing newlines stripped (as $(...) does)
+    description: str
+    script_commands: dict[str, str] = field(default_factory=dict)
+    agent_script_commands: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def parse(cls, path: Path) -> "CommandTemplate":
+        content = path.read_bytes().decode("utf-8").replace("\r", "").rstrip("\n")
+        lines = content.split("\n")
+
+        description = ""
+        for line in lines:
+            if line.startswith("description:"):
+                description = line[len("description:"):].lstrip(" \t")
+                break
+
+        script_commands: dict[str, str] = {}
+        agent_script_commands: dict[str, str] = {}
+        for variant in ALL_SCRIPTS:
+            prefix = re.compile(rf"^[ \t]*{variant}:[ \t]*")
+            for line in lines:
+                match = prefix.match(line)
+                if match:
+                    script_commands[variant] = line[match.end():]
+                    break
+
+            in_agent_scripts = False
+            for line in lines:
+                if line == "agent_scripts:":
+                    in_agent_scripts = True
+                    continue
+                if in_agent_scripts:
+                    match = prefix.match(line)
+                    if match:
+                        agent_script_commands[variant] = line[match.end():]
+                        break
+                    if re.match(r"^[a-zA-Z]", line):
+                        in_agent_scripts = False
+
+        return cls(path.stem, content, description, script_commands, agent_script_commands)
+
+    def render_variant(self, script: str) -> str:
+        """Substitute script placeholders and drop the scripts/agent_scripts frontmatter."""
+        script_command = self.script_commands.get(script)
+        if not script_command:
+            print(f"Warning: no script command found for {script} in templates/commands/{self.name}.md", file=sys.stderr)
+            script_command = f"(Missing script command for {script})"
+
+        body = _sed_sub(self.content, "{SCRIPT}", script_command)
+        agent_script_command = self.agent_script_commands.get(script)
+        if agent_script_command:
+            body = _sed_sub(body, "{AGENT_SCRIPT}", agent_script_command)
+
+        out = []
+        dash_count = 0
+        in_frontmatter = False
+        skip_scripts = False
+        for line in body.split("\n"):
+            if line == "---":
+                out.append(line)
+                dash_count += 1
+                in_frontmatter = dash_count == 1
+                continue
+            if in_frontmatter and line in ("scripts:", "agent_scripts:"):
+                skip_scripts = True
+                continue
+            if in_frontmatter and skip_scripts and re.match(r"^[a-zA-Z].*:", line):
+                skip_scripts = False
+            if in_frontmatter and skip_scripts and re.match(r"^[ \t]", line):
+                continue
+            out.append(line)
+        return "\n".join(out).rstrip("\n")
+
+    def render(self, variant_body: str, agent: str, ext: str, arg_format: str) -> str:
+        """Apply agent substitutions to a variant body and format it for ext."""
+        body = _sed_sub(variant_body, "{ARGS}", arg_format)
+        body = _sed_sub(body, "__AGENT__", agent)
+        for pattern, replacement in _PATH_REWRITES:
+            body = pattern.sub(replacement, body)
+        body = body.rstrip("\n")
+
+        if ext == "toml":
+            body = body.replace("\\", "\\\\")
+            return f'description = "{self.description}"\n\nprompt = """\n{body}\n"""\n'
+        return f"{body}\n"
+
+
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Read once at import; os.umask can only be queried by setting it
+_UMASK = _current_umask()
+
+
+def _copy_file(src: Path, dest: Path) -> None:
+    """Copy src to dest, masking its permissions with the umask like `cp` does."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(src, dest)
+    os.chmod(dest, stat.S_IMODE(src.stat().st_mode) & ~_UMASK)
+
+
+def _copy_tree(src: Path, dest: Path) -> None:
+    for path in sorted(src.rglob("*")):
+        if path.is_file():
+            _copy_file(path, dest / path.relative_to(src))
+
+
+def zip_directory(base_dir: Path, zip_path: Path) -> None:
+    """Zip a package tree (like `cd base_dir && zip -r zip_path .`) in a stable order."""
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for root, dirs, files in os.walk(base_dir):
+            dirs.sort()
+            root_path = Path(root)
+            for name in dirs:
+                zf.write(root_path / name, (root_path / name).relative_to(base_dir).as_posix() + "/")
+            for name in sorted(files):
+                zf.write(root_path / name, (root_path / name).relative_to(base_dir).as_posix())
+
+
+class ReleaseBuilder:
+    """Build release template packages from a spec-kit source checkout."""
+
+    def __init__(self, source_dir: Path, output_dir: Path, version: str):
+        if not VERSION_PATTERN.match(version):
+            raise BuildError("Version must look like v0.0.0")
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self.version = version
+        commands_dir = source_dir / "templates" / "commands"
+        self.templates = [CommandTemplate.parse(p) for p in sorted(commands_dir.glob("*.md")) if p.is_file()]
+        self._variant_bodies: dict[str, list[str]] = {}
+
+    def _bodies_for(self, script: str) -> list[str]:
+        # Script placeholders depend only on the script variant, so share across agents
+        if script not in self._variant_bodies:
+            self._variant_bodies[script] = [t.render_variant(script) for t in self.templates]
+        return self._variant_bodies[script]
+
+    def package_dir(self, agent: str, script: str) -> Path:
+        return self.output_dir / f"sdd-{agent}-package-{script}"
+
+    def zip_path(self, agent: str, script: str) -> Path:
+        return self.output_dir / f"spec-kit-template-{agent}-{script}-{self.version}.zip"
+
+    def _copy_base(self, base_dir: Path, script: str) -> None:
+        src = self.source_dir
+        spec_dir = base_dir / ".specify"
+        spec_dir.mkdir(parents=True, exist_ok=True)
+
+        if (src / "memory").is_dir():
+            _copy_tree(src / "memory", spec_dir / "memory")
+
+        if (src / "scripts").is_dir():
+            (spec_dir / "scripts").mkdir(parents=True, exist_ok=True)
+            variant_dir = src / "scripts" / SCRIPT_DIRS[script]
+            if variant_dir.is_dir():
+                _copy_tree(variant_dir, spec_dir / "scripts" / SCRIPT_DIRS[script])
+            # Script files that aren't in variant-specific directories
+            for path in sorted((src / "scripts").iterdir()):
+                if path.is_file():
+                    _copy_file(path, spec_dir / "scripts" / path.name)
+
+        templates_dir = src / "templates"
+        if templates_dir.is_dir():
+            (spec_dir / "templates").mkdir(parents=True, exist_ok=True)
+            for path in sorted(templates_dir.rglob("*")):
+                rel = path.relative_to(src)
+                if not path.is_file() or rel.parts[1] == "commands" or path.name == "vscode-settings.json":
+                    continue
+                _copy_file(path, spec_dir / rel)
+
+    def build_variant(self, agent: str, script: str) -> Path:
+        """Write the package tree for one variant and zip it. Returns the zip path."""
+        commands_dir, ext, arg_format = AGENT_FORMATS[agent]
+        base_dir = self.package_dir(agent, script)
+        self._copy_base(base_dir, script)
+
+        output_dir = base_dir / commands_dir
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for template, variant_body in zip(self.templates, self._bodies_for(script)):
+            rendered = template.render(variant_body, agent, ext, arg_format)
+            (output_dir / f"speckit.{template.name}.{ext}").write_bytes(rendered.encode("utf-8"))
+
+        for src_rel, dest_rel in AGENT_EXTRA_FILES.get(agent, []):
+            src = self.source_dir / src_rel
+            if src.is_file():
+                _copy_file(src, base_dir / dest_rel)
+
+        zip_path = self.zip_path(agent, script)
+        zip_directory(base_dir, zip_path)
+        return zip_path
+
+    def build(self, agents: list[str], scripts: list[str], jobs: int | None = None) -> list[Path]:
+        """Build every requested agent x script variant in parallel."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for child in self.output_dir.iterdir():
+            if child.is_dir() and not child.is_symlink():
+                shutil.rmtree(child)
+            else:
+                child.unlink()
+
+        # Render script variants up front so worker threads only read shared state
+        for script in scripts:
+            self._bodies_for(script)
+
+        variants = [(agent, script) for agent in agents for script in scripts]
+        with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) + 4)) as pool:
+            return list(pool.map(lambda v: self.build_variant(*v), variants))
+
+
+def parse_selection(value: str | None, allowed: list[str], kind: str) -> list[str]:
+    """Parse a comma/space separated subset (order of first occurrence kept)."""
+    if not value:
+        return list(allowed)
+    items = []
+    for item in value.replace(",", " ").split():
+        if item not in items:
+            items.append(item)
+    unknown = [i for i in items if i not in allowed]
+    if unknown:
+        raise BuildError(f"unknown {kind} {', '.join(repr(u) for u in unknown)} (allowed: {' '.join(allowed)})")
+    return items
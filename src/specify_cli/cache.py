@@ -0,0 +1,322 @@
+"""
+Local template cache for the Specify CLI.
+
+Release template archives are stored content-addressed (by sha256) under the
+user cache directory, and indexed by release tag and asset name so that a warm
+`specify init` can reuse an archive without downloading it again. The latest
+release metadata is kept alongside with its ETag so it can be revalidated with
+a conditional request.
+
+Layout:
+    <cache dir>/templates/index.json
+    <cache dir>/templates/blobs/<sha256>.zip
+    <cache dir>/templates/partial/<tag>-<asset>.part   (interrupted downloads)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+CACHE_APP_NAME = "specify-cli"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_RELEASE_TTL = 300
+INDEX_VERSION = 1
+# Unreferenced files and partial downloads touched more recently than this are
+# assumed to belong to a download still running in another process
+PARTIAL_GRACE = 3600
+
+# Only these asset fields are needed to resolve and verify a template
+_ASSET_FIELDS = ("name", "size", "browser_download_url", "digest")
+
+
+def default_cache_dir() -> Path:
+    """Return the cache root, honouring SPECIFY_CACHE_DIR when set."""
+    override = os.getenv("SPECIFY_CACHE_DIR", "").strip()
+    if override:
+        return Path(override).expanduser()
+    import platformdirs
+    return Path(platformdirs.user_cache_dir(CACHE_APP_NAME))
+
+
+def default_max_bytes() -> int:
+    """Return the cache size limit, honouring SPECIFY_CACHE_MAX_MB when set."""
+    raw = os.getenv("SPECIFY_CACHE_MAX_MB", "").strip()
+    if raw:
+        try:
+            return max(0, int(raw)) * 1024 * 1024
+        except ValueError:
+            pass
+    return DEFAULT_MAX_BYTES
+
+
+def default_release_ttl() -> int:
+    """Return how long (seconds) cached latest-release metadata is used without
+    revalidation, honouring SPECIFY_RELEASE_TTL when set."""
+    raw = os.getenv("SPECIFY_RELEASE_TTL", "").strip()
+    if raw:
+        try:
+            return max(0, int(raw))
+        except ValueError:
+            pass
+    return DEFAULT_RELEASE_TTL
+
+
+def asset_sha256(asset: dict) -> Optional[str]:
+    """Return the hex sha256 advertised by the GitHub API for an asset, if any."""
+    digest = asset.get("digest") or ""
+    if digest.startswith("sha256:"):
+        return digest.split(":", 1)[1].lower()
+    return None
+
+
+def file_sha256(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def slim_release(release_data: dict) -> dict:
+    """Strip a release payload down to the fields used to resolve templates."""
+    return {
+        "tag_name": release_data.get("tag_name"),
+        "assets": [
+            {k: a.get(k) for k in _ASSET_FIELDS if k in a}
+            for a in release_data.get("assets", [])
+        ],
+    }
+
+
+class TemplateCache:
+    """Content-addressed store of release template archives with LRU eviction."""
+
+    def __init__(self, root: Path | None = None, max_bytes: int | None = None):
+        self.root = (root or default_cache_dir()) / "templates"
+        self.blobs_dir = self.root / "blobs"
+        self.partial_dir = self.root / "partial"
+        self.index_path = self.root / "index.json"
+        self.max_bytes = default_max_bytes() if max_bytes is None else max_bytes
+        # Serializes index read-modify-write cycles between threads (e.g. batch downloads)
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Index persistence
+    # ------------------------------------------------------------------
+    def _load(self) -> dict:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION:
+                index.setdefault("releases", {})
+                index.setdefault("entries", {})
+                index.setdefault("rate_limit", {})
+                return index
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            pass
+        return {"version": INDEX_VERSION, "releases": {}, "entries": {}, "rate_limit": {}}
+
+    def _save(self, index: dict) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".index-", suffix=".json", dir=self.root)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=2)
+            os.replace(tmp, self.index_path)
+        except Exception:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _entry_key(tag: str, asset_name: str) -> str:
+        return f"{tag}/{asset_name}"
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.blobs_dir / f"{sha256}.zip"
+
+    # ------------------------------------------------------------------
+    # Release metadata
+    # ------------------------------------------------------------------
+    def get_release(self, key: str) -> Optional[dict]:
+        """Return cached release record ``{"etag", "data", "fetched_at"}`` for key."""
+        return self._load()["releases"].get(key)
+
+    def put_release(self, key: str, release_data: dict, etag: str | None) -> None:
+        with self._lock:
+            index = self._load()
+            index["releases"][key] = {
+                "etag": etag,
+                "data": slim_release(release_data),
+                "fetched_at": time.time(),
+            }
+            self._save(index)
+
+    def touch_release(self, key: str) -> None:
+        """Mark a cached release as just revalidated (e.g. after a 304)."""
+        with self._lock:
+            index = self._load()
+            record = index["releases"].get(key)
+            if record:
+                record["fetched_at"] = time.time()
+                self._save(index)
+
+    def get_rate_limit(self) -> dict:
+        """Return the last seen GitHub rate-limit state ``{"remaining", "reset"}``."""
+        return self._load()["rate_limit"]
+
+    def set_rate_limit(self, remaining: int, reset: float | None) -> None:
+        with self._lock:
+            index = self._load()
+            if index["rate_limit"] == {"remaining": remaining, "reset": reset}:
+                return
+            index["rate_limit"] = {"remaining": remaining, "reset": reset}
+            self._save(index)
+
+    # ------------------------------------------------------------------
+    # Template archives
+    # ------------------------------------------------------------------
+    def lookup(self, tag: str, asset_name: str, sha256: str | None = None, size: int | None = None) -> Optional[Path]:
+        """Return the cached archive for (tag, asset) if it matches the expected checksum/size."""
+        with self._lock:
+            index = self._load()
+            key = self._entry_key(tag, asset_name)
+            entry = index["entries"].get(key)
+            if not entry:
+                return None
+            if sha256 and entry.get("sha256") != sha256:
+                return None
+            if size is not None and entry.get("size") != size:
+                return None
+            blob = self._blob_path(entry["sha256"])
+            try:
+                if blob.stat().st_size != entry.get("size"):
+                    return None
+            except OSError:
+                index["entries"].pop(key, None)
+                self._save(index)
+                return None
+            entry["last_used"] = time.time()
+            self._save(index)
+            return blob
+
+    def partial_path(self, tag: str, asset_name: str) -> Path:
+        """Return the staging path for an in-progress download of (tag, asset)."""
+        return self.partial_dir / f"{tag}-{asset_name}"
+
+    def store(self, tag: str, asset_name: str, source: Path, sha256: str | None = None, etag: str | None = None) -> Path:
+        """Move a downloaded archive into the cache and return its cached path."""
+        sha256 = sha256 or file_sha256(source)
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        blob = self._blob_path(sha256)
+        if blob.exists():
+            source.unlink(missing_ok=True)
+        else:
+            fd, tmp = tempfile.mkstemp(prefix=".blob-", suffix=".part", dir=self.blobs_dir)
+            os.close(fd)
+            try:
+                shutil.move(str(source), tmp)
+                os.replace(tmp, blob)
+            except Exception:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+
+        now = time.time()
+        with self._lock:
+            index = self._load()
+            index["entries"][self._entry_key(tag, asset_name)] = {
+                "tag": tag,
+                "asset": asset_name,
+                "sha256": sha256,
+                "size": blob.stat().st_size,
+                "etag": etag,
+                "created": now,
+                "last_used": now,
+            }
+            self._evict(index, keep=sha256)
+            self._save(index)
+        return blob
+
+    def entries(self) -> list[dict]:
+        """Return cache entries, most recently used first."""
+        entries = list(self._load()["entries"].values())
+        entries.sort(key=lambda e: e.get("last_used", 0), reverse=True)
+        return entries
+
+    def total_bytes(self) -> int:
+        if not self.blobs_dir.is_dir():
+            return 0
+        return sum(p.stat().st_size for p in self.blobs_dir.glob("*.zip"))
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+    def _evict(self, index: dict, keep: str | None = None, max_bytes: int | None = None) -> list[dict]:
+        """Drop least recently used entries until blobs fit within max_bytes."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = index["entries"]
+
+        # Blob size counted once however many entries reference it
+        blob_last_used: dict[str, float] = {}
+        blob_size: dict[str, int] = {}
+        for entry in entries.values():
+            sha = entry["sha256"]
+            blob_last_used[sha] = max(blob_last_used.get(sha, 0), entry.get("last_used", 0))
+            blob_size[sha] = entry.get("size", 0)
+
+        total = sum(blob_size.values())
+        removed: list[dict] = []
+        for sha in sorted(blob_last_used, key=blob_last_used.get):
+            if total <= limit:
+                break
+            if sha == keep:
+                continue
+            for key in [k for k, e in entries.items() if e["sha256"] == sha]:
+                removed.append(entries.pop(key))
+            self._blob_path(sha).unlink(missing_ok=True)
+            total -= blob_size[sha]
+        return removed
+
+    def prune(self, max_bytes: int | None = None, grace: float = PARTIAL_GRACE) -> tuple[list[dict], int]:
+        """Evict entries over the size limit and delete orphaned files and partial downloads.
+
+        Orphans and partial downloads modified within the last `grace` seconds
+        are kept, since another `specify init` may still be writing them.
+
+        Returns (removed entries, number of orphaned files deleted).
+        """
+        cutoff = time.time() - grace
+        with self._lock:
+            index = self._load()
+            removed = self._evict(index, max_bytes=max_bytes)
+
+            referenced = {e["sha256"] for e in index["entries"].values()}
+            orphans = 0
+            for directory in (self.blobs_dir, self.partial_dir):
+                if not directory.is_dir():
+                    continue
+                for path in directory.iterdir():
+                    if directory == self.blobs_dir and path.suffix == ".zip" and path.stem in referenced:
+                        continue
+                    try:
+                        if path.stat().st_mtime > cutoff:
+                            continue
+                        path.unlink()
+                        orphans += 1
+                    except OSError:
+                        pass
+
+            self._save(index)
+        return removed, orphans
+
+    def clear(self) -> int:
+        """Remove every cached archive and release record. Returns bytes freed."""
+        freed = self.total_bytes()
+        if self.root.exists():
+            shutil.rmtree(self.root)
+        return freed
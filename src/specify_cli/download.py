@@ -0,0 +1,318 @@
+"""
+Resumable HTTP downloads for release assets.
+
+Bytes are written to ``<dest>.part`` next to a small ``<dest>.part.json``
+state file recording the URL, expected size, validator (ETag) and how far
+each byte range has got. A dropped connection is retried with a
+``Range`` request from the last written byte, and a later run pointed at the
+same destination picks up where the previous one stopped. Assets of at least
+``PARALLEL_THRESHOLD`` bytes are fetched as several ranges in parallel when the
+server honours range requests.
+
+Writes are coalesced into buffers sized from the measured throughput, and
+progress callbacks are rate-limited so rendering never dominates the transfer.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+STATE_VERSION = 1
+DEFAULT_RETRIES = 3
+PARALLEL_THRESHOLD = 8 * 1024 * 1024
+DEFAULT_SEGMENTS = 4
+PROGRESS_INTERVAL = 0.1
+
+MIN_CHUNK = 64 * 1024
+MAX_CHUNK = 8 * 1024 * 1024
+# Aim to flush (and checkpoint) roughly this often at the observed throughput
+CHUNK_TARGET_SECONDS = 0.25
+
+
+class DownloadError(RuntimeError):
+    """Raised when a download cannot be completed; the partial file is kept for resuming."""
+
+
+def download_segments() -> int:
+    """Return the parallel range count, honouring SPECIFY_DOWNLOAD_SEGMENTS when set."""
+    raw = os.getenv("SPECIFY_DOWNLOAD_SEGMENTS", "").strip()
+    if raw:
+        try:
+            return max(1, int(raw))
+        except ValueError:
+            pass
+    return DEFAULT_SEGMENTS
+
+
+def partial_paths(dest: Path) -> tuple[Path, Path]:
+    """Return the (.part, .part.json) paths used while downloading dest."""
+    return dest.with_name(dest.name + ".part"), dest.with_name(dest.name + ".part.json")
+
+
+def discard_partial(dest: Path) -> None:
+    for path in partial_paths(dest):
+        path.unlink(missing_ok=True)
+
+
+class AdaptiveChunker:
+    """Pick a write size that tracks throughput, between MIN_CHUNK and MAX_CHUNK."""
+
+    def __init__(self):
+        self.size = MIN_CHUNK
+        self._started = time.monotonic()
+        self._bytes = 0
+
+    def observe(self, nbytes: int) -> None:
+        self._bytes += nbytes
+        elapsed = time.monotonic() - self._started
+        if elapsed > 0:
+            rate = self._bytes / elapsed
+            self.size = int(min(MAX_CHUNK, max(MIN_CHUNK, rate * CHUNK_TARGET_SECONDS)))
+
+
+class _Progress:
+    """Thread-safe byte counter that calls back at most every PROGRESS_INTERVAL seconds."""
+
+    def __init__(self, total: int | None, done: int, callback: Optional[Callable[[int, int | None], None]]):
+        self.total = total
+        self.done = done
+        self.callback = callback
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, nbytes: int) -> bool:
+        """Count nbytes; returns True when a checkpoint is due."""
+        with self._lock:
+            self.done += nbytes
+            now = time.monotonic()
+            if now - self._last < PROGRESS_INTERVAL:
+                return False
+            self._last = now
+        if self.callback:
+            self.callback(self.done, self.total)
+        return True
+
+    def reset(self, done: int) -> None:
+        with self._lock:
+            self.done = done
+
+    def finish(self) -> None:
+        if self.callback:
+            self.callback(self.done, self.total)
+
+
+class _State:
+    """The .part.json sidecar: per-range progress for a partial download."""
+
+    def __init__(self, path: Path, url: str, size: int | None, segments: list[list[int]], etag: str | None = None):
+        self.path = path
+        self.url = url
+        self.size = size
+        self.segments = segments  # [start, end (exclusive), bytes written]
+        self.etag = etag
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path, url: str, size: int | None) -> Optional["_State"]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != STATE_VERSION or data.get("url") != url or data.get("size") != size:
+            return None
+        segments = data.get("segments") or []
+        if not all(isinstance(s, list) and len(s) == 3 for s in segments):
+            return None
+        return cls(path, url, size, segments, data.get("etag"))
+
+    @property
+    def written(self) -> int:
+        return sum(s[2] for s in self.segments)
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                "version": STATE_VERSION,
+                "url": self.url,
+                "size": self.size,
+                "etag": self.etag,
+                "segments": self.segments,
+            }
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+
+
+def _plan_segments(size: int | None, count: int) -> list[list[int]]:
+    if not size:
+        return [[0, 0, 0]]
+    count = max(1, min(count, size // MIN_CHUNK or 1))
+    step = -(-size // count)
+    return [[start, min(start + step, size), 0] for start in range(0, size, step)]
+
+
+def download_file(
+    client: "httpx.Client",
+    url: str,
+    dest: Path,
+    *,
+    size: int | None = None,
+    headers: dict | None = None,
+    progress: Optional[Callable[[int, int | None], None]] = None,
+    segments: int | None = None,
+    retries: int = DEFAULT_RETRIES,
+    timeout: float = 60,
+) -> dict:
+    """Download url to dest, resuming any partial download left at dest.
+
+    ``size`` is the expected length (from the release API); ranged resume and
+    parallel ranges are only used when it is known. ``progress(done, total)``
+    is called at most every PROGRESS_INTERVAL seconds and once at the end.
+
+    Returns {"bytes", "resumed", "segments", "etag"}. Raises DownloadError on
+    failure, leaving the partial file in place.
+    """
+    import httpx
+
+    part_path, state_path = partial_paths(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+
+    state = None
+    if size and part_path.exists():
+        state = _State.load(state_path, url, size)
+        if state is None or part_path.stat().st_size != size:
+            state = None
+    if state is None:
+        wanted = segments or (download_segments() if size and size >= PARALLEL_THRESHOLD else 1)
+        state = _State(state_path, url, size, _plan_segments(size, wanted))
+        with open(part_path, "wb") as f:
+            if size:
+                f.truncate(size)
+
+    resumed = state.written
+    tracker = _Progress(size, resumed, progress)
+    base_headers = dict(headers or {})
+    # Set once the first response shows whether the server honours Range
+    decided = threading.Event()
+    ranges_ok = threading.Event()
+
+    def fetch(segment: list[int]) -> None:
+        nonlocal resumed
+        attempt = 0
+        while True:
+            start, end, written = segment
+            if size and start + written >= end:
+                return
+            request_headers = dict(base_headers)
+            offset = start + written
+            if size and (offset > 0 or end < size):
+                request_headers["Range"] = f"bytes={offset}-{end - 1}"
+                if state.etag:
+                    request_headers["If-Range"] = state.etag
+            try:
+                with client.stream("GET", url, timeout=timeout, follow_redirects=True, headers=request_headers) as response:
+                    status = response.status_code
+                    if status == 200 and "Range" in request_headers:
+                        if ranges_ok.is_set():
+                            raise DownloadError("Server stopped honouring range requests")
+                        # Ranges unsupported or the asset changed: fetch it whole from the start
+                        segment = [0, size, 0]
+                        state.segments = [segment]
+                        state.etag = None
+                        resumed = 0
+                        tracker.reset(0)
+                        offset = 0
+                    elif status == 206:
+                        ranges_ok.set()
+                    elif status != 200:
+                        body_sample = response.text[:400]
+                        error = DownloadError(f"Download failed with {status}\nHeaders: {response.headers}\nBody (truncated): {body_sample}")
+                        error.retryable = status >= 500 or status == 429
+                        raise error
+                    decided.set()
+                    if state.etag is None:
+                        state.etag = response.headers.get("etag")
+
+                    chunker = AdaptiveChunker()
+                    buffer = bytearray()
+                    with open(part_path, "r+b") as f:
+                        f.seek(offset)
+                        try:
+                            for chunk in response.iter_bytes():
+                                buffer += chunk
+                                chunker.observe(len(chunk))
+                                if len(buffer) >= chunker.size:
+                                    f.write(buffer)
+                                    segment[2] += len(buffer)
+                                    checkpoint = tracker.add(len(buffer))
+                                    buffer.clear()
+                                    if checkpoint:
+                                        f.flush()
+                                        state.save()
+                        finally:
+                            # Keep whatever arrived before a dropped connection
+                            if buffer:
+                                f.write(buffer)
+                                segment[2] += len(buffer)
+                                tracker.add(len(buffer))
+                        if not size:
+                            f.truncate()
+                if size and segment[0] + segment[2] < segment[1]:
+                    raise httpx.RemoteProtocolError("connection closed before the range was complete")
+                return
+            except (httpx.TransportError, DownloadError) as e:
+                decided.set()
+                state.save()
+                if not getattr(e, "retryable", isinstance(e, httpx.TransportError)) or attempt >= retries:
+                    raise DownloadError(str(e) or e.__class__.__name__) from e
+                if not size:
+                    # Without a known length there is nothing to resume against
+                    segment[2] = 0
+                    tracker.reset(0)
+                attempt += 1
+                time.sleep(min(4.0, 0.5 * 2 ** (attempt - 1)))
+
+    def fetch_after_probe(segment: list[int]) -> None:
+        decided.wait()
+        if any(s is segment for s in state.segments):
+            fetch(segment)
+
+    pending = [s for s in state.segments if not size or s[0] + s[2] < s[1]]
+    try:
+        if len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+                futures = [pool.submit(fetch, pending[0])]
+                futures += [pool.submit(fetch_after_probe, s) for s in pending[1:]]
+                try:
+                    for future in futures:
+                        future.result()
+                finally:
+                    decided.set()
+        elif pending:
+            fetch(pending[0])
+    except DownloadError:
+        state.save()
+        raise
+    except OSError as e:
+        state.save()
+        raise DownloadError(f"Could not write {part_path}: {e}") from e
+
+    tracker.finish()
+    total = part_path.stat().st_size
+    if size and total != size:
+        raise DownloadError(f"Downloaded {total} bytes, expected {size}")
+    os.replace(part_path, dest)
+    state_path.unlink(missing_ok=True)
+    return {"bytes": total - resumed, "resumed": resumed, "segments": len(state.segments), "etag": state.etag}
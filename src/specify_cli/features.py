@@ -0,0 +1,322 @@
+"""
+Index of the feature directories under ``specs/``.
+
+Feature directories are named ``NNN-short-name``. Finding the latest one, the
+one matching a branch prefix or the next free number used to mean a bash loop
+over every ``specs/*`` entry on each script invocation, which dominates once a
+repository has hundreds of features. ``FeatureIndex`` keeps them in
+``.specify/cache/features.json``:
+
+    {
+      "version": 1,
+      "scanned_at_ns": ...,
+      "specs_mtime_ns": ...,
+      "features": {
+        "004-user-auth": {"number": 4, "mtimes": [...], "dirs": ["contracts"],
+                          "artifacts": ["spec.md", "plan.md", "contracts"]}
+      }
+    }
+
+The list of features is reused while the mtime of ``specs/`` (which changes
+whenever a directory is added, removed or renamed in it) matches the recorded
+one, so number and prefix queries cost a single stat. The artifacts present in
+each feature are refreshed the same way from the mtimes of the feature
+directory and its artifact subdirectories, only when a caller asks for them.
+An mtime too close to the last scan is not trusted, as in git's racy-index
+check.
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Optional
+
+INDEX_PATH = Path(".specify") / "cache" / "features.json"
+INDEX_VERSION = 1
+FEATURE_RE = re.compile(r"^(\d+)-(.+)$")
+ARTIFACT_FILES = ("spec.md", "plan.md", "tasks.md", "research.md", "data-model.md", "quickstart.md")
+ARTIFACT_DIRS = ("contracts", "checklists")
+# Directory mtimes this close to the scan that recorded them may hide a later change
+RACY_NS = 2_000_000_000
+
+
+def find_project_root(start: Path | None = None) -> Path:
+    """Return the project root for start, the way common.sh's get_repo_root does.
+
+    Inside a git work tree that is its top level (what `git rev-parse
+    --show-toplevel` prints), even when .specify sits in a subdirectory;
+    otherwise the nearest directory holding .specify, else start itself.
+    """
+    start = (start or Path.cwd()).resolve()
+    candidates = (start, *start.parents)
+    for directory in candidates:
+        if (directory / ".git").exists():
+            return directory
+    for directory in candidates:
+        if (directory / ".specify").is_dir():
+            return directory
+    return start
+
+
+def ensure_cache_dir(cache_dir: Path) -> None:
+    """Create .specify/cache, keeping it out of version control like .pytest_cache does."""
+    if not cache_dir.is_dir():
+        cache_dir.mkdir(parents=True)
+        (cache_dir / ".gitignore").write_text("*\n", encoding="utf-8")
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class FeatureIndex:
+    """Cached view of specs/NNN-name directories for one project."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.specs_dir = root / "specs"
+        self.path = root / INDEX_PATH
+        self._features: dict[str, dict] = {}
+        self._specs_mtime_ns: Optional[int] = None
+        self._scanned_at_ns = 0
+        self._by_number: dict[int, list[str]] = {}
+        self._changed = False
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or not isinstance(data.get("features"), dict):
+            return
+        self._features = data["features"]
+        self._specs_mtime_ns = data.get("specs_mtime_ns")
+        self._scanned_at_ns = data.get("scanned_at_ns", 0)
+
+    def save(self) -> None:
+        """Write the index back if a refresh changed it; an unwritable project is not an error."""
+        if not self._changed:
+            return
+        data = {
+            "version": INDEX_VERSION,
+            "scanned_at_ns": self._scanned_at_ns,
+            "specs_mtime_ns": self._specs_mtime_ns,
+            "features": self._features,
+        }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            ensure_cache_dir(self.path.parent)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self._changed = False
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+    def _trusted(self, recorded: Optional[int], current: Optional[int]) -> bool:
+        return recorded is not None and recorded == current and current + RACY_NS < self._scanned_at_ns
+
+    def _scan_feature(self, name: str) -> dict:
+        feature_dir = self.specs_dir / name
+        artifacts = []
+        mtimes = [_mtime_ns(feature_dir)]
+        try:
+            entries = {entry.name: entry for entry in os.scandir(feature_dir)}
+        except OSError:
+            entries = {}
+        for filename in ARTIFACT_FILES:
+            entry = entries.get(filename)
+            if entry is not None and entry.is_file():
+                artifacts.append(filename)
+        dirs = []
+        for dirname in ARTIFACT_DIRS:
+            entry = entries.get(dirname)
+            if entry is not None and entry.is_dir():
+                dirs.append(dirname)
+                mtimes.append(_mtime_ns(Path(entry.path)))
+                with os.scandir(entry.path) as it:
+                    if next(it, None) is not None:
+                        artifacts.append(dirname)
+        match = FEATURE_RE.match(name)
+        return {"number": int(match.group(1)), "mtimes": mtimes, "dirs": dirs, "artifacts": artifacts}
+
+    def _feature_mtimes(self, name: str, feature: dict) -> list:
+        """Current mtimes of the feature directory and the artifact subdirectories it had when scanned."""
+        feature_dir = self.specs_dir / name
+        return [_mtime_ns(feature_dir)] + [_mtime_ns(feature_dir / d) for d in feature["dirs"]]
+
+    def refresh(self, *, artifacts: bool = False, full: bool = False) -> "FeatureIndex":
+        """Bring the index up to date with specs/.
+
+        Only the specs/ directory itself is checked unless ``artifacts`` is set,
+        in which case each feature directory is checked and rescanned if it
+        changed. ``full`` ignores everything cached.
+        """
+        now = time.time_ns()
+        specs_mtime = _mtime_ns(self.specs_dir)
+        if full:
+            self._features = {}
+            self._specs_mtime_ns = None
+
+        if specs_mtime is None:
+            if self._features or self._specs_mtime_ns is not None:
+                self._features, self._specs_mtime_ns, self._changed = {}, None, True
+        elif not self._trusted(self._specs_mtime_ns, specs_mtime):
+            names = []
+            with os.scandir(self.specs_dir) as it:
+                for entry in it:
+                    if FEATURE_RE.match(entry.name) and entry.is_dir():
+                        names.append(entry.name)
+            previous = self._features
+            self._features = {name: previous.get(name) or self._scan_feature(name) for name in names}
+            self._specs_mtime_ns = specs_mtime
+            self._changed = True
+
+        if artifacts:
+            for name, feature in self._features.items():
+                mtimes = self._feature_mtimes(name, feature)
+                if not all(self._trusted(old, new) for old, new in zip(feature["mtimes"], mtimes)):
+                    self._features[name] = self._scan_feature(name)
+                    self._changed = True
+
+        if self._changed:
+            self._scanned_at_ns = now
+        self._by_number = {}
+        for name in sorted(self._features):
+            self._by_number.setdefault(self._features[name]["number"], []).append(name)
+        return self
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def features(self) -> list[dict]:
+        """Every feature, ordered by number then name."""
+        result = []
+        for number in sorted(self._by_number):
+            for name in self._by_number[number]:
+                feature = self._features[name]
+                result.append({
+                    "number": number,
+                    "name": name,
+                    "short_name": FEATURE_RE.match(name).group(2),
+                    "path": str(self.specs_dir / name),
+                    "artifacts": feature["artifacts"],
+                    "modified": max((m for m in feature["mtimes"] if m is not None), default=0) / 1e9,
+                })
+        return result
+
+    def names(self) -> list[str]:
+        return list(self._features)
+
+    def find(self, ref: str) -> list[str]:
+        """Names of the features sharing the numeric prefix of ref ("004", "004-anything" or an exact name)."""
+        match = re.match(r"^(\d+)(?:-|$)", ref)
+        if not match:
+            return [ref] if ref in self._features else []
+        return list(self._by_number.get(int(match.group(1)), []))
+
+    def latest(self) -> Optional[str]:
+        """The feature with the highest number, if any."""
+        if not self._by_number:
+            return None
+        return self._by_number[max(self._by_number)][0]
+
+    def highest_number(self) -> int:
+        return max(self._by_number, default=0)
+
+    def next_number(self) -> int:
+        return self.highest_number() + 1
+
+
+def load_index(root: Path | None = None, *, artifacts: bool = False, full: bool = False) -> FeatureIndex:
+    """Open, refresh and persist the feature index for the project containing root."""
+    index = FeatureIndex(find_project_root(root))
+    index.refresh(artifacts=artifacts, full=full)
+    index.save()
+    return index
+
+
+def resolve_feature(root: Path | None = None) -> dict:
+    """Work out the current feature the way scripts/bash/common.sh does.
+
+    The branch comes from SPECIFY_FEATURE, then the checked-out git branch,
+    then the latest feature directory, then "main". The feature directory is
+    the one sharing the branch's numeric prefix, falling back to specs/<branch>.
+
+    Returns {"root", "branch", "has_git", "feature_dir", "ambiguous"}, where
+    ambiguous lists the directories when several share the prefix.
+    """
+    from .numbering import head_branch
+
+    index = load_index(root)
+    git_branch = head_branch(index.root)
+    branch = os.getenv("SPECIFY_FEATURE") or git_branch or index.latest() or "main"
+
+    ambiguous: list[str] = []
+    feature_dir = index.specs_dir / branch
+    if re.match(r"^\d{3}-", branch):
+        matches = index.find(branch)
+        if len(matches) == 1:
+            feature_dir = index.specs_dir / matches[0]
+        elif matches:
+            ambiguous = matches
+    return {
+        "root": index.root,
+        "branch": branch,
+        "has_git": git_branch is not None,
+        "feature_dir": feature_dir,
+        "ambiguous": ambiguous,
+    }
+
+
+# Documents reported as available by check-prerequisites, in its order
+OPTIONAL_DOCS = ("research.md", "data-model.md", "contracts/", "quickstart.md")
+
+
+def feature_paths(feature: dict) -> dict[str, str]:
+    """The path variables common.sh's get_feature_paths prints, for a resolve_feature() result."""
+    feature_dir = feature["feature_dir"]
+    return {
+        "REPO_ROOT": str(feature["root"]),
+        "BRANCH": feature["branch"],
+        "HAS_GIT": feature["has_git"],
+        "FEATURE_DIR": str(feature_dir),
+        "FEATURE_SPEC": str(feature_dir / "spec.md"),
+        "IMPL_PLAN": str(feature_dir / "plan.md"),
+        "TASKS": str(feature_dir / "tasks.md"),
+        "RESEARCH": str(feature_dir / "research.md"),
+        "DATA_MODEL": str(feature_dir / "data-model.md"),
+        "QUICKSTART": str(feature_dir / "quickstart.md"),
+        "CONTRACTS_DIR": str(feature_dir / "contracts"),
+    }
+
+
+def available_docs(feature_dir: Path, *, include_tasks: bool = False) -> list[str]:
+    """Optional documents present in feature_dir; contracts/ counts only when it has files."""
+    docs = []
+    for doc in OPTIONAL_DOCS:
+        if doc.endswith("/"):
+            try:
+                with os.scandir(feature_dir / doc) as it:
+                    if next(it, None) is not None:
+                        docs.append(doc)
+            except OSError:
+                pass
+        elif (feature_dir / doc).is_file():
+            docs.append(doc)
+    if include_tasks and (feature_dir / "tasks.md").is_file():
+        docs.append("tasks.md")
+    return docs
@@ -0,0 +1,419 @@
+"""
+Parallel implementation runner: `specify implement --jobs N`.
+
+Tasks from the dependency graph (see taskgraph.py) are dispatched, longest
+remaining chain first, to N workers. Each worker is a git worktree under
+``.specify/cache/worktrees/<feature>/`` in which an agent CLI implements one
+task at a time:
+
+  1. the worktree is reset to the current integration tip and the feature's
+     documents are copied in, so uncommitted spec/plan/tasks edits are seen
+  2. the agent command runs there (output in ``.specify/cache/implement/``)
+  3. its changes, minus the feature directory, are committed and
+     cherry-picked onto the tip; ``refs/specify/implement/<feature>`` follows
+     the tip so an interrupted run can be resumed
+  4. the task's checkbox in tasks.md is ticked with an atomic rewrite
+
+A task only starts once everything it depends on has been integrated. When a
+task fails, everything depending on it is held back while independent tasks
+carry on. A cherry-pick conflict reruns the task once on the newer tip. At
+the end the checked-out branch is fast-forwarded to the tip, provided it has
+not moved in the meantime.
+"""
+
+import heapq
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from .artifacts import Task
+from .features import ensure_cache_dir
+from .taskgraph import TaskGraph, schedule
+
+CACHE_DIR = Path(".specify") / "cache"
+WORKTREE_DIR = CACHE_DIR / "worktrees"
+LOG_DIR = CACHE_DIR / "implement"
+REF_PREFIX = "refs/specify/implement/"
+# Without --jobs, run as many workers as the graph can use, up to this many
+DEFAULT_MAX_JOBS = 4
+CONFLICT_RETRIES = 1
+
+# Non-interactive invocations of the agent CLIs; "{prompt}" is replaced by the task prompt
+AGENT_COMMANDS = {
+    "claude": ["claude", "-p", "--permission-mode", "acceptEdits", "{prompt}"],
+    "gemini": ["gemini", "--yolo", "-p", "{prompt}"],
+    "qwen": ["qwen", "--yolo", "-p", "{prompt}"],
+    "codex": ["codex", "exec", "--full-auto", "{prompt}"],
+    "opencode": ["opencode", "run", "{prompt}"],
+    "cursor-agent": ["cursor-agent", "-p", "--force", "{prompt}"],
+    "auggie": ["auggie", "--print", "{prompt}"],
+    "amp": ["amp", "-x", "{prompt}"],
+    "q": ["q", "chat", "--no-interactive", "--trust-all-tools", "{prompt}"],
+}
+STUB_AGENT = "stub"
+# Stand-in agent for trying the runner: appends a line to each file the task names
+STUB_SCRIPT = """
+import os, pathlib, time
+time.sleep(float(os.environ.get("SPECIFY_STUB_SECONDS") or 0))
+task = os.environ["SPECIFY_TASK_ID"]
+names = [n for n in os.environ.get("SPECIFY_TASK_FILES", "").split(os.pathsep) if n]
+for name in names or [".specify-stub/" + task + ".txt"]:
+    path = pathlib.Path(name)
+    if path.is_dir():
+        path = path / (task + ".txt")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(task + ": " + os.environ["SPECIFY_TASK"] + "\\n")
+"""
+
+PROMPT = """Implement task {id} of the feature documented in {feature_dir}/.
+
+Task {id}: {description}
+Phase: {phase}{files}
+
+Read {feature_dir}/plan.md, {feature_dir}/spec.md and {feature_dir}/tasks.md first, and \
+data-model.md, contracts/, research.md and quickstart.md there when they exist. Implement this \
+task only: other tasks are being implemented at the same time in separate checkouts. Do not \
+edit tasks.md and do not commit; progress and commits are recorded for you."""
+
+CHECKBOX_RE = re.compile(r"^(\s*[-*]\s+\[) (\]\s+(T\d+)\b)")
+
+# Outcome of one task
+DONE = "done"
+FAILED = "failed"
+CONFLICT = "conflict"
+BLOCKED = "blocked"
+
+
+class ImplementError(Exception):
+    """Raised when the runner cannot start or finish."""
+
+
+@dataclass
+class TaskResult:
+    task_id: str
+    status: str
+    seconds: float = 0.0
+    commit: Optional[str] = None
+    message: str = ""
+    log: Optional[Path] = None
+
+
+@dataclass
+class RunSummary:
+    base: str
+    tip: str
+    ref: str
+    results: dict[str, TaskResult] = field(default_factory=dict)
+    fast_forwarded: bool = False
+
+    def count(self, status: str) -> int:
+        return sum(1 for result in self.results.values() if result.status == status)
+
+
+def agent_command(agent: Optional[str], custom: Optional[str]) -> list[str]:
+    """The command template for an agent key, the stub, or a custom command line."""
+    if custom:
+        template = shlex.split(custom, posix=os.name != "nt")
+        if not template:
+            raise ImplementError("--agent-command is empty")
+        return template
+    if agent == STUB_AGENT:
+        return [sys.executable, "-c", STUB_SCRIPT]
+    if agent in AGENT_COMMANDS:
+        return list(AGENT_COMMANDS[agent])
+    raise ImplementError(
+        f"{agent} has no non-interactive command-line mode the runner knows. "
+        "Pass --agent-command 'your-agent ... {prompt}' instead."
+    )
+
+
+def task_prompt(task: Task, feature_dir: str) -> str:
+    files = f"\nFiles: {', '.join(task.files)}" if task.files else ""
+    return PROMPT.format(id=task.id, description=task.description, phase=task.phase or "-", files=files, feature_dir=feature_dir)
+
+
+def render_command(template: list[str], task: Task, prompt: str, feature_dir: str) -> tuple[list[str], Optional[str]]:
+    """Fill {prompt}, {task} and {feature_dir}; without {prompt} the prompt goes to stdin."""
+    argv = [part.replace("{prompt}", prompt).replace("{task}", task.id).replace("{feature_dir}", feature_dir) for part in template]
+    uses_prompt = any("{prompt}" in part for part in template)
+    return argv, None if uses_prompt else prompt
+
+
+def mark_done(tasks_path: Path, task_ids: set[str]) -> None:
+    """Tick the checkboxes of task_ids in tasks.md, replacing the file atomically."""
+    with open(tasks_path, encoding="utf-8", newline="") as f:
+        lines = f.read().splitlines(keepends=True)
+    changed = False
+    for number, line in enumerate(lines):
+        match = CHECKBOX_RE.match(line)
+        if match and match.group(3) in task_ids:
+            lines[number] = f"{match.group(1)}x{match.group(2)}{line[match.end():]}"
+            changed = True
+    if not changed:
+        return
+    tmp = tasks_path.with_name(tasks_path.name + ".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            f.write("".join(lines))
+        os.chmod(tmp, tasks_path.stat().st_mode & 0o7777)
+        os.replace(tmp, tasks_path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _git(cwd: Path, *args: str, check: bool = True) -> subprocess.CompletedProcess:
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    if check and result.returncode != 0:
+        raise ImplementError(f"git {' '.join(args)} failed: {(result.stderr or result.stdout).strip()}")
+    return result
+
+
+def _rev(cwd: Path, rev: str) -> Optional[str]:
+    result = _git(cwd, "rev-parse", "--verify", "--quiet", rev + "^{commit}", check=False)
+    return result.stdout.strip() or None
+
+
+class Runner:
+    """Runs the tasks of one feature's graph on a pool of worktrees."""
+
+    def __init__(
+        self,
+        root: Path,
+        feature_dir: Path,
+        graph: TaskGraph,
+        command: list[str],
+        *,
+        jobs: int,
+        timeout: Optional[float] = None,
+        fail_fast: bool = False,
+        report: Callable[[str, str, str], None] = lambda event, task_id, detail: None,
+    ):
+        self.root = root
+        self.feature_dir = feature_dir
+        self.feature_rel = feature_dir.relative_to(root).as_posix()
+        self.tasks_path = feature_dir / "tasks.md"
+        self.graph = graph
+        self.command = command
+        self.jobs = max(1, jobs)
+        self.timeout = timeout
+        self.fail_fast = fail_fast
+        self.report = report
+        self.ref = REF_PREFIX + feature_dir.name
+        self.worktree_root = root / WORKTREE_DIR / feature_dir.name
+        self.log_dir = root / LOG_DIR / feature_dir.name
+        self._processes: dict[int, subprocess.Popen] = {}
+        self._lock = threading.Lock()
+        self._stopped = False  # no new tasks are dispatched
+        self._terminated = False  # running agents were told to exit
+
+    # -- setup and teardown -------------------------------------------
+
+    def _start_point(self) -> tuple[str, str]:
+        """(HEAD, tip): the tip is a previous run's ref when it builds on HEAD."""
+        if _git(self.root, "rev-parse", "--is-inside-work-tree", check=False).returncode != 0:
+            raise ImplementError(f"{self.root} is not a git repository; the runner needs git worktrees")
+        head = _rev(self.root, "HEAD")
+        if head is None:
+            raise ImplementError("The repository has no commits yet; commit the project first")
+        previous = _rev(self.root, self.ref)
+        if previous and previous != head and _git(self.root, "merge-base", "--is-ancestor", head, previous, check=False).returncode == 0:
+            return head, previous
+        return head, head
+
+    def _add_worktrees(self, tip: str) -> list[Path]:
+        ensure_cache_dir(self.root / CACHE_DIR)
+        paths = [self.worktree_root / f"w{slot}" for slot in range(1, self.jobs + 1)]
+        for path in paths:
+            if path.exists():
+                _git(self.root, "worktree", "remove", "--force", str(path), check=False)
+                shutil.rmtree(path, ignore_errors=True)
+        _git(self.root, "worktree", "prune")
+        for path in paths:
+            _git(self.root, "worktree", "add", "--detach", "--quiet", str(path), tip)
+        return paths
+
+    def _remove_worktrees(self, paths: list[Path]) -> None:
+        for path in paths:
+            _git(self.root, "worktree", "remove", "--force", str(path), check=False)
+        _git(self.root, "worktree", "prune", check=False)
+        shutil.rmtree(self.worktree_root, ignore_errors=True)
+
+    def stop(self) -> None:
+        """Stop dispatching and terminate the agents that are running."""
+        with self._lock:
+            self._stopped = self._terminated = True
+            processes = list(self._processes.values())
+        for process in processes:
+            process.terminate()
+
+    # -- one task, in a worker thread ---------------------------------
+
+    def _run_task(self, worktree: Path, task: Task, base: str) -> TaskResult:
+        start = time.monotonic()
+        result = TaskResult(task.id, FAILED, log=self.log_dir / f"{task.id}.log")
+        _git(worktree, "checkout", "--quiet", "--force", "--detach", base)
+        _git(worktree, "clean", "--quiet", "-fd")
+        # The documents as they are now, committed or not
+        shutil.copytree(self.feature_dir, worktree / self.feature_rel, dirs_exist_ok=True)
+
+        argv, stdin = render_command(self.command, task, task_prompt(task, self.feature_rel), self.feature_rel)
+        env = {
+            **os.environ,
+            "SPECIFY_FEATURE": self.feature_dir.name,
+            "SPECIFY_TASK_ID": task.id,
+            "SPECIFY_TASK": task.description,
+            "SPECIFY_TASK_FILES": os.pathsep.join(task.files),
+        }
+        try:
+            with open(result.log, "w", encoding="utf-8") as log:
+                log.write(f"$ {shlex.join(argv)}\n\n")
+                log.flush()
+                with self._lock:
+                    if self._terminated:
+                        result.message = "interrupted"
+                        return result
+                    process = subprocess.Popen(
+                        argv, cwd=worktree, env=env, text=True,
+                        stdin=subprocess.PIPE if stdin is not None else subprocess.DEVNULL,
+                        stdout=log, stderr=subprocess.STDOUT,
+                    )
+                    self._processes[id(process)] = process
+                try:
+                    process.communicate(stdin, timeout=self.timeout)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+                    result.message = f"timed out after {self.timeout:g}s"
+                    return result
+                finally:
+                    with self._lock:
+                        self._processes.pop(id(process), None)
+        except FileNotFoundError:
+            result.message = f"command not found: {argv[0]}"
+            return result
+        finally:
+            result.seconds = time.monotonic() - start
+        if process.returncode != 0:
+            result.message = "interrupted" if self._terminated else f"agent exited with {process.returncode}"
+            return result
+
+        # Everything the agent changed except the feature's own documents
+        _git(worktree, "add", "--all", "--", ".", f":(exclude){self.feature_rel}")
+        if _git(worktree, "diff", "--cached", "--quiet", check=False).returncode == 0:
+            result.status, result.message = DONE, "no changes"
+            return result
+        _git(worktree, "commit", "--quiet", "--no-verify", "-m", f"{task.id}: {task.description}")
+        result.status, result.commit = DONE, _rev(worktree, "HEAD")
+        return result
+
+    # -- integration, in the main thread ------------------------------
+
+    def _integrate(self, worktree: Path, result: TaskResult, base: str, tip: str) -> str:
+        """Put the task's commit on the tip; returns the new tip, or tip unchanged on conflict."""
+        if result.commit is None:
+            return tip
+        if base == tip:
+            new_tip = result.commit
+        else:
+            _git(worktree, "checkout", "--quiet", "--force", "--detach", tip)
+            _git(worktree, "clean", "--quiet", "-fd")
+            if _git(worktree, "cherry-pick", "--allow-empty", result.commit, check=False).returncode != 0:
+                _git(worktree, "cherry-pick", "--abort", check=False)
+                result.status, result.message = CONFLICT, "conflicts with work integrated meanwhile"
+                return tip
+            new_tip = _rev(worktree, "HEAD")
+        _git(self.root, "update-ref", self.ref, new_tip)
+        result.commit = new_tip
+        return new_tip
+
+    def run(self) -> RunSummary:
+        head, tip = self._start_point()
+        summary = RunSummary(head, tip, self.ref)
+        plan = schedule(self.graph)
+        if not self.graph.tasks:
+            return summary
+
+        preds = self.graph.predecessors()
+        position = {task_id: index for index, task_id in enumerate(plan.order)}
+        waiting = {task_id: len(p) for task_id, p in preds.items()}
+        attempts = {task_id: 0 for task_id in self.graph.tasks}
+        ready = [(-plan.chain[t], position[t], t) for t, count in waiting.items() if not count]
+        heapq.heapify(ready)
+
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        worktrees = self._add_worktrees(tip)
+        free = list(reversed(range(len(worktrees))))
+        try:
+            with ThreadPoolExecutor(max_workers=len(worktrees)) as pool:
+                running = {}
+                while ready or running:
+                    while ready and free and not self._stopped:
+                        task_id = heapq.heappop(ready)[2]
+                        slot = free.pop()
+                        attempts[task_id] += 1
+                        self.report("start", task_id, f"w{slot + 1}")
+                        future = pool.submit(self._run_task, worktrees[slot], self.graph.tasks[task_id], tip)
+                        running[future] = (task_id, slot, tip)
+                    if not running:
+                        break
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        task_id, slot, base = running.pop(future)
+                        free.append(slot)
+                        try:
+                            result = future.result()
+                        except ImplementError as e:
+                            result = TaskResult(task_id, FAILED, message=str(e))
+                        if result.status == DONE:
+                            tip = self._integrate(worktrees[slot], result, base, tip)
+                        if result.status == CONFLICT and attempts[task_id] <= CONFLICT_RETRIES and not self._stopped:
+                            self.report("retry", task_id, result.message)
+                            heapq.heappush(ready, (-plan.chain[task_id], position[task_id], task_id))
+                            continue
+                        summary.results[task_id] = result
+                        summary.tip = tip
+                        if result.status == DONE:
+                            mark_done(self.tasks_path, {task_id})
+                            self.report("done", task_id, result.message or f"{result.seconds:.1f}s")
+                            for after in self.graph.edges.get(task_id, {}):
+                                waiting[after] -= 1
+                                if not waiting[after]:
+                                    heapq.heappush(ready, (-plan.chain[after], position[after], after))
+                        else:
+                            self.report("failed", task_id, result.message)
+                            if self.fail_fast:
+                                self._stopped = True
+        except KeyboardInterrupt:
+            self.stop()
+            raise
+        finally:
+            self._remove_worktrees(worktrees)
+            self._finish(summary)
+
+        for task_id in plan.order:
+            if task_id not in summary.results:
+                unfinished = [p for p in preds[task_id] if summary.results[p].status != DONE]
+                message = f"waits for {', '.join(unfinished)}" if unfinished else "not started"
+                summary.results[task_id] = TaskResult(task_id, BLOCKED, message=message)
+        return summary
+
+    def _finish(self, summary: RunSummary) -> None:
+        """Fast-forward the checked-out branch to the tip if it is still where the run started."""
+        if summary.tip == summary.base:
+            return
+        if _rev(self.root, "HEAD") != summary.base:
+            return
+        if _git(self.root, "merge", "--ff-only", "--quiet", summary.tip, check=False).returncode == 0:
+            summary.fast_forwarded = True
+            _git(self.root, "update-ref", "-d", self.ref, check=False)
@@ -0,0 +1,102 @@
+"""
+Project manifest recording what `specify init` installed.
+
+``.specify/manifest.json`` holds the template release a project was created
+from and the sha256 of every file as the template shipped it:
+
+    {
+      "version": 1,
+      "release": "v0.0.20",
+      "ai": "claude",
+      "script": "sh",
+      "updated_at": 1760000000.0,
+      "files": {".specify/templates/plan-template.md": "<sha256>", ...}
+    }
+
+`specify upgrade` compares these hashes against the working tree and a newer
+template to tell upstream changes apart from local edits.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+MANIFEST_PATH = Path(".specify") / "manifest.json"
+MANIFEST_VERSION = 1
+
+
+class ManifestError(RuntimeError):
+    pass
+
+
+def bytes_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def path_sha256(path: Path) -> Optional[str]:
+    """Return the sha256 of a file in the working tree, or None if it is missing."""
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        return None
+    return h.hexdigest()
+
+
+def load_manifest(project_path: Path) -> Optional[dict]:
+    """Return the project's manifest, None if it has none, or raise ManifestError if unreadable."""
+    path = project_path / MANIFEST_PATH
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        raise ManifestError(f"Could not read {MANIFEST_PATH}: {e}")
+    if data.get("version") != MANIFEST_VERSION or not isinstance(data.get("files"), dict):
+        raise ManifestError(f"Unsupported manifest format in {MANIFEST_PATH}")
+    return data
+
+
+def write_manifest(project_path: Path, *, release: str, ai: str, script: str, files: dict[str, str]) -> Path:
+    """Atomically write .specify/manifest.json and return its path."""
+    path = project_path / MANIFEST_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": MANIFEST_VERSION,
+        "release": release,
+        "ai": ai,
+        "script": script,
+        "updated_at": time.time(),
+        "files": {name: files[name] for name in sorted(files) if Path(name) != MANIFEST_PATH},
+    }
+    # Plain open() rather than mkstemp so the file gets the usual umask-derived mode
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        os.replace(tmp, path)
+    except Exception:
+        tmp.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def manifest_files(project_path: Path) -> Optional[list[str]]:
+    """Return the template files recorded in the manifest, plus the manifest itself.
+
+    None when the project has no readable manifest.
+    """
+    try:
+        manifest = load_manifest(project_path)
+    except ManifestError:
+        return None
+    if manifest is None:
+        return None
+    return [*manifest["files"], MANIFEST_PATH.as_posix()]
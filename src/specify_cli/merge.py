@@ -0,0 +1,103 @@
+"""
+Merge planning for `specify init --here`.
+
+Every template entry is compared with the file already at its destination
+before anything is written:
+
+    new         nothing there yet: written
+    identical   same size and CRC-32 as the archive entry: left untouched
+    changed     contents differ: overwritten
+    merge       .vscode/settings.json that already exists: JSON-merged
+
+Sizes come from the archive directory and the CRC-32 is recorded in it, so an
+identical file costs one read of the local copy and no decompression. The
+same read produces the sha256 the project manifest records.
+"""
+
+import hashlib
+import zipfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from rich.table import Table
+
+NEW = "new"
+IDENTICAL = "identical"
+CHANGED = "changed"
+MERGE = "merge"
+
+STATUS_STYLES = {NEW: "green", CHANGED: "yellow", MERGE: "cyan", IDENTICAL: "bright_black"}
+
+
+@dataclass
+class MergeEntry:
+    path: str
+    status: str
+    size: int
+
+
+def is_vscode_settings(rel: Path) -> bool:
+    return rel.name == "settings.json" and rel.parent.name == ".vscode"
+
+
+def classify_entry(info: zipfile.ZipInfo, dest: Path, rel: Path) -> tuple[str, Optional[str]]:
+    """Return (status, sha256 of the local file when it is identical to the entry)."""
+    try:
+        size = dest.stat().st_size
+    except FileNotFoundError:
+        return NEW, None
+    if is_vscode_settings(rel):
+        return MERGE, None
+    if size != info.file_size:
+        return CHANGED, None
+
+    crc = 0
+    digest = hashlib.sha256()
+    with open(dest, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            crc = zlib.crc32(chunk, crc)
+            digest.update(chunk)
+    if crc != info.CRC:
+        return CHANGED, None
+    return IDENTICAL, digest.hexdigest()
+
+
+def plan_merge(zip_ref: zipfile.ZipFile, dest_dir: Path) -> list[MergeEntry]:
+    """Classify every file in the archive against dest_dir without writing anything."""
+    from . import _archive_prefix, _safe_relpath
+
+    infos = zip_ref.infolist()
+    prefix = _archive_prefix(infos)
+    entries: list[MergeEntry] = []
+    for info in infos:
+        if info.is_dir():
+            continue
+        rel = _safe_relpath(info.filename[len(prefix):])
+        if rel is None:
+            continue
+        status, _ = classify_entry(info, dest_dir / rel, rel)
+        entries.append(MergeEntry(rel.as_posix(), status, info.file_size))
+    return entries
+
+
+def merge_counts(entries: list[MergeEntry]) -> dict[str, int]:
+    counts = {status: 0 for status in STATUS_STYLES}
+    for entry in entries:
+        counts[entry.status] += 1
+    return counts
+
+
+def render_merge_plan(entries: list[MergeEntry], *, title: str, show_identical: bool = False) -> Table:
+    table = Table(title=title, border_style="cyan", show_lines=False)
+    table.add_column("File", style="cyan", overflow="fold")
+    table.add_column("Action")
+    table.add_column("Size", justify="right", style="bright_black")
+    order = list(STATUS_STYLES)
+    for entry in sorted(entries, key=lambda e: (order.index(e.status), e.path)):
+        if entry.status == IDENTICAL and not show_identical:
+            continue
+        style = STATUS_STYLES[entry.status]
+        table.add_row(entry.path, f"[{style}]{entry.status}[/{style}]", f"{entry.size:,}")
+    return table
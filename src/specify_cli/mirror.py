@@ -0,0 +1,279 @@
+"""
+Template mirrors for offline and fleet-wide installs.
+
+`specify mirror sync <dir>` copies release template assets from GitHub into a
+directory together with an ``index.json`` listing every release and the
+sha256 of each asset:
+
+    <dir>/index.json
+    <dir>/<tag>/spec-kit-template-<agent>-<script>-<tag>.zip
+
+`specify init --template-source <dir | file://... | http(s)://...>` resolves
+releases from that index instead of the GitHub API and verifies each archive
+against its recorded checksum. Any static file server works for HTTP, e.g.
+`python -m http.server` run inside the mirror directory.
+"""
+
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
+from urllib.parse import urljoin, urlparse
+from urllib.request import url2pathname
+
+from .cache import asset_sha256, file_sha256
+
+if TYPE_CHECKING:
+    import httpx
+
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+GITHUB_API = "https://api.github.com/repos/github/spec-kit"
+
+
+class MirrorError(RuntimeError):
+    pass
+
+
+def file_uri_to_path(uri: str) -> Path:
+    parsed = urlparse(uri)
+    return Path(url2pathname(parsed.path))
+
+
+def _version_key(tag: str) -> tuple:
+    parts = []
+    for piece in tag.lstrip("v").replace("-", ".").split("."):
+        parts.append((0, int(piece), "") if piece.isdigit() else (1, 0, piece))
+    return tuple(parts)
+
+
+class TemplateSource:
+    """A mirror index reachable as a local directory, a file:// URI or an HTTP base URL."""
+
+    def __init__(self, location: str):
+        self.location = location
+        if location.startswith(("http://", "https://")):
+            self.base_url = location if location.endswith("/") else location + "/"
+            self.root = None
+        else:
+            path = file_uri_to_path(location) if location.startswith("file://") else Path(location).expanduser()
+            self.base_url = None
+            self.root = path.resolve()
+        self._index: Optional[dict] = None
+
+    @property
+    def is_remote(self) -> bool:
+        return self.base_url is not None
+
+    def load_index(self, client: "httpx.Client" = None) -> dict:
+        if self._index is not None:
+            return self._index
+        if self.is_remote:
+            if client is None:
+                raise MirrorError("An HTTP client is required for a remote template source")
+            url = urljoin(self.base_url, INDEX_NAME)
+            try:
+                response = client.get(url, timeout=30, follow_redirects=True)
+            except Exception as e:
+                raise MirrorError(f"Could not reach template source {url}: {e}")
+            if response.status_code != 200:
+                raise MirrorError(f"Template source returned {response.status_code} for {url}")
+            try:
+                index = response.json()
+            except ValueError as e:
+                raise MirrorError(f"Invalid index at {url}: {e}")
+        else:
+            index_path = self.root / INDEX_NAME
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except FileNotFoundError:
+                raise MirrorError(f"No {INDEX_NAME} in {self.root} (create one with `specify mirror sync`)")
+            except (OSError, ValueError) as e:
+                raise MirrorError(f"Could not read {index_path}: {e}")
+        if index.get("version") != INDEX_VERSION or not isinstance(index.get("releases"), dict):
+            raise MirrorError(f"Unsupported mirror index format in {self.location}")
+        self._index = index
+        return index
+
+    def _asset_url(self, rel_path: str) -> str:
+        if self.is_remote:
+            return urljoin(self.base_url, rel_path)
+        return (self.root / rel_path).as_uri()
+
+    def release(self, tag: str | None = None, client: "httpx.Client" = None) -> dict:
+        """Return release data in the shape of the GitHub releases API."""
+        index = self.load_index(client)
+        tag = tag or index.get("latest")
+        entry = index["releases"].get(tag) if tag else None
+        if entry is None:
+            available = ", ".join(sorted(index["releases"], key=_version_key, reverse=True)) or "none"
+            raise MirrorError(f"Release {tag or '(latest)'} not found in template source {self.location} (available: {available})")
+        return {
+            "tag_name": tag,
+            "assets": [
+                {
+                    "name": asset["name"],
+                    "size": asset["size"],
+                    "browser_download_url": self._asset_url(asset["path"]),
+                    "digest": f"sha256:{asset['sha256']}",
+                }
+                for asset in entry.get("assets", [])
+            ],
+        }
+
+
+# ----------------------------------------------------------------------
+# Sync
+# ----------------------------------------------------------------------
+def _get_json(client: "httpx.Client", url: str, headers: dict):
+    response = client.get(url, timeout=30, follow_redirects=True, headers=headers)
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        raise MirrorError(f"GitHub API returned {response.status_code} for {url}")
+    return response.json()
+
+
+def github_releases(client: "httpx.Client", headers: dict, *, tags: list[str] | None = None, all_releases: bool = False) -> tuple[list[dict], Optional[str]]:
+    """Return (releases to mirror, tag of the latest release if it was looked up)."""
+    latest = None
+    if all_releases:
+        releases, page = [], 1
+        while True:
+            batch = _get_json(client, f"{GITHUB_API}/releases?per_page=100&page={page}", headers) or []
+            releases += [r for r in batch if not r.get("draft")]
+            if len(batch) < 100:
+                break
+            page += 1
+        latest_data = _get_json(client, f"{GITHUB_API}/releases/latest", headers)
+        latest = latest_data["tag_name"] if latest_data else None
+    elif tags:
+        releases = []
+        for tag in tags:
+            data = _get_json(client, f"{GITHUB_API}/releases/tags/{tag}", headers)
+            if data is None:
+                raise MirrorError(f"Release {tag} not found on GitHub")
+            releases.append(data)
+    else:
+        data = _get_json(client, f"{GITHUB_API}/releases/latest", headers)
+        if data is None:
+            raise MirrorError("No published release found on GitHub")
+        releases, latest = [data], data["tag_name"]
+    return releases, latest
+
+
+def _load_local_index(root: Path) -> dict:
+    try:
+        with open(root / INDEX_NAME, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION:
+            index.setdefault("releases", {})
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "latest": None, "releases": {}}
+
+
+def _save_local_index(root: Path, index: dict) -> None:
+    fd, tmp = tempfile.mkstemp(prefix=".index-", suffix=".json", dir=root)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp, root / INDEX_NAME)
+    except Exception:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def sync_mirror(
+    root: Path,
+    client: "httpx.Client",
+    *,
+    headers: dict | None = None,
+    tags: list[str] | None = None,
+    all_releases: bool = False,
+    jobs: int = 8,
+    on_asset: Optional[Callable[[str, str, str], None]] = None,
+) -> dict:
+    """Mirror release assets into root and update its index.
+
+    Assets already present with the recorded size and checksum are skipped.
+    ``on_asset(tag, name, outcome)`` is called as each asset finishes, with
+    outcome one of "downloaded", "unchanged" or "failed: <reason>".
+
+    Returns {"releases", "downloaded", "unchanged", "failed", "bytes"}.
+    """
+    from .download import DownloadError, download_file
+
+    headers = headers or {}
+    root.mkdir(parents=True, exist_ok=True)
+    index = _load_local_index(root)
+    releases, latest = github_releases(client, headers, tags=tags, all_releases=all_releases)
+
+    work = []
+    for release in releases:
+        tag = release["tag_name"]
+        for asset in release.get("assets", []):
+            if asset.get("name", "").endswith(".zip"):
+                work.append((tag, asset))
+
+    summary = {"releases": len(releases), "downloaded": 0, "unchanged": 0, "failed": [], "bytes": 0}
+    results: dict[tuple[str, str], dict] = {}
+
+    def mirror_asset(tag: str, asset: dict) -> tuple[str, dict | None]:
+        name = asset["name"]
+        rel_path = f"{tag}/{name}"
+        dest = root / tag / name
+        known = next((a for a in index["releases"].get(tag, {}).get("assets", []) if a["name"] == name), None)
+        expected = asset_sha256(asset)
+        if known and dest.is_file() and dest.stat().st_size == asset["size"] and (expected is None or known["sha256"] == expected):
+            return "unchanged", known
+        try:
+            download_file(client, asset["browser_download_url"], dest, size=asset["size"], headers=headers)
+        except DownloadError as e:
+            return f"failed: {e}", None
+        sha256 = file_sha256(dest)
+        if expected and sha256 != expected:
+            dest.unlink(missing_ok=True)
+            return f"failed: checksum mismatch (expected {expected}, got {sha256})", None
+        return "downloaded", {"name": name, "size": dest.stat().st_size, "sha256": sha256, "path": rel_path}
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {pool.submit(mirror_asset, tag, asset): (tag, asset) for tag, asset in work}
+        for future in as_completed(futures):
+            tag, asset = futures[future]
+            outcome, entry = future.result()
+            if entry:
+                results[(tag, asset["name"])] = entry
+            if outcome == "downloaded":
+                summary["downloaded"] += 1
+                summary["bytes"] += entry["size"]
+            elif outcome == "unchanged":
+                summary["unchanged"] += 1
+            else:
+                summary["failed"].append(f"{tag}/{asset['name']}: {outcome[len('failed: '):]}")
+            if on_asset:
+                on_asset(tag, asset["name"], outcome)
+
+    for release in releases:
+        tag = release["tag_name"]
+        assets = [results[(tag, a["name"])] for a in release.get("assets", []) if (tag, a["name"]) in results]
+        if not assets:
+            continue
+        index["releases"][tag] = {
+            "published_at": release.get("published_at"),
+            "assets": sorted(assets, key=lambda a: a["name"]),
+        }
+
+    if latest and latest in index["releases"]:
+        index["latest"] = latest
+    elif not index.get("latest") and index["releases"]:
+        index["latest"] = max(index["releases"], key=_version_key)
+    index["source"] = "github/spec-kit"
+    index["synced_at"] = time.time()
+    _save_local_index(root, index)
+    return summary
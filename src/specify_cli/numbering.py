@@ -0,0 +1,231 @@
+"""
+Feature number allocation.
+
+A new feature gets the number after the highest one already used by a
+``specs/NNN-name`` directory, a local branch, a remote-tracking branch or a
+branch on a remote. Refs are read straight from the repository (loose refs
+and ``packed-refs``) instead of through ``git branch`` pipelines, and branches
+on the remotes come from a snapshot of ``git ls-remote --heads`` kept in
+``.specify/cache/remote-refs.json``:
+
+    {"version": 1, "fetched_at": 1760000000.0, "remotes": {"origin": ["004-user-auth", ...]}}
+
+The snapshot is refreshed when it is older than SPECIFY_REMOTE_REFS_TTL
+seconds (default 300) or when asked; nothing is fetched into the repository.
+Every source is folded into the result in a single pass.
+"""
+
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+from itertools import chain
+from typing import Iterable, Iterator, Optional
+
+from .features import FEATURE_RE, ensure_cache_dir, load_index
+
+SNAPSHOT_PATH = Path(".specify") / "cache" / "remote-refs.json"
+SNAPSHOT_VERSION = 1
+DEFAULT_REMOTE_REFS_TTL = 300
+LS_REMOTE_TIMEOUT = 30
+
+
+def remote_refs_ttl() -> int:
+    """Seconds a remote ref snapshot stays fresh, honouring SPECIFY_REMOTE_REFS_TTL."""
+    raw = os.getenv("SPECIFY_REMOTE_REFS_TTL", "").strip()
+    if raw:
+        try:
+            return max(0, int(raw))
+        except ValueError:
+            pass
+    return DEFAULT_REMOTE_REFS_TTL
+
+
+def git_dir(root: Path) -> Optional[Path]:
+    """Return the git directory (holding HEAD) of the repository whose work tree is root, if any."""
+    dot_git = root / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    if dot_git.is_file():
+        # Worktrees and submodules: ".git" is a "gitdir: <path>" pointer
+        content = dot_git.read_text(encoding="utf-8").strip()
+        if content.startswith("gitdir:"):
+            return (root / content[len("gitdir:"):].strip()).resolve()
+    return None
+
+
+def git_common_dir(root: Path) -> Optional[Path]:
+    """Return the directory holding refs/ and packed-refs for the repository at root, if any."""
+    git_dir_path = git_dir(root)
+    if git_dir_path is None:
+        return None
+    commondir = git_dir_path / "commondir"
+    if commondir.is_file():
+        return (git_dir_path / commondir.read_text(encoding="utf-8").strip()).resolve()
+    return git_dir_path
+
+
+def head_branch(root: Path) -> Optional[str]:
+    """Branch checked out at root, read from HEAD; "HEAD" when detached, None outside git."""
+    git_dir_path = git_dir(root)
+    if git_dir_path is None:
+        return None
+    try:
+        head = (git_dir_path / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if head.startswith("ref: refs/heads/"):
+        return head[len("ref: refs/heads/"):]
+    return "HEAD"
+
+
+def iter_local_refs(root: Path) -> Iterator[str]:
+    """Yield refs/heads/* and refs/remotes/* names from loose refs and packed-refs (duplicates possible)."""
+    common = git_common_dir(root)
+    if common is None:
+        return
+    if (common / "reftable").is_dir():
+        # The reftable backend has no text format to read; ask git
+        result = subprocess.run(
+            ["git", "for-each-ref", "--format=%(refname)", "refs/heads", "refs/remotes"],
+            capture_output=True, text=True, cwd=root,
+        )
+        if result.returncode == 0:
+            yield from result.stdout.split()
+        return
+
+    for namespace in ("refs/heads", "refs/remotes"):
+        base = common / namespace
+        for dirpath, _, filenames in os.walk(base):
+            rel = Path(dirpath).relative_to(common).as_posix()
+            for filename in filenames:
+                yield f"{rel}/{filename}"
+
+    try:
+        with open(common / "packed-refs", "r", encoding="utf-8") as f:
+            for line in f:
+                if line[:1] in ("#", "^"):
+                    continue
+                _, _, ref = line.rstrip("\n").partition(" ")
+                if ref.startswith(("refs/heads/", "refs/remotes/")):
+                    yield ref
+    except OSError:
+        pass
+
+
+def branch_name(ref: str) -> str:
+    """Strip refs/heads/ or refs/remotes/<remote>/ from a ref name."""
+    if ref.startswith("refs/heads/"):
+        return ref[len("refs/heads/"):]
+    if ref.startswith("refs/remotes/"):
+        return ref[len("refs/remotes/"):].partition("/")[2]
+    return ref
+
+
+class RemoteSnapshot:
+    """Branch names on each remote, as of the last `git ls-remote --heads`."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.path = root / SNAPSHOT_PATH
+        self.fetched_at = 0.0
+        self.remotes: dict[str, list[str]] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == SNAPSHOT_VERSION and isinstance(data.get("remotes"), dict):
+                self.fetched_at = float(data.get("fetched_at", 0))
+                self.remotes = data["remotes"]
+        except (OSError, ValueError, TypeError):
+            pass
+
+    def is_stale(self, ttl: int | None = None) -> bool:
+        ttl = remote_refs_ttl() if ttl is None else ttl
+        return time.time() - self.fetched_at >= ttl
+
+    def refresh(self) -> list[str]:
+        """Re-list the branches of every remote; returns the remotes that could not be reached.
+
+        Remotes that fail keep their previous branch list.
+        """
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        result = subprocess.run(["git", "remote"], capture_output=True, text=True, cwd=self.root, env=env)
+        names = result.stdout.split() if result.returncode == 0 else []
+        remotes: dict[str, list[str]] = {}
+        failed = []
+        for remote in names:
+            try:
+                listing = subprocess.run(
+                    ["git", "ls-remote", "--heads", remote],
+                    capture_output=True, text=True, cwd=self.root, env=env, timeout=LS_REMOTE_TIMEOUT,
+                )
+            except subprocess.TimeoutExpired:
+                listing = None
+            if listing is None or listing.returncode != 0:
+                failed.append(remote)
+                remotes[remote] = self.remotes.get(remote, [])
+                continue
+            branches = []
+            for line in listing.stdout.splitlines():
+                _, _, ref = line.partition("\t")
+                name = branch_name(ref)
+                # Only feature branches matter for numbering; keeps the snapshot small
+                if FEATURE_RE.match(name):
+                    branches.append(name)
+            remotes[remote] = branches
+        self.remotes = remotes
+        self.fetched_at = time.time()
+        self.save()
+        return failed
+
+    def save(self) -> None:
+        data = {"version": SNAPSHOT_VERSION, "fetched_at": self.fetched_at, "remotes": self.remotes}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            ensure_cache_dir(self.path.parent)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+    def branches(self) -> Iterator[str]:
+        for names in self.remotes.values():
+            yield from names
+
+
+def highest_number(names: Iterable[str], short_name: str | None = None) -> int:
+    """Highest NNN among NNN-name entries, optionally only those named NNN-<short_name>."""
+    highest = 0
+    for name in names:
+        match = FEATURE_RE.match(name)
+        if match and (short_name is None or match.group(2) == short_name):
+            number = int(match.group(1))
+            if number > highest:
+                highest = number
+    return highest
+
+
+def next_feature_number(root: Path, *, short_name: str | None = None, refresh_remotes: bool = False, offline: bool = False) -> dict:
+    """Allocate the next feature number for the project at root.
+
+    With short_name only branches and directories called NNN-<short_name> are
+    considered, as create-new-feature.sh has always done for git repositories.
+
+    Returns {"number", "remotes_refreshed", "unreachable"}.
+    """
+    index = load_index(root)
+    sources = [index.names()]
+    refreshed = False
+    unreachable: list[str] = []
+    if git_common_dir(index.root) is not None:
+        sources.append(branch_name(ref) for ref in iter_local_refs(index.root))
+        snapshot = RemoteSnapshot(index.root)
+        if not offline and (refresh_remotes or snapshot.is_stale()):
+            unreachable = snapshot.refresh()
+            refreshed = True
+        sources.append(snapshot.branches())
+
+    number = highest_number(chain.from_iterable(sources), short_name) + 1
+    return {"number": number, "remotes_refreshed": refreshed, "unreachable": unreachable}
@@ -0,0 +1,364 @@
+"""
+Full-text search over specs/ and memory/: `specify search`.
+
+Every document is split into sections at its Markdown headings, and each
+section is indexed under its heading trail ("Requirements › Functional
+Requirements"), its feature directory and its artifact type (spec, plan,
+tasks, research, data-model, quickstart, contracts, checklist, constitution,
+...). The inverted index lives in ``.specify/cache/search.sqlite``:
+
+    files      path, size, mtime_ns and when it was indexed
+    sections   one row per section, with its length in terms
+    postings   term -> section, term frequency
+
+Before each query the document tree is stat()ed and only new, changed or
+deleted files are reindexed, in one transaction. As with the feature index,
+an mtime too close to the moment a file was indexed is not trusted.
+
+Ranking is BM25 over sections, with heading terms counted HEADING_WEIGHT
+times. Terms are lowercased, stop words dropped and common suffixes
+(-s, -es, -ed, -ing) stripped, so "rate limiting" also finds "rate limits".
+IDs such as FR-001 or T012 are kept as single terms.
+"""
+
+import math
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from .features import RACY_NS, ensure_cache_dir
+
+CACHE_DIR = Path(".specify") / "cache"
+INDEX_PATH = CACHE_DIR / "search.sqlite"
+# Bump whenever tokenizing or sectioning changes
+INDEX_VERSION = 1
+
+SEARCH_DIRS = (Path("specs"), Path("memory"), Path(".specify") / "memory")
+TEXT_SUFFIXES = {".md", ".markdown", ".txt", ".yaml", ".yml", ".json", ".graphql", ".proto"}
+ARTIFACT_TYPES = (
+    "spec", "plan", "tasks", "research", "data-model", "quickstart",
+    "contracts", "checklist", "constitution", "memory", "other",
+)
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+TERM_RE = re.compile(r"[a-z0-9]+(?:-\d+)?")
+STOP_WORDS = frozenset(
+    "a an and are as at be by can for from has have if in into is it its may must not of on or "
+    "shall should so such that the their then there these this to was were will with".split()
+)
+HEADING_WEIGHT = 3
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_WIDTH = 160
+SECTION_SEPARATOR = " › "
+
+
+@lru_cache(maxsize=65536)
+def _stem(term: str) -> str:
+    if term[0].isdigit() or "-" in term:
+        return term
+    if len(term) > 5 and term.endswith("ing"):
+        term = term[:-3]
+    elif len(term) > 4 and term.endswith("ies"):
+        return term[:-3] + "y"
+    elif len(term) > 4 and term.endswith("ed"):
+        term = term[:-2]
+    elif len(term) > 4 and term.endswith("es") and term[-3] in "sxz":
+        return term[:-2]
+    elif len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        term = term[:-1]
+    # "cache", "cached" and "caching" all end up as "cach"
+    if len(term) > 4 and term.endswith("e"):
+        term = term[:-1]
+    return term
+
+
+def terms(text: str) -> list[str]:
+    """The index terms of a piece of text, in order."""
+    return [_stem(term) for term in TERM_RE.findall(text.lower()) if term not in STOP_WORDS]
+
+
+def term_counts(text: str) -> Counter:
+    """How often each index term occurs in text (each distinct word is only stemmed once)."""
+    counts: Counter = Counter()
+    for word, count in Counter(TERM_RE.findall(text.lower())).items():
+        if word not in STOP_WORDS:
+            counts[_stem(word)] += count
+    return counts
+
+
+def artifact_type(rel: Path) -> str:
+    """spec, plan, tasks, ... for a path relative to the project root."""
+    parts = rel.parts
+    if parts[0] != "specs":
+        return "constitution" if rel.name == "constitution.md" else "memory"
+    if "contracts" in parts[2:-1]:
+        return "contracts"
+    if "checklists" in parts[2:-1]:
+        return "checklist"
+    stem = rel.stem.lower()
+    return stem if stem in ARTIFACT_TYPES else "other"
+
+
+@dataclass
+class Section:
+    heading: str
+    line: int
+    end_line: int
+    body: list[str]
+
+
+def split_sections(text: str, markdown: bool = True) -> list[Section]:
+    """Split a document at its headings; each section carries its heading trail."""
+    lines = text.splitlines()
+    if not markdown:
+        return [Section("", 1, len(lines), lines)]
+    sections = [Section("", 1, 0, [])]
+    trail: list[tuple[int, str]] = []
+    in_fence = False
+    for number, line in enumerate(lines, 1):
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+        heading = None if in_fence else HEADING_RE.match(line)
+        if heading:
+            level, title = len(heading.group(1)), heading.group(2)
+            trail = [(lvl, t) for lvl, t in trail if lvl < level] + [(level, title)]
+            # The document title only names the section it heads
+            names = [t for lvl, t in trail if lvl > 1] or [title]
+            sections[-1].end_line = number - 1
+            sections.append(Section(SECTION_SEPARATOR.join(names), number, 0, []))
+        else:
+            sections[-1].body.append(line)
+    sections[-1].end_line = len(lines)
+    return [s for s in sections if s.heading or any(line.strip() for line in s.body)]
+
+
+@dataclass
+class Hit:
+    path: str
+    feature: str
+    type: str
+    section: str
+    line: int
+    score: float
+    snippet: str
+
+
+class SearchIndex:
+    """The on-disk inverted index of one project."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.path = root / INDEX_PATH
+        ensure_cache_dir(root / CACHE_DIR)
+        self.db = self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        try:
+            db = sqlite3.connect(self.path, timeout=30)
+            version = db.execute("PRAGMA user_version").fetchone()[0]
+        except sqlite3.DatabaseError:
+            # An unreadable cache is rebuilt from scratch
+            self.path.unlink(missing_ok=True)
+            db = sqlite3.connect(self.path, timeout=30)
+            version = 0
+        if version != INDEX_VERSION:
+            db.executescript(f"""
+                DROP TABLE IF EXISTS files;
+                DROP TABLE IF EXISTS sections;
+                DROP TABLE IF EXISTS postings;
+                CREATE TABLE files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, indexed_at_ns INTEGER);
+                CREATE TABLE sections (
+                    id INTEGER PRIMARY KEY, path TEXT, feature TEXT, type TEXT,
+                    heading TEXT, line INTEGER, end_line INTEGER, length INTEGER
+                );
+                CREATE INDEX sections_path ON sections (path);
+                CREATE TABLE postings (term TEXT, section INTEGER, tf INTEGER, PRIMARY KEY (term, section)) WITHOUT ROWID;
+                CREATE INDEX postings_section ON postings (section);
+                PRAGMA user_version = {INDEX_VERSION};
+            """)
+        db.execute("PRAGMA synchronous = NORMAL")
+        return db
+
+    def close(self) -> None:
+        self.db.close()
+
+    def rebuild(self) -> None:
+        self.db.close()
+        self.path.unlink(missing_ok=True)
+        self.db = self._open()
+
+    def _walk(self) -> Iterator[tuple[str, os.stat_result]]:
+        for base in SEARCH_DIRS:
+            stack = [self.root / base]
+            while stack:
+                try:
+                    entries = list(os.scandir(stack.pop()))
+                except OSError:
+                    continue
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif os.path.splitext(entry.name)[1].lower() in TEXT_SUFFIXES:
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        yield Path(entry.path).relative_to(self.root).as_posix(), st
+
+    def update(self) -> dict[str, int]:
+        """Reindex new and changed files and forget deleted ones; returns the counts."""
+        known = {path: (size, mtime, indexed_at) for path, size, mtime, indexed_at in self.db.execute("SELECT * FROM files")}
+        seen: set[str] = set()
+        changed: list[tuple[str, os.stat_result]] = []
+        for rel, st in self._walk():
+            seen.add(rel)
+            recorded = known.get(rel)
+            if recorded is None or recorded[:2] != (st.st_size, st.st_mtime_ns) or st.st_mtime_ns + RACY_NS >= recorded[2]:
+                changed.append((rel, st))
+        removed = [path for path in known if path not in seen]
+        stats = {"files": len(seen), "indexed": len(changed), "removed": len(removed)}
+        if not changed and not removed:
+            return stats
+
+        now = time.time_ns()
+        # Section ids are offsets here and become absolute once the write lock is held
+        section_rows: list[tuple] = []
+        posting_rows: list[tuple] = []
+        file_rows: list[tuple] = []
+        for rel, st in changed:
+            try:
+                text = (self.root / rel).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                continue
+            for section, counts in self._sections(rel, text):
+                offset = len(section_rows)
+                section_rows.append((offset, *section, sum(counts.values())))
+                posting_rows.extend((term, offset, tf) for term, tf in counts.items())
+            file_rows.append((rel, st.st_size, st.st_mtime_ns, now))
+        # Inserting postings in key order keeps the B-tree writes sequential
+        posting_rows.sort()
+
+        with self.db:
+            # Take the write lock before reading MAX(id) so concurrent updates cannot pick the same ids
+            self.db.execute("BEGIN IMMEDIATE")
+            base = (self.db.execute("SELECT MAX(id) FROM sections").fetchone()[0] or 0) + 1
+            for rel in removed + [rel for rel, _ in changed]:
+                self._forget(rel)
+            self.db.executemany("DELETE FROM files WHERE path = ?", [(rel,) for rel in removed])
+            self.db.executemany("INSERT INTO sections VALUES (?, ?, ?, ?, ?, ?, ?, ?)", ((base + row[0], *row[1:]) for row in section_rows))
+            self.db.executemany("INSERT INTO postings VALUES (?, ?, ?)", ((term, base + offset, tf) for term, offset, tf in posting_rows))
+            self.db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", file_rows)
+        return stats
+
+    def _forget(self, rel: str) -> None:
+        ids = [(row[0],) for row in self.db.execute("SELECT id FROM sections WHERE path = ?", (rel,))]
+        self.db.executemany("DELETE FROM postings WHERE section = ?", ids)
+        self.db.execute("DELETE FROM sections WHERE path = ?", (rel,))
+
+    def _sections(self, rel: str, text: str) -> Iterator[tuple[tuple, Counter]]:
+        """(path, feature, type, heading, line, end_line) and term counts of each section of a file."""
+        path = Path(rel)
+        feature = path.parts[1] if path.parts[0] == "specs" and len(path.parts) > 2 else ""
+        kind = artifact_type(path)
+        markdown = path.suffix.lower() in (".md", ".markdown")
+        for section in split_sections(text, markdown):
+            counts = term_counts("\n".join(section.body))
+            for term in terms(section.heading.rsplit(SECTION_SEPARATOR, 1)[-1]):
+                counts[term] += HEADING_WEIGHT
+            if counts:
+                yield (rel, feature, kind, section.heading, section.line, section.end_line), counts
+
+    def search(
+        self,
+        query: str,
+        *,
+        features: Optional[Iterable[str]] = None,
+        types: Optional[Iterable[str]] = None,
+        section: Optional[str] = None,
+        limit: int = 10,
+    ) -> tuple[list[Hit], int]:
+        """The best sections for query (BM25), and how many sections matched at all."""
+        query_terms = list(dict.fromkeys(terms(query)))
+        if not query_terms:
+            return [], 0
+        total, total_length = self.db.execute("SELECT COUNT(*), TOTAL(length) FROM sections").fetchone()
+        if not total:
+            return [], 0
+        average_length = total_length / total
+
+        marks = ",".join("?" * len(query_terms))
+        # Document frequencies are global, so filters do not change the weights
+        idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for term, df in self.db.execute(f"SELECT term, COUNT(*) FROM postings WHERE term IN ({marks}) GROUP BY term", query_terms)
+        }
+        if not idf:
+            return [], 0
+
+        params: list = list(idf)
+        sql = (
+            "SELECT p.section, p.term, p.tf, s.length FROM postings p JOIN sections s ON s.id = p.section "
+            f"WHERE p.term IN ({','.join('?' * len(params))})"
+        )
+        features, types = list(features or []), list(types or [])
+        if features:
+            sql += f" AND s.feature IN ({','.join('?' * len(features))})"
+            params += features
+        if types:
+            sql += f" AND s.type IN ({','.join('?' * len(types))})"
+            params += types
+        if section:
+            sql += " AND s.heading LIKE ? ESCAPE '\\'"
+            escaped = section.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+
+        scores: dict[int, float] = {}
+        for section_id, term, tf, length in self.db.execute(sql, params):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+            scores[section_id] = scores.get(section_id, 0.0) + idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+        best = sorted(scores.items(), key=lambda item: -item[1])[:limit]
+
+        hits = []
+        for section_id, score in best:
+            rel, feature, kind, heading, line, end_line = self.db.execute(
+                "SELECT path, feature, type, heading, line, end_line FROM sections WHERE id = ?", (section_id,)
+            ).fetchone()
+            snippet_line, snippet = self._snippet(rel, line, end_line, set(idf))
+            hits.append(Hit(rel, feature, kind, heading, snippet_line, round(score, 3), snippet))
+        return hits, len(scores)
+
+    def _snippet(self, rel: str, line: int, end_line: int, wanted: set[str]) -> tuple[int, str]:
+        """The line of the section that best shows the match, read from the file as it is now.
+
+        That is the first body line mentioning a query term, else the heading,
+        else the first non-empty line.
+        """
+        try:
+            with open(self.root / rel, encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()[line - 1:end_line]
+        except OSError:
+            return line, ""
+        first = None
+        for number, text in enumerate(lines, line):
+            if not text.strip() or HEADING_RE.match(text):
+                continue
+            first = first or (number, text)
+            if wanted & set(terms(text)):
+                return number, _shorten(text.strip())
+        if lines and HEADING_RE.match(lines[0]) or first is None:
+            return line, _shorten(lines[0].strip()) if lines else ""
+        return first[0], _shorten(first[1].strip())
+
+
+def _shorten(text: str) -> str:
+    return text if len(text) <= SNIPPET_WIDTH else text[:SNIPPET_WIDTH - 1] + "…"
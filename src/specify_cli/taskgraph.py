@@ -0,0 +1,367 @@
+"""
+Task dependency graph: `specify tasks graph`.
+
+tasks.md already says what may run concurrently; this module turns it into a
+DAG. Edges come from four sources, in the order the tasks are listed:
+
+    depends   explicit "(depends on T012, T013)" notes
+    phase     Setup and Foundational phases block everything after them; user
+              story phases only wait for the last such phase, not for each
+              other; a phase after the stories (Polish) waits for all of them
+    order     within a phase (and between its ### sections), a task without
+              [P] waits for everything before it, and a [P] task only for the
+              last task without [P]
+    file      two tasks that touch the same file, unless both are [P], run in
+              listed order even across story phases
+
+From the DAG come the parallel waves (each task scheduled as early as its
+prerequisites allow), the critical path (the longest chain, which bounds the
+run time however many workers there are) and the number of workers actually
+worth running.
+"""
+
+import heapq
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .artifacts import Task, TaskList
+
+DEPENDS = "depends"
+PHASE = "phase"
+ORDER = "order"
+FILE = "file"
+
+STORY_PHASE_RE = re.compile(r"\buser stor(?:y|ies)\b", re.IGNORECASE)
+DOT_LABEL_WIDTH = 40
+
+
+class TaskGraphError(Exception):
+    """Raised when the task graph cannot be scheduled."""
+
+    def __init__(self, message: str, cycle: Optional[list[str]] = None):
+        super().__init__(message)
+        self.cycle = cycle or []
+
+
+@dataclass
+class TaskGraph:
+    tasks: dict[str, Task]
+    # prerequisite -> dependent -> kind
+    edges: dict[str, dict[str, str]] = field(default_factory=dict)
+    warnings: list[str] = field(default_factory=list)
+
+    def add_edge(self, before: str, after: str, kind: str) -> None:
+        if before == after:
+            return
+        targets = self.edges.setdefault(before, {})
+        # An explicit dependency is the most useful label to keep
+        if after not in targets or kind == DEPENDS:
+            targets[after] = kind
+
+    def predecessors(self) -> dict[str, list[str]]:
+        preds: dict[str, list[str]] = {task_id: [] for task_id in self.tasks}
+        for before, targets in self.edges.items():
+            for after in targets:
+                preds[after].append(before)
+        return preds
+
+    def edge_count(self) -> int:
+        return sum(len(targets) for targets in self.edges.values())
+
+
+@dataclass
+class Schedule:
+    order: list[str]
+    waves: list[list[str]]
+    critical_path: list[str]
+    max_concurrency: int
+    workers: int
+    # task -> length of the longest chain starting at it, the natural dispatch priority
+    chain: dict[str, int] = field(default_factory=dict)
+
+
+def _is_story_phase(title: str, tasks: list[Task]) -> bool:
+    return bool(STORY_PHASE_RE.search(title)) or any(task.story for task in tasks)
+
+
+class _Sequence:
+    """Orders tasks that run in listed order, except that consecutive [P] tasks run together."""
+
+    def __init__(self, gate: list[str]):
+        self.gate = gate  # what the next task must wait for
+        self.open: list[str] = []  # [P] tasks started since the gate
+
+    def add(self, task: Task) -> list[str]:
+        if task.parallel:
+            self.open.append(task.id)
+            return self.gate
+        waits = self.open or self.gate
+        self.gate, self.open = [task.id], []
+        return waits
+
+    def barrier(self) -> None:
+        if self.open:
+            self.gate, self.open = self.open, []
+
+    def exits(self) -> list[str]:
+        return self.open or self.gate
+
+
+def build_graph(task_list: TaskList) -> TaskGraph:
+    graph = TaskGraph({})
+    for task in task_list.tasks:
+        if task.id in graph.tasks:
+            graph.warnings.append(f"{task.id} is listed twice; the entry on line {task.line} is ignored")
+            continue
+        graph.tasks[task.id] = task
+    tasks = list(graph.tasks.values())
+
+    phases: dict[str, list[Task]] = {}
+    for task in tasks:
+        phases.setdefault(task.phase, []).append(task)
+
+    # Phases and the sections inside them
+    blocking: list[str] = []  # exits of the last blocking phase
+    stories: list[str] = []  # exits of the story phases since then
+    for title, members in phases.items():
+        story_phase = _is_story_phase(title, members)
+        sequence = _Sequence(blocking if story_phase else stories or blocking)
+        section = members[0].section
+        for task in members:
+            if task.section != section:
+                sequence.barrier()
+                section = task.section
+            for before in sequence.add(task):
+                kind = ORDER if graph.tasks[before].phase == title else PHASE
+                graph.add_edge(before, task.id, kind)
+        if story_phase:
+            stories.extend(sequence.exits())
+        else:
+            blocking, stories = sequence.exits(), []
+
+    # Same-file conflicts
+    files: dict[str, _Sequence] = {}
+    shared_parallel: dict[str, list[str]] = {}
+    for task in tasks:
+        for path in task.files:
+            sequence = files.setdefault(path, _Sequence([]))
+            if task.parallel and sequence.open:
+                shared_parallel.setdefault(path, list(sequence.open)).append(task.id)
+            for before in sequence.add(task):
+                graph.add_edge(before, task.id, FILE)
+    for path, task_ids in shared_parallel.items():
+        graph.warnings.append(f"{', '.join(task_ids)} are all marked [P] but touch {path}")
+
+    # Explicit dependencies
+    for task in tasks:
+        for dep in task.depends_on:
+            if dep in graph.tasks:
+                graph.add_edge(dep, task.id, DEPENDS)
+            else:
+                graph.warnings.append(f"{task.id} depends on {dep}, which is not in tasks.md")
+    return graph
+
+
+def without_done(graph: TaskGraph) -> TaskGraph:
+    """The graph of the remaining tasks; a dependency through a completed task is kept."""
+    remaining = TaskGraph({k: t for k, t in graph.tasks.items() if not t.done}, warnings=graph.warnings)
+    resolved: dict[str, dict[str, str]] = {}
+
+    def pending_successors(task_id: str) -> dict[str, str]:
+        # Successors of a completed task, looking through other completed tasks.
+        # Iterative post-order, so long runs of completed tasks cannot overflow the stack.
+        stack = [(task_id, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if not expanded:
+                if node in resolved:
+                    continue
+                resolved[node] = {}
+                stack.append((node, True))
+                stack.extend((after, False) for after in graph.edges.get(node, {}) if after not in remaining.tasks)
+                continue
+            found: dict[str, str] = {}
+            for after, kind in graph.edges.get(node, {}).items():
+                if after in remaining.tasks:
+                    found.setdefault(after, kind)
+                else:
+                    for nested, nested_kind in resolved[after].items():
+                        found.setdefault(nested, nested_kind)
+            resolved[node] = found
+        return resolved[task_id]
+
+    for before in remaining.tasks:
+        for after, kind in graph.edges.get(before, {}).items():
+            if after in remaining.tasks:
+                remaining.add_edge(before, after, kind)
+            else:
+                for nested, nested_kind in pending_successors(after).items():
+                    remaining.add_edge(before, nested, nested_kind)
+    return remaining
+
+
+def _find_cycle(graph: TaskGraph, candidates: set[str]) -> list[str]:
+    """A cycle among the tasks Kahn's algorithm could not order."""
+    preds = graph.predecessors()
+    position = {task_id: index for index, task_id in enumerate(graph.tasks)}
+    start = min(candidates, key=position.__getitem__)
+    path, seen = [start], {start: 0}
+    while True:
+        # Every unordered task has an unordered predecessor, so walking
+        # backwards through them must eventually revisit a task
+        before = min((p for p in preds[path[-1]] if p in candidates), key=position.__getitem__)
+        if before in seen:
+            cycle = path[seen[before]:] + [before]
+            return cycle[::-1]
+        seen[before] = len(path)
+        path.append(before)
+
+
+def _list_schedule_length(order: list[str], preds: dict[str, list[str]], succs: dict[str, dict[str, str]], priority: dict[str, int], workers: int) -> int:
+    """Steps needed with a fixed number of workers, longest-remaining-chain first."""
+    position = {task_id: index for index, task_id in enumerate(order)}
+    waiting = {task_id: len(preds[task_id]) for task_id in order}
+    ready = [(-priority[t], position[t], t) for t in order if not waiting[t]]
+    heapq.heapify(ready)
+    steps = 0
+    while ready:
+        running = [heapq.heappop(ready)[2] for _ in range(min(workers, len(ready)))]
+        steps += 1
+        for task_id in running:
+            for after in succs.get(task_id, {}):
+                waiting[after] -= 1
+                if not waiting[after]:
+                    heapq.heappush(ready, (-priority[after], position[after], after))
+    return steps
+
+
+def schedule(graph: TaskGraph) -> Schedule:
+    """Topological order, waves, critical path and useful concurrency of a task graph."""
+    preds = graph.predecessors()
+    position = {task_id: index for index, task_id in enumerate(graph.tasks)}
+    waiting = {task_id: len(p) for task_id, p in preds.items()}
+    ready = [position[t] for t, count in waiting.items() if not count]
+    heapq.heapify(ready)
+    ids = list(graph.tasks)
+    order: list[str] = []
+    while ready:
+        task_id = ids[heapq.heappop(ready)]
+        order.append(task_id)
+        for after in graph.edges.get(task_id, {}):
+            waiting[after] -= 1
+            if not waiting[after]:
+                heapq.heappush(ready, position[after])
+    if len(order) < len(graph.tasks):
+        cycle = _find_cycle(graph, {t for t, count in waiting.items() if count})
+        raise TaskGraphError(f"Dependency cycle: {' -> '.join(cycle)}", cycle)
+
+    # Waves: every task as early as its prerequisites allow
+    level: dict[str, int] = {}
+    for task_id in order:
+        level[task_id] = max((level[p] + 1 for p in preds[task_id]), default=0)
+    waves: list[list[str]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+    for task_id in order:
+        waves[level[task_id]].append(task_id)
+    for wave in waves:
+        wave.sort(key=position.__getitem__)
+
+    # Longest chain from each task to the end; the critical path follows it
+    remaining: dict[str, int] = {}
+    for task_id in reversed(order):
+        remaining[task_id] = 1 + max((remaining[a] for a in graph.edges.get(task_id, {})), default=0)
+    critical: list[str] = []
+    if order:
+        current: Optional[str] = min((t for t in order if not preds[t]), key=lambda t: (-remaining[t], position[t]))
+        while current:
+            critical.append(current)
+            current = min(graph.edges.get(current, {}), key=lambda t: (-remaining[t], position[t]), default=None)
+
+    # Fewest workers that still finish in as many steps as the critical path
+    widest = max((len(wave) for wave in waves), default=0)
+    low, high = min(1, widest), widest
+    while low < high:
+        middle = (low + high) // 2
+        if _list_schedule_length(order, preds, graph.edges, remaining, middle) <= len(critical):
+            high = middle
+        else:
+            low = middle + 1
+    return Schedule(order, waves, critical, widest, high, remaining)
+
+
+def _dot_quote(text: str) -> str:
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+
+def to_dot(graph: TaskGraph, plan: Schedule, name: str = "tasks") -> str:
+    """Graphviz rendering: one cluster per phase, the critical path in red, completed tasks greyed."""
+    critical_nodes = set(plan.critical_path)
+    critical_edges = set(zip(plan.critical_path, plan.critical_path[1:]))
+    lines = [
+        f"digraph {_dot_quote(name)} {{",
+        "  rankdir=LR;",
+        '  node [shape=box, style="rounded", fontname="Helvetica", fontsize=10];',
+        "  edge [color=gray40];",
+    ]
+    phases: dict[str, list[Task]] = {}
+    for task in graph.tasks.values():
+        phases.setdefault(task.phase, []).append(task)
+    for number, (title, members) in enumerate(phases.items()):
+        indent = "  "
+        if title:
+            lines.append(f"  subgraph cluster_{number} {{")
+            lines.append(f"    label={_dot_quote(title)}; style=dashed; color=gray60;")
+            indent = "    "
+        for task in members:
+            description = task.description if len(task.description) <= DOT_LABEL_WIDTH else task.description[:DOT_LABEL_WIDTH - 1] + "…"
+            label = f"{task.id}{' [P]' if task.parallel else ''}\n{description}"
+            attributes = [f"label={_dot_quote(label)}"]
+            if task.done:
+                attributes.append('style="rounded,filled", fillcolor=gray90, fontcolor=gray50')
+            if task.id in critical_nodes:
+                attributes.append("color=red, penwidth=2")
+            lines.append(f"{indent}{_dot_quote(task.id)} [{', '.join(attributes)}];")
+        if title:
+            lines.append("  }")
+    styles = {DEPENDS: "", PHASE: "style=dotted", ORDER: "", FILE: "style=dashed"}
+    for before, targets in graph.edges.items():
+        for after, kind in targets.items():
+            attributes = [styles[kind]] if styles[kind] else []
+            if kind == FILE:
+                attributes.append("arrowhead=empty")
+            if (before, after) in critical_edges:
+                attributes.append("color=red, penwidth=2")
+            suffix = f" [{', '.join(attributes)}]" if attributes else ""
+            lines.append(f"  {_dot_quote(before)} -> {_dot_quote(after)}{suffix};")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def to_dict(graph: TaskGraph, plan: Schedule) -> dict:
+    preds = graph.predecessors()
+    wave_of = {task_id: number for number, wave in enumerate(plan.waves, 1) for task_id in wave}
+    return {
+        "tasks": [
+            {
+                "id": task.id,
+                "description": task.description,
+                "phase": task.phase,
+                "story": task.story,
+                "parallel": task.parallel,
+                "done": task.done,
+                "wave": wave_of[task.id],
+                "after": preds[task.id],
+            }
+            for task in graph.tasks.values()
+        ],
+        "edges": [
+            {"from": before, "to": after, "kind": kind}
+            for before, targets in graph.edges.items()
+            for after, kind in targets.items()
+        ],
+        "waves": plan.waves,
+        "critical_path": plan.critical_path,
+        "max_concurrency": plan.max_concurrency,
+        "workers": plan.workers,
+        "warnings": graph.warnings,
+    }
@@ -0,0 +1,216 @@
+"""
+Tool discovery for `specify check` and agent detection during `specify init`.
+
+Instead of calling shutil.which once per tool (each call rescans every PATH
+directory), the PATH is listed once per invocation, in parallel, into a
+name -> candidates index. Probe results are persisted in the user cache
+directory keyed by a fingerprint of PATH and the mtime of every PATH
+directory, so repeated runs on an unchanged PATH skip the scan entirely.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .cache import default_cache_dir
+
+CACHE_VERSION = 1
+VERSION_TIMEOUT = 5
+_MAX_WORKERS = 16
+
+
+def _path_dirs(path_env: str) -> list[str]:
+    seen = set()
+    dirs = []
+    for entry in path_env.split(os.pathsep):
+        entry = entry.strip().strip('"')
+        if entry and entry not in seen:
+            seen.add(entry)
+            dirs.append(entry)
+    return dirs
+
+
+def _stat_key(path: str) -> str:
+    try:
+        st = os.stat(path)
+        return f"{st.st_mtime_ns}:{st.st_ino}"
+    except OSError:
+        return "-"
+
+
+def _pathext() -> list[str]:
+    if os.name != "nt":
+        return []
+    return [e.lower() for e in os.environ.get("PATHEXT", ".COM;.EXE;.BAT;.CMD").split(os.pathsep) if e]
+
+
+def _list_dir(path: str) -> list[str]:
+    try:
+        with os.scandir(path) as it:
+            return [entry.name for entry in it]
+    except OSError:
+        return []
+
+
+def _parallel_map(fn, items: list) -> list:
+    """Map fn over items on a thread pool.
+
+    concurrent.futures (and the logging module it loads) is imported here rather
+    than at module level, since this module is loaded on every CLI start.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(items) or 1)) as pool:
+        return list(pool.map(fn, items))
+
+
+def _is_executable(path: str) -> bool:
+    if os.name == "nt":
+        return os.path.isfile(path)
+    return os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+class ToolProber:
+    """Resolve executables against a single PATH scan, with a persistent result cache.
+
+    ``special`` maps tool names to paths that take precedence over PATH (used for
+    the Claude CLI, which `claude migrate-installer` moves out of PATH).
+    ``use_cache=False`` neither reads nor writes the cache; ``refresh=True``
+    ignores persisted results but still saves the fresh ones.
+    """
+
+    def __init__(self, special: dict[str, Path] | None = None, path_env: str | None = None, cache_file: Path | None = None, use_cache: bool = True, refresh: bool = False):
+        self.special = special or {}
+        self.dirs = _path_dirs(os.environ.get("PATH", "") if path_env is None else path_env)
+        self.cache_file = cache_file or (default_cache_dir() / "tools.json")
+        self.use_cache = use_cache
+        self._index: dict[str, list[str]] | None = None
+        self._results: dict[str, dict] = {}
+        self._fingerprint: str | None = None
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        if use_cache and not refresh:
+            self._load_cache()
+
+    # ------------------------------------------------------------------
+    # Fingerprint and persistence
+    # ------------------------------------------------------------------
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            watched = self.dirs + [str(p) for p in self.special.values()]
+            stats = _parallel_map(_stat_key, watched)
+            hasher = hashlib.sha256()
+            hasher.update(os.pathsep.join(self.dirs).encode("utf-8", "surrogateescape"))
+            for path, key in zip(watched, stats):
+                hasher.update(f"\0{path}={key}".encode("utf-8", "surrogateescape"))
+            hasher.update(os.environ.get("PATHEXT", "").encode())
+            self._fingerprint = hasher.hexdigest()
+        return self._fingerprint
+
+    def _load_cache(self) -> None:
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION and data.get("fingerprint") == self.fingerprint():
+            self._results = data.get("tools", {})
+
+    def save(self) -> None:
+        """Persist probe results if anything new was resolved."""
+        if not (self.use_cache and self._dirty):
+            return
+        data = {"version": CACHE_VERSION, "fingerprint": self.fingerprint(), "tools": self._results}
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".tools-", suffix=".json", dir=self.cache_file.parent)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.cache_file)
+            self._dirty = False
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------------
+    # PATH index
+    # ------------------------------------------------------------------
+    def _build_index(self) -> dict[str, list[str]]:
+        if self._index is None:
+            exts = _pathext()
+            listings = _parallel_map(_list_dir, self.dirs)
+            index: dict[str, list[str]] = {}
+            for directory, names in zip(self.dirs, listings):
+                for name in names:
+                    full = os.path.join(directory, name)
+                    key = name.lower() if os.name == "nt" else name
+                    index.setdefault(key, []).append(full)
+                    if exts:
+                        stem, ext = os.path.splitext(key)
+                        if ext in exts:
+                            index.setdefault(stem, []).append(full)
+            self._index = index
+        return self._index
+
+    def _resolve(self, tool: str) -> Optional[str]:
+        special = self.special.get(tool)
+        if special is not None and special.is_file():
+            return str(special)
+        key = tool.lower() if os.name == "nt" else tool
+        for candidate in self._build_index().get(key, []):
+            if _is_executable(candidate):
+                return candidate
+        return None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def which(self, tool: str) -> Optional[str]:
+        """Return the resolved path of tool, or None if it is not installed."""
+        return self.probe([tool])[tool]["path"]
+
+    def probe(self, tools: list[str], versions: bool = False) -> dict[str, dict]:
+        """Resolve tools (and optionally their --version output) in parallel.
+
+        Returns {tool: {"path": str | None, "version": str | None}}; "version" is
+        only filled in when versions is True, even if an earlier run cached it.
+        """
+        with self._lock:
+            missing = [t for t in tools if t not in self._results]
+            for tool in missing:
+                self._results[tool] = {"path": self._resolve(tool)}
+            self._dirty |= bool(missing)
+
+            if versions:
+                pending = [t for t in tools if self._results[t]["path"] and "version" not in self._results[t]]
+                if pending:
+                    found = _parallel_map(lambda t: tool_version(self._results[t]["path"]), pending)
+                    for tool, version in zip(pending, found):
+                        self._results[tool]["version"] = version
+                    self._dirty = True
+
+            return {t: {"path": self._results[t]["path"], "version": self._results[t].get("version") if versions else None} for t in tools}
+
+
+def tool_version(path: str) -> Optional[str]:
+    """Return the first line printed by `<tool> --version`, or None."""
+    try:
+        result = subprocess.run(
+            [path, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=VERSION_TIMEOUT,
+            stdin=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    for line in (result.stdout or result.stderr or "").splitlines():
+        line = line.strip()
+        if line:
+            return line[:80]
+    return None
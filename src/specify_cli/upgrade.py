@@ -0,0 +1,159 @@
+"""
+Template upgrades for existing projects: `specify upgrade`.
+
+Each template file is classified by comparing three hashes: the one recorded
+in .specify/manifest.json when the project was created or last upgraded
+(base), the one in the new template (theirs) and the working tree (ours):
+
+    base == theirs      unchanged upstream: left alone
+    ours == base        not edited locally: replaced with the new version
+    ours == theirs      already matches the new template
+    ours missing        added if new upstream, otherwise left deleted
+    otherwise           conflict: the local file is left untouched and the
+                        new version is written next to it as <file>.upstream
+
+Files dropped from the template are removed when they were not edited.
+.vscode/settings.json is merged exactly as `specify init --here` merges it.
+"""
+
+import hashlib
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from rich.table import Table
+
+from . import _archive_prefix, _safe_relpath, handle_vscode_settings, write_archive_entry
+from .manifest import MANIFEST_PATH, path_sha256, write_manifest
+
+VSCODE_SETTINGS = ".vscode/settings.json"
+UPSTREAM_SUFFIX = ".upstream"
+
+# Display order and style for each action; "unchanged" is never listed
+ACTIONS = {
+    "conflict": ("red", "edited locally and changed upstream; upstream version in {path}.upstream"),
+    "update": ("green", "updated"),
+    "add": ("green", "new in template"),
+    "merge": ("cyan", "merged into existing settings"),
+    "remove": ("yellow", "removed from template"),
+    "skip": ("bright_black", ""),
+    "current": ("bright_black", "already matches the new template"),
+}
+
+
+@dataclass
+class FileChange:
+    path: str
+    action: str
+    detail: str = ""
+    info: Optional[zipfile.ZipInfo] = None
+    theirs: Optional[str] = None
+
+
+def _entry_sha256(zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo) -> str:
+    digest = hashlib.sha256()
+    with zip_ref.open(info) as src:
+        for chunk in iter(lambda: src.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def plan_upgrade(project_path: Path, zip_ref: zipfile.ZipFile, manifest: dict) -> list[FileChange]:
+    """Classify every file in the new template (and every file it dropped) without writing anything."""
+    base_hashes: dict[str, str] = manifest["files"]
+    infos = zip_ref.infolist()
+    prefix = _archive_prefix(infos)
+    changes: list[FileChange] = []
+    seen: set[str] = set()
+
+    for info in infos:
+        if info.is_dir():
+            continue
+        rel = _safe_relpath(info.filename[len(prefix):])
+        if rel is None or rel == MANIFEST_PATH:
+            continue
+        name = rel.as_posix()
+        seen.add(name)
+        theirs = _entry_sha256(zip_ref, info)
+        base = base_hashes.get(name)
+        change = FileChange(name, "unchanged", info=info, theirs=theirs)
+        changes.append(change)
+        if base == theirs:
+            continue
+
+        ours = path_sha256(project_path / rel)
+        if name == VSCODE_SETTINGS and ours is not None:
+            change.action = "merge"
+        elif ours is None:
+            if base is None:
+                change.action = "add"
+            else:
+                change.action, change.detail = "skip", "changed upstream but deleted locally"
+        elif ours == theirs:
+            change.action = "current"
+        elif ours == base:
+            change.action = "update"
+        else:
+            change.action = "conflict"
+            if base is None:
+                change.detail = "new in template but a different local file exists; upstream version in {path}.upstream"
+
+    for name, base in base_hashes.items():
+        if name in seen:
+            continue
+        ours = path_sha256(project_path / name)
+        if ours is None:
+            continue
+        if ours == base:
+            changes.append(FileChange(name, "remove"))
+        else:
+            changes.append(FileChange(name, "skip", "removed from template but edited locally; kept"))
+
+    return changes
+
+
+def apply_upgrade(project_path: Path, zip_ref: zipfile.ZipFile, manifest: dict, changes: list[FileChange], *, release: str) -> None:
+    """Write the planned changes and record the new release in the manifest.
+
+    Conflicting files are recorded with the new template's hash, so the next
+    upgrade only reports them again if they change upstream once more.
+    """
+    hashes: dict[str, str] = {}
+
+    for change in changes:
+        dest = project_path / change.path
+        if change.action in ("add", "update", "conflict"):
+            if change.action == "conflict":
+                dest = dest.with_name(dest.name + UPSTREAM_SUFFIX)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            write_archive_entry(zip_ref, change.info, dest)
+        elif change.action == "merge":
+            handle_vscode_settings(zip_ref.read(change.info), dest, Path(change.path))
+        elif change.action == "remove":
+            dest.unlink(missing_ok=True)
+
+        if change.theirs is not None:
+            hashes[change.path] = change.theirs
+
+    write_manifest(project_path, release=release, ai=manifest["ai"], script=manifest["script"], files=hashes)
+
+
+def counts(changes: list[FileChange]) -> dict[str, int]:
+    result = {action: 0 for action in ("unchanged", *ACTIONS)}
+    for change in changes:
+        result[change.action] += 1
+    return result
+
+
+def render_plan(changes: list[FileChange], *, title: str) -> Table:
+    table = Table(title=title, border_style="cyan", show_lines=False)
+    table.add_column("File", style="cyan", overflow="fold")
+    table.add_column("Action")
+    table.add_column("Detail", style="bright_black", overflow="fold")
+    order = list(ACTIONS)
+    for change in sorted((c for c in changes if c.action in ACTIONS), key=lambda c: (order.index(c.action), c.path)):
+        style, default_detail = ACTIONS[change.action]
+        detail = (change.detail or default_detail).format(path=Path(change.path).name)
+        table.add_row(change.path, f"[{style}]{change.action}[/{style}]", detail)
+    return table